@@ -0,0 +1,40 @@
+"""pharmacy order count and volume index
+
+Revision ID: 3c1f6a2b9d01
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+Tables are created by ``Base.metadata.create_all`` at startup; revisions
+bring existing databases up to date with columns and indexes added later.
+Each step checks the live schema so it is safe on freshly created tables.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f6a2b9d01'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    columns = {column['name'] for column in inspector.get_columns('pharmacies')}
+    if 'annual_order_count' not in columns:
+        op.add_column(
+            'pharmacies',
+            sa.Column('annual_order_count', sa.Integer(), nullable=False, server_default='0')
+        )
+
+    indexes = {index['name'] for index in inspector.get_indexes('pharmacies')}
+    if 'ix_pharmacies_annual_volume' not in indexes:
+        op.create_index('ix_pharmacies_annual_volume', 'pharmacies', ['annual_volume'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pharmacies_annual_volume', table_name='pharmacies')
+    with op.batch_alter_table('pharmacies') as batch_op:
+        batch_op.drop_column('annual_order_count')
@@ -0,0 +1,63 @@
+"""sales access-path indexes
+
+Revision ID: 7e4b2d9a1c02
+Revises: 3c1f6a2b9d01
+Create Date: 2026-10-18 10:00:00.000000
+
+Composite, partial (live rows only) indexes for the hot sales queries:
+analytics/report ranges on sale_date, listings ordered by created_at,
+sales-rep listings, and per-product / per-pharmacy ranges. On PostgreSQL
+they are built with CREATE INDEX CONCURRENTLY outside the migration
+transaction so the sales table stays writable.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e4b2d9a1c02'
+down_revision = '3c1f6a2b9d01'
+branch_labels = None
+depends_on = None
+
+
+# name -> (table, columns, partial on is_active)
+INDEXES = {
+    'ix_sales_active_sale_date': ('sales', ['sale_date'], True),
+    'ix_sales_active_created_at': ('sales', ['created_at'], True),
+    'ix_sales_rep_created_at': ('sales', ['sales_rep_id', 'created_at'], True),
+    'ix_sales_product_sale_date': ('sales', ['product_id', 'sale_date'], True),
+    'ix_sales_pharmacy_sale_date': ('sales', ['pharmacy_id', 'sale_date'], True),
+    'ix_products_category_id': ('products', ['category_id'], False),
+}
+
+
+def _existing_indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    is_postgresql = bind.dialect.name == 'postgresql'
+    existing = {table: _existing_indexes(table) for table in {table for table, _, _ in INDEXES.values()}}
+
+    with op.get_context().autocommit_block():
+        for name, (table, columns, partial) in INDEXES.items():
+            if name in existing[table]:
+                continue
+            where = sa.text('is_active = true' if is_postgresql else 'is_active = 1') if partial else None
+            op.create_index(
+                name, table, columns,
+                postgresql_where=where,
+                sqlite_where=where,
+                postgresql_concurrently=True
+            )
+
+    if is_postgresql:
+        op.execute('ANALYZE sales')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, (table, _, _) in INDEXES.items():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
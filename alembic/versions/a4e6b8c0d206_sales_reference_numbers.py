@@ -0,0 +1,107 @@
+"""global uniqueness of sale order/invoice numbers on partitioned sales
+
+Revision ID: a4e6b8c0d206
+Revises: f1c3d5a7b905
+Create Date: 2026-10-19 09:00:00.000000
+
+A partitioned ``sales`` table cannot carry a unique index on
+order_number or invoice_number (unique indexes must include the partition
+key), so b8d5e1f3a703 left them as plain indexes. This records every
+number in ``sales_reference_numbers``, whose primary key enforces
+uniqueness across all partitions, kept in sync by a row trigger on
+``sales``. A duplicate number fails the insert or update with a unique
+violation, as the unique index did. Numbers of detached (archived)
+partitions stay reserved.
+
+Unpartitioned tables (SQLite, or PostgreSQL before b8d5e1f3a703) keep
+their unique indexes and are left untouched.
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend.database.partitions import is_sales_partitioned
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4e6b8c0d206'
+down_revision = 'f1c3d5a7b905'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+SYNC_FUNCTION = """
+CREATE OR REPLACE FUNCTION sales_reference_numbers_sync() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        IF OLD.order_number IS NOT NULL
+           AND (TG_OP = 'DELETE' OR NEW.order_number IS DISTINCT FROM OLD.order_number) THEN
+            DELETE FROM sales_reference_numbers WHERE kind = 'order' AND number = OLD.order_number;
+        END IF;
+        IF OLD.invoice_number IS NOT NULL
+           AND (TG_OP = 'DELETE' OR NEW.invoice_number IS DISTINCT FROM OLD.invoice_number) THEN
+            DELETE FROM sales_reference_numbers WHERE kind = 'invoice' AND number = OLD.invoice_number;
+        END IF;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        IF NEW.order_number IS NOT NULL
+           AND (TG_OP = 'INSERT' OR NEW.order_number IS DISTINCT FROM OLD.order_number) THEN
+            INSERT INTO sales_reference_numbers (kind, number) VALUES ('order', NEW.order_number);
+        END IF;
+        IF NEW.invoice_number IS NOT NULL
+           AND (TG_OP = 'INSERT' OR NEW.invoice_number IS DISTINCT FROM OLD.invoice_number) THEN
+            INSERT INTO sales_reference_numbers (kind, number) VALUES ('invoice', NEW.invoice_number);
+        END IF;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not is_sales_partitioned(bind):
+        return
+
+    op.execute(
+        "CREATE TABLE IF NOT EXISTS sales_reference_numbers ("
+        "kind varchar(10) NOT NULL, "
+        "number varchar(50) NOT NULL, "
+        "PRIMARY KEY (kind, number))"
+    )
+
+    # Backfill; numbers duplicated while unguarded are kept once and reported
+    for kind, column in (("order", "order_number"), ("invoice", "invoice_number")):
+        duplicates = bind.execute(sa.text(
+            f"SELECT count(*) FROM (SELECT {column} FROM sales WHERE {column} IS NOT NULL "
+            f"GROUP BY {column} HAVING count(*) > 1) AS duplicated"
+        )).scalar()
+        if duplicates:
+            logger.warning(f"{duplicates} {column} values are used by more than one sale; fix them by hand")
+        op.execute(
+            f"INSERT INTO sales_reference_numbers (kind, number) "
+            f"SELECT DISTINCT '{kind}', {column} FROM sales WHERE {column} IS NOT NULL "
+            f"ON CONFLICT DO NOTHING"
+        )
+
+    op.execute(SYNC_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER sales_reference_numbers_sync "
+        "AFTER INSERT OR UPDATE OF order_number, invoice_number OR DELETE ON sales "
+        "FOR EACH ROW EXECUTE FUNCTION sales_reference_numbers_sync()"
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS sales_reference_numbers_sync ON sales")
+    op.execute("DROP FUNCTION IF EXISTS sales_reference_numbers_sync()")
+    op.execute("DROP TABLE IF EXISTS sales_reference_numbers")
@@ -0,0 +1,104 @@
+"""partition sales by month on sale_date (PostgreSQL)
+
+Revision ID: b8d5e1f3a703
+Revises: 7e4b2d9a1c02
+Create Date: 2026-10-18 11:00:00.000000
+
+Rebuilds ``sales`` as a RANGE-partitioned table with one partition per
+month plus a default partition, and copies the existing rows across.
+Partitioned tables need the partition key in every unique constraint, so
+the primary key becomes (id, sale_date) and order/invoice numbers get
+plain indexes. The ORM still identifies sales by ``id`` alone.
+
+SQLite databases are left untouched.
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend.database.partitions import (
+    DEFAULT_PARTITION, create_month_partition_sql, is_sales_partitioned, month_start
+)
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8d5e1f3a703'
+down_revision = '7e4b2d9a1c02'
+branch_labels = None
+depends_on = None
+
+
+MONTHS_AHEAD = 3
+
+INDEXES = [
+    "CREATE INDEX ix_sales_id ON sales (id)",
+    "CREATE INDEX ix_sales_active_sale_date ON sales (sale_date) WHERE is_active = true",
+    "CREATE INDEX ix_sales_active_created_at ON sales (created_at) WHERE is_active = true",
+    "CREATE INDEX ix_sales_rep_created_at ON sales (sales_rep_id, created_at) WHERE is_active = true",
+    "CREATE INDEX ix_sales_product_sale_date ON sales (product_id, sale_date) WHERE is_active = true",
+    "CREATE INDEX ix_sales_pharmacy_sale_date ON sales (pharmacy_id, sale_date) WHERE is_active = true",
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or is_sales_partitioned(bind):
+        return
+
+    # The partition key cannot be NULL in a range partition
+    op.execute("UPDATE sales SET sale_date = COALESCE(created_at, now()) WHERE sale_date IS NULL")
+
+    op.execute("ALTER SEQUENCE sales_id_seq OWNED BY NONE")
+    op.execute(
+        "CREATE TABLE sales_partitioned "
+        "(LIKE sales INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS) "
+        "PARTITION BY RANGE (sale_date)"
+    )
+    op.execute("ALTER TABLE sales_partitioned ALTER COLUMN sale_date SET NOT NULL")
+
+    # Monthly partitions from the oldest sale through MONTHS_AHEAD, plus a default
+    oldest = bind.execute(sa.text("SELECT min(sale_date)::date FROM sales")).scalar() or date.today()
+    month, last = month_start(oldest), month_start(date.today(), MONTHS_AHEAD)
+    while month <= last:
+        op.execute(create_month_partition_sql(month).replace("PARTITION OF sales", "PARTITION OF sales_partitioned"))
+        month = month_start(month, 1)
+    op.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF sales_partitioned DEFAULT")
+
+    op.execute("INSERT INTO sales_partitioned SELECT * FROM sales")
+    op.execute("DROP TABLE sales")
+    op.execute("ALTER TABLE sales_partitioned RENAME TO sales")
+    op.execute("ALTER SEQUENCE sales_id_seq OWNED BY sales.id")
+
+    op.execute("ALTER TABLE sales ADD CONSTRAINT sales_pkey PRIMARY KEY (id, sale_date)")
+    op.execute("ALTER TABLE sales ADD CONSTRAINT sales_product_id_fkey FOREIGN KEY (product_id) REFERENCES products (id)")
+    op.execute("ALTER TABLE sales ADD CONSTRAINT sales_pharmacy_id_fkey FOREIGN KEY (pharmacy_id) REFERENCES pharmacies (id)")
+    op.execute("ALTER TABLE sales ADD CONSTRAINT sales_sales_rep_id_fkey FOREIGN KEY (sales_rep_id) REFERENCES users (id)")
+    op.execute("CREATE INDEX ix_sales_order_number ON sales (order_number)")
+    op.execute("CREATE INDEX ix_sales_invoice_number ON sales (invoice_number)")
+    for statement in INDEXES:
+        op.execute(statement)
+
+    op.execute("ANALYZE sales")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or not is_sales_partitioned(bind):
+        return
+
+    op.execute("ALTER SEQUENCE sales_id_seq OWNED BY NONE")
+    op.execute("CREATE TABLE sales_plain (LIKE sales INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS)")
+    op.execute("INSERT INTO sales_plain SELECT * FROM sales")
+    op.execute("DROP TABLE sales CASCADE")
+    op.execute("ALTER TABLE sales_plain RENAME TO sales")
+    op.execute("ALTER SEQUENCE sales_id_seq OWNED BY sales.id")
+
+    op.execute("ALTER TABLE sales ADD CONSTRAINT sales_pkey PRIMARY KEY (id)")
+    op.execute("CREATE UNIQUE INDEX ix_sales_order_number ON sales (order_number)")
+    op.execute("CREATE UNIQUE INDEX ix_sales_invoice_number ON sales (invoice_number)")
+    op.execute("ALTER TABLE sales ADD CONSTRAINT sales_product_id_fkey FOREIGN KEY (product_id) REFERENCES products (id)")
+    op.execute("ALTER TABLE sales ADD CONSTRAINT sales_pharmacy_id_fkey FOREIGN KEY (pharmacy_id) REFERENCES pharmacies (id)")
+    op.execute("ALTER TABLE sales ADD CONSTRAINT sales_sales_rep_id_fkey FOREIGN KEY (sales_rep_id) REFERENCES users (id)")
+    for statement in INDEXES:
+        op.execute(statement)
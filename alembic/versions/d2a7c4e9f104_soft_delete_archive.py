@@ -0,0 +1,58 @@
+"""soft-delete timestamps and archive tables
+
+Revision ID: d2a7c4e9f104
+Revises: b8d5e1f3a703
+Create Date: 2026-10-18 12:00:00.000000
+
+Adds ``deleted_at`` to sales, products and pharmacies, backfilled from
+``updated_at`` for rows that are already soft-deleted, a partial index
+over soft-deleted sales, and the archived_* tables the compaction job
+moves expired rows into.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.models.archive import archived_sales, archived_products, archived_pharmacies
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a7c4e9f104'
+down_revision = 'b8d5e1f3a703'
+branch_labels = None
+depends_on = None
+
+
+TABLES = ('sales', 'products', 'pharmacies')
+ARCHIVE_TABLES = (archived_sales, archived_products, archived_pharmacies)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    for table in TABLES:
+        columns = {column['name'] for column in inspector.get_columns(table)}
+        if 'deleted_at' not in columns:
+            op.add_column(table, sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+        op.execute(
+            f"UPDATE {table} SET deleted_at = COALESCE(updated_at, created_at) "
+            f"WHERE is_active = false AND deleted_at IS NULL"
+        )
+
+    if 'ix_sales_deleted_at' not in {index['name'] for index in inspector.get_indexes('sales')}:
+        where = sa.text('is_active = false' if bind.dialect.name == 'postgresql' else 'is_active = 0')
+        op.create_index('ix_sales_deleted_at', 'sales', ['deleted_at'], postgresql_where=where, sqlite_where=where)
+
+    for table in ARCHIVE_TABLES:
+        table.create(bind, checkfirst=True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for table in ARCHIVE_TABLES:
+        table.drop(bind, checkfirst=True)
+
+    op.drop_index('ix_sales_deleted_at', table_name='sales')
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('deleted_at')
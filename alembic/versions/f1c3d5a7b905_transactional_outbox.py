@@ -0,0 +1,35 @@
+"""transactional outbox
+
+Revision ID: f1c3d5a7b905
+Revises: d2a7c4e9f104
+Create Date: 2026-10-18 13:00:00.000000
+
+Creates outbox_events, written in the same transaction as each sale
+change, and outbox_checkpoints, which records how far each consumer has
+read.
+"""
+from alembic import op
+
+from backend.models.outbox import OutboxEvent, OutboxCheckpoint
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c3d5a7b905'
+down_revision = 'd2a7c4e9f104'
+branch_labels = None
+depends_on = None
+
+
+TABLES = (OutboxEvent.__table__, OutboxCheckpoint.__table__)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for table in TABLES:
+        table.create(bind, checkfirst=True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for table in reversed(TABLES):
+        table.drop(bind, checkfirst=True)
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from typing import Dict
+
+from fastapi import HTTPException, Request, status
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Bulkhead:
+    """Concurrency limit with a bounded waiting queue for one class of routes.
+
+    Up to ``max_concurrent`` requests run at once and ``max_queue`` more may
+    wait for a slot; anything beyond that, or a request that waited longer
+    than ``queue_timeout`` seconds, is rejected straight away with a 503.
+    Limits are per worker process.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float, db_pool: str):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.db_pool = db_pool
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    def _reject(self, reason: str) -> HTTPException:
+        self.rejected += 1
+        logger.warning(f"🚦 {self.name} request rejected: {reason} ({self.active} running, {self.waiting} queued)")
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Too many concurrent {self.name} requests, please retry shortly",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)}
+        )
+
+    async def acquire(self) -> None:
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            raise self._reject("queue full")
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._reject("queue timeout")
+        finally:
+            self.waiting -= 1
+        self.active += 1
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "running": self.active,
+            "queued": self.waiting,
+            "rejected": self.rejected,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+        }
+
+
+bulkheads: Dict[str, Bulkhead] = {
+    "analytics": Bulkhead(
+        "analytics", settings.ANALYTICS_MAX_CONCURRENT, settings.ANALYTICS_MAX_QUEUE,
+        settings.ADMISSION_QUEUE_TIMEOUT_SECONDS, db_pool="replica"
+    ),
+    # Report routes write ReportGeneration rows; only the report data reads
+    # (in the background task) go to a replica
+    "reports": Bulkhead(
+        "reports", settings.REPORTS_MAX_CONCURRENT, settings.REPORTS_MAX_QUEUE,
+        settings.ADMISSION_QUEUE_TIMEOUT_SECONDS, db_pool="analytics"
+    ),
+    "exports": Bulkhead(
+        "exports", settings.EXPORTS_MAX_CONCURRENT, settings.EXPORTS_MAX_QUEUE,
+        settings.ADMISSION_QUEUE_TIMEOUT_SECONDS, db_pool="analytics"
+    ),
+}
+
+
+def admission(route_class: str):
+    """Dependency admitting a request through the ``route_class`` bulkhead.
+
+    Add it to a route's or router's ``dependencies`` so it runs before the
+    route's own dependencies: it also selects the connection pool ``get_db``
+    hands out for the rest of the request. The slot is held until the
+    response (including a streamed body or background task) is finished.
+    """
+    bulkhead = bulkheads[route_class]
+
+    async def admit(request: Request):
+        await bulkhead.acquire()
+        request.state.db_pool = bulkhead.db_pool
+        try:
+            yield
+        finally:
+            bulkhead.release()
+
+    return admit
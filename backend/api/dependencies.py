@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from typing import Optional
 from backend.database.base import get_db
 from backend.core.security import verify_token
+from backend.core.tracing import traced
 from backend.models.user import User, UserRole
 from backend.schemas.user import TokenData
 
@@ -11,6 +12,7 @@ from backend.schemas.user import TokenData
 security = HTTPBearer()
 
 
+@traced("auth.current_user")
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
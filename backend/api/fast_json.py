@@ -0,0 +1,136 @@
+from decimal import Decimal
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, Union, get_args, get_origin
+
+import orjson
+from fastapi import HTTPException, status
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.sql.util import find_tables
+
+
+def _default(value):
+    # Pydantic serializes Decimal as a JSON string
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode like FastAPI's default path: compact separators, UTF-8, UTC as ``Z``"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+class FastJSONResponse(Response):
+    """JSON response for content that is already shaped like the response model"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _is_float(annotation) -> bool:
+    if annotation is float:
+        return True
+    return get_origin(annotation) is Union and float in get_args(annotation)
+
+
+# orjson writes 1e-05 as 0.00001; emit repr() verbatim where Python uses exponent notation
+_Fragment = getattr(orjson, "Fragment", None)
+
+
+def _as_float(getter: Callable) -> Callable:
+    def get(row):
+        value = getter(row)
+        if value is None:
+            return None
+        value = float(value)
+        if _Fragment is not None and value and not 1e-4 <= abs(value) < 1e16:
+            return _Fragment(repr(value))
+        return value
+    return get
+
+
+class FieldSet:
+    """The columns and getters behind one response shape (all fields or a sparse subset)"""
+
+    def __init__(self, columns: List[Any], getters: List[Tuple[str, Callable]], tables: set):
+        self.columns = columns
+        self.getters = getters
+        self.tables = tables
+
+    def uses(self, entity) -> bool:
+        """Whether any selected column comes from ``entity`` (a model or alias), i.e. it must be joined"""
+        return inspect(entity).selectable in self.tables
+
+    def encode_all(self, rows) -> list:
+        getters = self.getters
+        return [{name: get(row) for name, get in getters} for row in rows]
+
+
+class RowEncoder:
+    """Turns selected column tuples into ``schema``-shaped dicts without ORM hydration.
+
+    ``columns`` maps response fields (and helper labels used by ``computed``)
+    to SQL expressions; ``computed`` derives the remaining fields from the
+    row, reading the labels listed for it in ``requires``. Keys come out in
+    the schema's field order and float fields are coerced as Pydantic
+    would, so the encoded JSON matches the ``response_model`` output byte
+    for byte.
+    """
+
+    def __init__(
+        self,
+        schema: Type[BaseModel],
+        columns: Dict[str, Any],
+        computed: Optional[Dict[str, Callable]] = None,
+        requires: Optional[Dict[str, Sequence[str]]] = None
+    ):
+        computed = computed or {}
+        requires = requires or {}
+        missing = set(schema.model_fields) - set(columns) - set(computed)
+        if missing:
+            raise ValueError(f"{schema.__name__} fields without a column or getter: {sorted(missing)}")
+
+        self.schema = schema
+        self.labelled = {name: expression.label(name) for name, expression in columns.items()}
+        self.tables = {
+            name: set(find_tables(column, check_columns=True, include_aliases=True)) for name, column in self.labelled.items()
+        }
+        self.requires = {}
+        self.getters = {}
+        for name, field in schema.model_fields.items():
+            self.requires[name] = tuple(requires.get(name, ())) if name in computed else (name,)
+            getter = computed.get(name) or attrgetter(name)
+            if _is_float(field.annotation):
+                getter = _as_float(getter)
+            self.getters[name] = getter
+
+        unknown = {label for labels in self.requires.values() for label in labels} - set(columns)
+        if unknown:
+            raise ValueError(f"{schema.__name__} getters require unknown columns: {sorted(unknown)}")
+
+        self.all_fields = self._field_set(list(schema.model_fields))
+
+    def _field_set(self, names: List[str]) -> FieldSet:
+        labels = list(dict.fromkeys(label for name in names for label in self.requires[name]))
+        return FieldSet(
+            columns=[self.labelled[label] for label in labels],
+            getters=[(name, self.getters[name]) for name in names],
+            tables=set().union(*(self.tables[label] for label in labels))
+        )
+
+    def select(self, fields: Optional[str] = None) -> FieldSet:
+        """Field set for a ``fields=`` query parameter (comma-separated; empty means all)"""
+        requested = {name.strip() for name in (fields or "").split(",") if name.strip()}
+        if not requested:
+            return self.all_fields
+
+        unknown = requested - set(self.getters)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+        return self._field_set([name for name in self.getters if name in requested])
@@ -0,0 +1,233 @@
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from typing import List, Optional
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import MutableHeaders
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
+
+from backend.api.dependencies import get_admin_user, get_current_active_user, get_current_user
+from backend.core.config import settings
+from backend.database.base import SessionLocal
+from backend.database.instrumentation import current_queries
+from backend.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# X-Profile values: return the profile instead of the response, or store it
+PROFILE_MODES = ("html", "speedscope", "store")
+PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+# (phase, path fragments) - the innermost matching frame owns its samples,
+# except that validation inside dependency resolution stays with dependencies
+PHASES = [
+    ("sql", ("/sqlalchemy/", "/psycopg2/", "/sqlite3/", "/asyncpg/")),
+    ("pandas", ("/pandas/", "/numpy/")),
+    ("dependencies", ("/fastapi/dependencies/", "/fastapi/security/", "/backend/api/dependencies.py")),
+    ("serialization", ("/fastapi/encoders.py", "/pydantic/", "/pydantic_core/", "/orjson", "/json/",
+                       "/starlette/responses.py", "/fastapi/responses.py")),
+]
+
+# pyinstrument's synthetic frames for the time the profiled task was not running
+# (awaiting threadpool work, I/O or other tasks)
+WAIT_FRAMES = ("[await]", "[out-of-context]")
+
+
+def _phase_of(file_path: Optional[str]) -> Optional[str]:
+    if not file_path:
+        return None
+    file_path = file_path.replace("\\", "/")
+    for phase, fragments in PHASES:
+        if any(fragment in file_path for fragment in fragments):
+            return phase
+    return None
+
+
+def phase_breakdown(session, sql_seconds: Optional[float] = None) -> dict:
+    """Milliseconds per phase of a profiled request.
+
+    Only the request's own task is sampled. ``sql`` is the measured statement
+    time (``sql_seconds``) when given, wherever the statements ran; the other
+    phases come from the samples. ``unsampled_threads`` is the rest of the
+    wall time: the task waiting on threadpool work (sync endpoints and
+    dependencies), I/O or other tasks, less the SQL run meanwhile.
+    """
+    totals = {phase: 0.0 for phase, _ in PHASES}
+    totals["other"] = 0.0
+    waiting = 0.0
+
+    root = session.root_frame()
+    stack = [(root, "other")] if root is not None else []
+    while stack:
+        frame, parent_phase = stack.pop()
+        self_time = max(frame.time - sum(child.time for child in frame.children), 0.0)
+        if frame.identifier in WAIT_FRAMES:
+            waiting += self_time
+            continue
+        phase = _phase_of(frame.file_path) or parent_phase
+        if parent_phase == "dependencies" and phase == "serialization":
+            phase = "dependencies"
+        totals[phase] += self_time
+        stack.extend((child, phase) for child in frame.children)
+
+    sampled = sum(totals.values()) + waiting
+    if sql_seconds is not None:
+        # SQL beyond what was sampled on the task ran while it waited
+        waiting -= max(sql_seconds - totals["sql"], 0.0)
+        totals["sql"] = sql_seconds
+    totals["unsampled_threads"] = max(waiting + session.duration - sampled, 0.0)
+
+    return {phase: round(seconds * 1000, 1) for phase, seconds in totals.items()}
+
+
+def _admin_for(request: Request) -> User:
+    """Same checks as the get_admin_user dependency, for the bearer token on ``request``"""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+
+    db = SessionLocal()
+    try:
+        credentials = HTTPAuthorizationCredentials(scheme=scheme, credentials=token)
+        return get_admin_user(get_current_active_user(get_current_user(credentials, db)))
+    finally:
+        db.close()
+
+
+def _profile_path(profile_id: str, suffix: str) -> str:
+    return os.path.join(settings.PROFILES_DIR, f"{profile_id}{suffix}")
+
+
+def _store(profile_id: str, session, metadata: dict) -> None:
+    os.makedirs(settings.PROFILES_DIR, exist_ok=True)
+    session.save(_profile_path(profile_id, ".pyisession"))
+    with open(_profile_path(profile_id, ".meta.json"), "w") as meta_file:
+        json.dump(metadata, meta_file)
+
+    # Keep only the newest profiles
+    for stale in list_profiles()[settings.PROFILES_KEPT:]:
+        delete_profile(stale["id"])
+
+
+def render_profile(session, format_type: str) -> Response:
+    from pyinstrument.renderers import HTMLRenderer, SpeedscopeRenderer
+
+    if format_type == "speedscope":
+        content, media_type, extension = SpeedscopeRenderer().render(session), "application/json", "speedscope.json"
+    else:
+        content, media_type, extension = HTMLRenderer().render(session), "text/html", "html"
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="profile-{int(session.start_time)}.{extension}"'}
+    )
+
+
+def list_profiles() -> List[dict]:
+    """Stored profiles, newest first"""
+    if not os.path.isdir(settings.PROFILES_DIR):
+        return []
+    profiles = []
+    for name in os.listdir(settings.PROFILES_DIR):
+        if name.endswith(".meta.json"):
+            try:
+                with open(os.path.join(settings.PROFILES_DIR, name)) as meta_file:
+                    profiles.append(json.load(meta_file))
+            except (OSError, ValueError):
+                continue
+    return sorted(profiles, key=lambda profile: profile["created_at"], reverse=True)
+
+
+def load_profile(profile_id: str):
+    """Stored pyinstrument session, or None"""
+    from pyinstrument.session import Session
+
+    path = _profile_path(profile_id, ".pyisession")
+    if not PROFILE_ID.match(profile_id) or not os.path.exists(path):
+        return None
+    return Session.load(path)
+
+
+def delete_profile(profile_id: str) -> bool:
+    deleted = False
+    if PROFILE_ID.match(profile_id):
+        for suffix in (".pyisession", ".meta.json"):
+            try:
+                os.remove(_profile_path(profile_id, suffix))
+                deleted = True
+            except FileNotFoundError:
+                pass
+    return deleted
+
+
+async def profile_request(request: Request, call_next) -> Response:
+    """Run one request under the sampling profiler (X-Profile header, admins only).
+
+    ``html``/``speedscope`` replace the response with the profile as a
+    download; ``store`` returns the normal response with an X-Profile-Id
+    header and keeps the profile for the diagnostics endpoints.
+    """
+    mode = request.headers[settings.PROFILING_HEADER].strip().lower()
+    if mode not in PROFILE_MODES:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"detail": f"{settings.PROFILING_HEADER} must be one of: {', '.join(PROFILE_MODES)}"}
+        )
+    try:
+        admin = await run_in_threadpool(_admin_for, request)
+    except HTTPException as e:
+        return JSONResponse(status_code=e.status_code, content={"detail": e.detail}, headers=e.headers)
+
+    from pyinstrument import Profiler
+
+    # Set by the middleware; also counts the admin check's statements, so take a delta
+    queries = current_queries.get()
+    sql_before = queries.seconds if queries is not None else 0.0
+
+    # Async mode samples only this request's task (and the tasks it spawns)
+    profiler = Profiler(interval=settings.PROFILING_INTERVAL_SECONDS, async_mode="enabled")
+    profiler.start()
+    try:
+        response = await call_next(request)
+        # Streaming bodies are produced while they are read: include that work
+        body = b"".join([chunk async for chunk in response.body_iterator])
+    finally:
+        session = profiler.stop()
+
+    phases = phase_breakdown(session, queries.seconds - sql_before if queries is not None else None)
+    logger.info(
+        f"🔬 Profiled {request.method} {request.url.path} for {admin.username}: "
+        f"{session.duration * 1000:.1f} ms {phases}"
+    )
+
+    if mode != "store":
+        profile = render_profile(session, mode)
+        profile.headers["X-Profile-Status"] = str(response.status_code)
+        profile.headers["X-Profile-Phases"] = ", ".join(f"{phase}={ms}" for phase, ms in phases.items())
+        return profile
+
+    profile_id = uuid.uuid4().hex
+    await run_in_threadpool(_store, profile_id, session, {
+        "id": profile_id,
+        "created_at": time.time(),
+        "method": request.method,
+        "path": request.url.path,
+        "query": request.url.query,
+        "status_code": response.status_code,
+        "user": admin.username,
+        "duration_ms": round(session.duration * 1000, 1),
+        "phases_ms": phases,
+    })
+    # Raw headers: repeated ones (Set-Cookie) must survive
+    profiled = Response(content=body, status_code=response.status_code)
+    profiled.raw_headers = [(key, value) for key, value in response.headers.raw if key != b"content-length"]
+    headers = MutableHeaders(raw=profiled.raw_headers)
+    headers["Content-Length"] = str(len(body))
+    headers["X-Profile-Id"] = profile_id
+    return profiled
@@ -1,4 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from backend.api.admission import admission
+from backend.core.memory import measure_request_memory
 from .auth import router as auth_router
 from .users import router as users_router
 from .sales import router as sales_router
@@ -6,6 +8,7 @@ from .products import router as products_router
 from .pharmacies import router as pharmacies_router
 from .analytics import router as analytics_router
 from .reports import router as reports_router
+from .diagnostics import router as diagnostics_router
 
 api_router = APIRouter()
 
@@ -15,5 +18,16 @@ api_router.include_router(users_router, prefix="/users", tags=["Users"])
 api_router.include_router(sales_router, prefix="/sales", tags=["Sales"])
 api_router.include_router(products_router, prefix="/products", tags=["Products"])
 api_router.include_router(pharmacies_router, prefix="/pharmacies", tags=["Pharmacies"])
-api_router.include_router(analytics_router, prefix="/analytics", tags=["Analytics"])
-api_router.include_router(reports_router, prefix="/reports", tags=["Reports"])
\ No newline at end of file
+api_router.include_router(diagnostics_router, prefix="/diagnostics", tags=["Diagnostics"])
+
+# Analytical routes are admission-controlled and use the analytics pool;
+# their peak memory is recorded while request peak mode is on (per route
+# for reports, see reports.py)
+api_router.include_router(
+    analytics_router, prefix="/analytics", tags=["Analytics"],
+    dependencies=[Depends(admission("analytics")), Depends(measure_request_memory)]
+)
+api_router.include_router(
+    reports_router, prefix="/reports", tags=["Reports"],
+    dependencies=[Depends(admission("reports"))]
+)
\ No newline at end of file
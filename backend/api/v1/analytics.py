@@ -19,6 +19,8 @@ from backend.models.sales import Sale
 from backend.models.products import Product, ProductCategory
 from backend.models.pharmacies import Pharmacy
 from backend.models.user import User
+from backend.core.tracing import span
+from backend.services.categories import category_subtree, rollup_categories, sale_in_category
 
 router = APIRouter()
 
@@ -29,6 +31,7 @@ async def get_sales_performance(
     end_date: Optional[date] = Query(None, description="End date"), 
     period: str = Query("monthly", regex="^(daily|weekly|monthly|quarterly)$"),
     compare_previous: bool = Query(True, description="Compare with previous period"),
+    category_id: Optional[int] = Query(None, description="Restrict to a category and its subcategories"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_analyst_or_admin_user)
 ):
@@ -54,6 +57,10 @@ async def get_sales_performance(
         Sale.sale_date <= end_date
     )
     
+    # Category subtree filter (closure table), shared by all queries below
+    category_filters = [sale_in_category(category_id)] if category_id else []
+    query = query.filter(*category_filters)
+    
     sales = query.all()
     
     if not sales:
@@ -66,60 +73,61 @@ async def get_sales_performance(
             top_pharmacies=[]
         )
     
-    # Create DataFrame for analysis
-    df = pd.DataFrame([
-        {
-            'sale_date': sale.sale_date,
-            'revenue': float(sale.final_amount),
-            'quantity': sale.quantity,
-            'product_id': sale.product_id,
-            'pharmacy_id': sale.pharmacy_id
-        }
-        for sale in sales
-    ])
-    
-    # Group by period
-    df['period_key'] = pd.to_datetime(df['sale_date'])
-    
-    if period == "daily":
-        df['period_key'] = df['period_key'].dt.date
-    elif period == "weekly":
-        df['period_key'] = df['period_key'].dt.to_period('W').dt.start_time.dt.date
-    elif period == "monthly":
-        df['period_key'] = df['period_key'].dt.to_period('M').dt.start_time.dt.date
-    else:  # quarterly
-        df['period_key'] = df['period_key'].dt.to_period('Q').dt.start_time.dt.date
-    
-    # Aggregate by period
-    period_data = df.groupby('period_key').agg({
-        'revenue': 'sum',
-        'quantity': 'sum',
-        'product_id': 'count'
-    }).reset_index()
-    
-    period_data.columns = ['period', 'revenue', 'quantity', 'orders']
-    
-    # Convert to data points
-    data_points = [
-        {
-            'period': str(row['period']),
-            'revenue': float(row['revenue']),
-            'quantity': int(row['quantity']),
-            'orders': int(row['orders']),
-            'average_order_value': float(row['revenue'] / row['orders']) if row['orders'] > 0 else 0
-        }
-        for _, row in period_data.iterrows()
-    ]
-    
-    total_revenue = Decimal(str(df['revenue'].sum()))
-    
-    # Calculate growth if comparison is requested
-    revenue_growth = None
-    if compare_previous and len(period_data) > 1:
-        recent_revenue = period_data['revenue'].iloc[-1]
-        previous_revenue = period_data['revenue'].iloc[-2]
-        if previous_revenue > 0:
-            revenue_growth = Decimal(str(((recent_revenue - previous_revenue) / previous_revenue) * 100))
+    with span("pandas.sales_performance", rows=len(sales), period=period):
+        # Create DataFrame for analysis
+        df = pd.DataFrame([
+            {
+                'sale_date': sale.sale_date,
+                'revenue': float(sale.final_amount),
+                'quantity': sale.quantity,
+                'product_id': sale.product_id,
+                'pharmacy_id': sale.pharmacy_id
+            }
+            for sale in sales
+        ])
+        
+        # Group by period
+        df['period_key'] = pd.to_datetime(df['sale_date'])
+        
+        if period == "daily":
+            df['period_key'] = df['period_key'].dt.date
+        elif period == "weekly":
+            df['period_key'] = df['period_key'].dt.to_period('W').dt.start_time.dt.date
+        elif period == "monthly":
+            df['period_key'] = df['period_key'].dt.to_period('M').dt.start_time.dt.date
+        else:  # quarterly
+            df['period_key'] = df['period_key'].dt.to_period('Q').dt.start_time.dt.date
+        
+        # Aggregate by period
+        period_data = df.groupby('period_key').agg({
+            'revenue': 'sum',
+            'quantity': 'sum',
+            'product_id': 'count'
+        }).reset_index()
+        
+        period_data.columns = ['period', 'revenue', 'quantity', 'orders']
+        
+        # Convert to data points
+        data_points = [
+            {
+                'period': str(row['period']),
+                'revenue': float(row['revenue']),
+                'quantity': int(row['quantity']),
+                'orders': int(row['orders']),
+                'average_order_value': float(row['revenue'] / row['orders']) if row['orders'] > 0 else 0
+            }
+            for _, row in period_data.iterrows()
+        ]
+        
+        total_revenue = Decimal(str(df['revenue'].sum()))
+        
+        # Calculate growth if comparison is requested
+        revenue_growth = None
+        if compare_previous and len(period_data) > 1:
+            recent_revenue = period_data['revenue'].iloc[-1]
+            previous_revenue = period_data['revenue'].iloc[-2]
+            if previous_revenue > 0:
+                revenue_growth = Decimal(str(((recent_revenue - previous_revenue) / previous_revenue) * 100))
     
     # Get top products
     top_products_query = db.query(
@@ -131,7 +139,8 @@ async def get_sales_performance(
      .filter(
          Sale.is_active == True,
          Sale.sale_date >= start_date,
-         Sale.sale_date <= end_date
+         Sale.sale_date <= end_date,
+         *category_filters
      )\
      .group_by(Product.id, Product.name, Product.code)\
      .order_by(desc('revenue'))\
@@ -158,7 +167,8 @@ async def get_sales_performance(
      .filter(
          Sale.is_active == True,
          Sale.sale_date >= start_date,
-         Sale.sale_date <= end_date
+         Sale.sale_date <= end_date,
+         *category_filters
      )\
      .group_by(Pharmacy.id, Pharmacy.name, Pharmacy.city)\
      .order_by(desc('revenue'))\
@@ -191,6 +201,8 @@ async def get_market_share_analysis(
     region: Optional[str] = Query(None, description="Geographic region"),
     start_date: Optional[date] = Query(None, description="Start date"),
     end_date: Optional[date] = Query(None, description="End date"),
+    category_id: Optional[int] = Query(None, description="Category subtree to analyze"),
+    rollup: bool = Query(False, description="Aggregate by the child categories of category_id (or the root categories), including their subcategories"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_analyst_or_admin_user)
 ):
@@ -205,24 +217,34 @@ async def get_market_share_analysis(
     # This would typically integrate with external market data
     # For now, we'll provide internal analysis
     
-    query = db.query(
-        ProductCategory.name,
+    query = db.query(Sale).join(Sale.product)
+    
+    if rollup:
+        # One group per subtree at the requested level of the category tree
+        query, group_category = rollup_categories(query, category_id)
+    else:
+        group_category = ProductCategory
+        query = query.join(Product.category)
+        if category_id:
+            query = query.filter(Product.category_id.in_(category_subtree(category_id)))
+    
+    query = query.with_entities(
+        group_category.name,
         func.sum(Sale.final_amount).label('our_revenue'),
         func.count(Sale.id).label('our_orders')
-    ).join(Sale.product).join(Product.category)\
-     .filter(
-         Sale.is_active == True,
-         Sale.sale_date >= start_date,
-         Sale.sale_date <= end_date
-     )
+    ).filter(
+        Sale.is_active == True,
+        Sale.sale_date >= start_date,
+        Sale.sale_date <= end_date
+    )
     
     if category:
-        query = query.filter(ProductCategory.name.ilike(f"%{category}%"))
+        query = query.filter(group_category.name.ilike(f"%{category}%"))
     
     if region:
         query = query.filter(Sale.region.ilike(f"%{region}%"))
     
-    results = query.group_by(ProductCategory.name)\
+    results = query.group_by(group_category.name)\
         .order_by(desc('our_revenue'))\
         .all()
     
@@ -301,9 +323,9 @@ async def get_dashboard_summary(
         for p in top_products_query
     ]
     
-    # Recent sales
+    # Recent sales (bounded to the analysed window so partitions can be pruned)
     recent_sales_query = db.query(Sale)\
-        .filter(Sale.is_active == True)\
+        .filter(Sale.is_active == True, Sale.sale_date >= start_date)\
         .order_by(desc(Sale.created_at))\
         .limit(10)\
         .all()
@@ -397,50 +419,51 @@ async def get_trend_analysis(
             "analysis_period": period
         }
     
-    # Create DataFrame for analysis
-    df = pd.DataFrame([
-        {
-            'date': sale.sale_date,
-            'revenue': float(sale.final_amount),
-            'orders': 1
-        }
-        for sale in sales
-    ])
-    
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.set_index('date')
-    
-    # Resample by period
-    if period == "daily":
-        df_resampled = df.resample('D').sum()
-    elif period == "weekly":
-        df_resampled = df.resample('W').sum()
-    else:  # monthly
-        df_resampled = df.resample('M').sum()
-    
-    # Simple trend analysis
-    values = df_resampled[metric].values
-    if len(values) > 2:
-        # Calculate simple linear trend
-        x = range(len(values))
-        slope = (values[-1] - values[0]) / (len(values) - 1)
+    with span("pandas.trends", rows=len(sales), period=period):
+        # Create DataFrame for analysis
+        df = pd.DataFrame([
+            {
+                'date': sale.sale_date,
+                'revenue': float(sale.final_amount),
+                'orders': 1
+            }
+            for sale in sales
+        ])
         
-        trend_direction = "increasing" if slope > 0 else "decreasing" if slope < 0 else "stable"
-        trend_strength = abs(slope) / (sum(values) / len(values)) if sum(values) > 0 else 0
-    else:
-        trend_direction = "stable"
-        trend_strength = 0
-    
-    # Simple forecasting (just extends the trend)
-    forecast_data = []
-    if len(values) > 0:
-        last_value = values[-1]
-        for i in range(1, forecast_periods + 1):
-            forecasted_value = last_value + (slope * i)
-            forecast_data.append({
-                'period': i,
-                'forecasted_value': max(0, forecasted_value)  # Ensure non-negative
-            })
+        df['date'] = pd.to_datetime(df['date'])
+        df = df.set_index('date')
+        
+        # Resample by period
+        if period == "daily":
+            df_resampled = df.resample('D').sum()
+        elif period == "weekly":
+            df_resampled = df.resample('W').sum()
+        else:  # monthly
+            df_resampled = df.resample('M').sum()
+        
+        # Simple trend analysis
+        values = df_resampled[metric].values
+        if len(values) > 2:
+            # Calculate simple linear trend
+            x = range(len(values))
+            slope = (values[-1] - values[0]) / (len(values) - 1)
+            
+            trend_direction = "increasing" if slope > 0 else "decreasing" if slope < 0 else "stable"
+            trend_strength = abs(slope) / (sum(values) / len(values)) if sum(values) > 0 else 0
+        else:
+            trend_direction = "stable"
+            trend_strength = 0
+        
+        # Simple forecasting (just extends the trend)
+        forecast_data = []
+        if len(values) > 0:
+            last_value = values[-1]
+            for i in range(1, forecast_periods + 1):
+                forecasted_value = last_value + (slope * i)
+                forecast_data.append({
+                    'period': i,
+                    'forecasted_value': max(0, forecasted_value)  # Ensure non-negative
+                })
     
     return {
         "analysis_name": f"{metric.title()} Trend Analysis",
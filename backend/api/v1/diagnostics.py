@@ -0,0 +1,207 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from starlette.concurrency import run_in_threadpool
+
+from backend.api.dependencies import get_admin_user
+from backend.api.profiling import delete_profile, list_profiles, load_profile, render_profile
+from backend.core.config import settings
+from backend.core.memory import live_objects, memory_profiler, request_peaks
+from backend.database.instrumentation import statement_stats
+from backend.models.user import User
+
+router = APIRouter()
+
+
+@router.get("/sql/top-statements")
+async def get_top_statements(
+    limit: int = Query(20, ge=1, le=200),
+    order_by: str = Query("total", regex="^(total|mean|max|calls)$"),
+    current_user: User = Depends(get_admin_user)
+):
+    """Statements with the highest cumulative (or mean/max) time in this worker since start or reset"""
+    return {
+        "order_by": order_by,
+        "statements": statement_stats.top(limit, order_by)
+    }
+
+
+@router.delete("/sql/top-statements", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_top_statements(
+    current_user: User = Depends(get_admin_user)
+):
+    """Start collecting statement totals afresh"""
+    statement_stats.reset()
+
+
+@router.get("/profiles")
+async def get_profiles(
+    current_user: User = Depends(get_admin_user)
+):
+    """Profiles stored with ``X-Profile: store``, newest first, with their time per phase"""
+    return {"profiles": await run_in_threadpool(list_profiles)}
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    format: str = Query("html", regex="^(html|speedscope)$"),
+    current_user: User = Depends(get_admin_user)
+):
+    """Download a stored profile as an HTML timeline or a speedscope flame graph"""
+    session = await run_in_threadpool(load_profile, profile_id)
+    if session is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return await run_in_threadpool(render_profile, session, format)
+
+
+@router.delete("/profiles/{profile_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_profile(
+    profile_id: str,
+    current_user: User = Depends(get_admin_user)
+):
+    """Delete a stored profile"""
+    if not await run_in_threadpool(delete_profile, profile_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+
+
+def _snapshot_not_found():
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Snapshot not found"
+    )
+
+
+@router.get("/memory")
+async def get_memory_status(
+    current_user: User = Depends(get_admin_user)
+):
+    """tracemalloc state, traced and resident memory, and the stored snapshots of this worker"""
+    return {
+        **memory_profiler.status(),
+        "request_peaks_enabled": request_peaks.enabled
+    }
+
+
+@router.post("/memory/tracemalloc/start")
+async def start_tracemalloc(
+    frames: int = Query(settings.MEMORY_TRACE_FRAMES, ge=1, le=100),
+    current_user: User = Depends(get_admin_user)
+):
+    """(Re)start tracing allocations, recording ``frames`` of traceback per allocation"""
+    memory_profiler.start(frames)
+    return memory_profiler.status()
+
+
+@router.post("/memory/tracemalloc/stop")
+async def stop_tracemalloc(
+    current_user: User = Depends(get_admin_user)
+):
+    """Stop tracing allocations (and with it request peak mode); snapshots are kept"""
+    request_peaks.disable()
+    memory_profiler.stop()
+    return memory_profiler.status()
+
+
+@router.post("/memory/snapshots", status_code=status.HTTP_201_CREATED)
+async def take_memory_snapshot(
+    limit: int = Query(20, ge=1, le=200),
+    current_user: User = Depends(get_admin_user)
+):
+    """Snapshot the live traced allocations and show the largest allocation sites"""
+    try:
+        snapshot_id = await run_in_threadpool(memory_profiler.take_snapshot)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    return {
+        "id": snapshot_id,
+        "top": await run_in_threadpool(memory_profiler.top, snapshot_id, "lineno", limit)
+    }
+
+
+@router.get("/memory/snapshots/diff")
+async def diff_memory_snapshots(
+    base: str,
+    target: str,
+    group_by: str = Query("lineno", regex="^(lineno|filename|traceback)$"),
+    limit: int = Query(20, ge=1, le=200),
+    current_user: User = Depends(get_admin_user)
+):
+    """Allocation sites whose retained memory grew most between two snapshots"""
+    growth = await run_in_threadpool(memory_profiler.diff, base, target, group_by, limit)
+    if growth is None:
+        raise _snapshot_not_found()
+    return {"base": base, "target": target, "group_by": group_by, "statistics": growth}
+
+
+@router.get("/memory/snapshots/{snapshot_id}")
+async def get_memory_snapshot(
+    snapshot_id: str,
+    group_by: str = Query("lineno", regex="^(lineno|filename|traceback)$"),
+    limit: int = Query(20, ge=1, le=200),
+    current_user: User = Depends(get_admin_user)
+):
+    """Top retainers of one snapshot, by line, file or full allocation traceback"""
+    top = await run_in_threadpool(memory_profiler.top, snapshot_id, group_by, limit)
+    if top is None:
+        raise _snapshot_not_found()
+    return {"id": snapshot_id, "group_by": group_by, "statistics": top}
+
+
+@router.delete("/memory/snapshots/{snapshot_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_memory_snapshot(
+    snapshot_id: str,
+    current_user: User = Depends(get_admin_user)
+):
+    """Free a stored snapshot"""
+    if not memory_profiler.delete(snapshot_id):
+        raise _snapshot_not_found()
+
+
+@router.get("/memory/objects")
+async def get_live_objects(
+    limit: int = Query(20, ge=1, le=200),
+    current_user: User = Depends(get_admin_user)
+):
+    """Live object counts by type after a full collection (DataFrames, ORM states, ...); slow on big heaps"""
+    return {"objects": await run_in_threadpool(live_objects, limit)}
+
+
+@router.get("/memory/request-peaks")
+async def get_request_peaks(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(get_admin_user)
+):
+    """Analytics and report requests with the highest peak traced memory"""
+    return {
+        "enabled": request_peaks.enabled,
+        "measurements": request_peaks.top(limit)
+    }
+
+
+@router.put("/memory/request-peaks")
+async def set_request_peaks(
+    enabled: bool,
+    current_user: User = Depends(get_admin_user)
+):
+    """Turn request peak mode on (starting tracemalloc if needed) or off"""
+    if enabled:
+        request_peaks.enable()
+    else:
+        request_peaks.disable()
+    return {"enabled": request_peaks.enabled}
+
+
+@router.delete("/memory/request-peaks", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_request_peaks(
+    current_user: User = Depends(get_admin_user)
+):
+    """Forget the recorded request peaks"""
+    request_peaks.reset()
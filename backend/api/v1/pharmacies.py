@@ -1,11 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, or_
 from typing import List, Optional
+from datetime import datetime, timezone
+from decimal import Decimal
 
 from backend.database.base import get_db
+from backend.api.fast_json import FastJSONResponse, RowEncoder
 from backend.api.dependencies import get_current_active_user, get_admin_user
+from backend.services.autocomplete import pharmacy_index, refresh_pharmacy_index
+from backend.services.catalog_import import ImportFileError, read_import_upload, import_pharmacies
+from backend.services.pharmacy_counters import reconcile_pharmacy_counters
 from backend.schemas.pharmacies import PharmacyCreate, PharmacyUpdate, PharmacyResponse
+from backend.schemas.imports import CatalogImportResponse
 from backend.models.pharmacies import Pharmacy, PharmacyType, CustomerType
 from backend.models.user import User
 
@@ -35,6 +43,26 @@ async def create_pharmacy(
     return _enrich_pharmacy_response(db_pharmacy)
 
 
+@router.post("/import", response_model=CatalogImportResponse)
+async def import_pharmacies_file(
+    file: UploadFile = File(..., description="CSV, XLSX or NDJSON file, one pharmacy per row"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Bulk import pharmacies, upserting on code (Admin only)"""
+    
+    try:
+        file_format, rows = await read_import_upload(file)
+    except ImportFileError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    
+    # Set-based batches; run off the event loop
+    report = await run_in_threadpool(import_pharmacies, db, rows)
+    await run_in_threadpool(refresh_pharmacy_index, db)
+    
+    return CatalogImportResponse(entity="pharmacies", file_format=file_format, **report)
+
+
 @router.get("/", response_model=List[PharmacyResponse])
 async def get_pharmacies(
     skip: int = Query(0, ge=0),
@@ -44,12 +72,17 @@ async def get_pharmacies(
     customer_type: Optional[CustomerType] = None,
     state: Optional[str] = None,
     is_active: Optional[bool] = True,
+    min_annual_volume: Optional[Decimal] = Query(None, ge=0, description="Minimum trailing-year sales volume"),
+    sort_by: str = Query("name", regex="^(name|annual_volume|average_order_value|last_order_date)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields (default: all)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get pharmacies with filtering and search"""
     
-    query = db.query(Pharmacy).filter(Pharmacy.is_active == True)
+    # Select only the requested columns; rows are encoded without ORM hydration
+    fieldset = PHARMACY_LIST.select(fields)
+    query = db.query(*fieldset.columns).select_from(Pharmacy).filter(Pharmacy.is_active == True)
     
     # Apply filters
     if search:
@@ -75,13 +108,20 @@ async def get_pharmacies(
     if is_active is not None:
         query = query.filter(Pharmacy.is_active == is_active)
     
+    # Performance counters are maintained on the pharmacy row, no sales scan
+    if min_annual_volume is not None:
+        query = query.filter(Pharmacy.annual_volume >= min_annual_volume)
+    
+    if sort_by != "name":
+        query = query.order_by(desc(getattr(Pharmacy, sort_by)))
+    
     # Get pharmacies with pagination
-    pharmacies = query.order_by(Pharmacy.name)\
+    rows = query.order_by(Pharmacy.name)\
         .offset(skip)\
         .limit(limit)\
         .all()
     
-    return [_enrich_pharmacy_response(pharmacy) for pharmacy in pharmacies]
+    return FastJSONResponse(fieldset.encode_all(rows))
 
 
 @router.get("/{pharmacy_id}", response_model=PharmacyResponse)
@@ -165,9 +205,22 @@ async def delete_pharmacy(
         )
     
     pharmacy.is_active = False
+    pharmacy.deleted_at = datetime.now(timezone.utc)
     db.commit()
 
 
+@router.post("/counters/reconcile")
+async def reconcile_counters(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Recompute pharmacy performance counters from sales (Admin only)"""
+    
+    updated = await run_in_threadpool(reconcile_pharmacy_counters, db)
+    
+    return {"pharmacies_updated": updated}
+
+
 @router.get("/search/suggestions")
 async def get_pharmacy_suggestions(
     query: str = Query(..., min_length=2, description="Search query"),
@@ -177,6 +230,10 @@ async def get_pharmacy_suggestions(
 ):
     """Get pharmacy suggestions for autocomplete"""
     
+    # Served from the in-memory prefix index once it has been built
+    if pharmacy_index.ready:
+        return pharmacy_index.search(query, limit)
+    
     search_filter = f"%{query}%"
     
     pharmacies = db.query(Pharmacy)\
@@ -233,6 +290,7 @@ def _enrich_pharmacy_response(pharmacy: Pharmacy) -> dict:
         "territory": pharmacy.territory,
         "population_density": pharmacy.population_density,
         "annual_volume": pharmacy.annual_volume,
+        "annual_order_count": pharmacy.annual_order_count,
         "average_order_value": pharmacy.average_order_value,
         "last_order_date": pharmacy.last_order_date,
         "notes": pharmacy.notes,
@@ -244,4 +302,29 @@ def _enrich_pharmacy_response(pharmacy: Pharmacy) -> dict:
         # Computed fields
         "full_address": pharmacy.full_address,
         "location": pharmacy.location,
-    }
\ No newline at end of file
+    }
+
+
+def _full_address(row):
+    parts = [row.address_line1]
+    if row.address_line2:
+        parts.append(row.address_line2)
+    parts.extend([row.city, row.state])
+    if row.zip_code:
+        parts.append(row.zip_code)
+    return ", ".join(parts)
+
+
+# Column-level twin of _enrich_pharmacy_response for the list endpoint
+PHARMACY_LIST = RowEncoder(
+    PharmacyResponse,
+    columns={name: getattr(Pharmacy, name) for name in PharmacyResponse.model_fields if name in Pharmacy.__table__.c},
+    computed={
+        "full_address": _full_address,
+        "location": lambda row: f"{row.city}, {row.state}",
+    },
+    requires={
+        "full_address": ("address_line1", "address_line2", "city", "state", "zip_code"),
+        "location": ("city", "state"),
+    }
+)
@@ -1,12 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc, or_
+from sqlalchemy import desc
 from typing import List, Optional
+from datetime import datetime, timezone
 
 from backend.database.base import get_db
+from backend.database.search import apply_product_search
+from backend.services.autocomplete import product_index, refresh_product_index
+from backend.services.catalog_import import ImportFileError, read_import_upload, import_products
+from backend.services.categories import category_subtree, is_in_subtree
+from backend.api.fast_json import FastJSONResponse, RowEncoder
 from backend.api.dependencies import get_current_active_user, get_admin_user, get_analyst_or_admin_user
-from backend.schemas.products import ProductCreate, ProductUpdate, ProductResponse, ProductCategoryCreate, ProductCategoryResponse
+from backend.schemas.products import ProductCreate, ProductUpdate, ProductResponse, ProductCategoryCreate, ProductCategoryUpdate, ProductCategoryResponse
 from backend.models.products import Product, ProductCategory
+from backend.schemas.imports import CatalogImportResponse
 from backend.models.user import User
 
 router = APIRouter()
@@ -54,6 +62,58 @@ async def get_product_categories(
     return categories
 
 
+@router.put("/categories/{category_id}", response_model=ProductCategoryResponse)
+async def update_product_category(
+    category_id: int,
+    category_update: ProductCategoryUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Update a product category, including moving it in the tree (Admin only)"""
+    
+    db_category = db.query(ProductCategory)\
+        .filter(ProductCategory.id == category_id)\
+        .first()
+    
+    if not db_category:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product category not found"
+        )
+    
+    update_data = category_update.dict(exclude_unset=True)
+    
+    if 'name' in update_data and update_data['name'] != db_category.name:
+        if db.query(ProductCategory).filter(ProductCategory.name == update_data['name']).first():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Product category already exists"
+            )
+    
+    # A category cannot be moved under itself or one of its descendants
+    new_parent_id = update_data.get('parent_id')
+    if new_parent_id is not None and new_parent_id != db_category.parent_id:
+        if not db.query(ProductCategory).filter(ProductCategory.id == new_parent_id).first():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Parent category not found"
+            )
+        if is_in_subtree(db, new_parent_id, category_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A category cannot be moved under one of its subcategories"
+            )
+    
+    # Update fields (closure paths follow parent_id changes on flush)
+    for field, value in update_data.items():
+        setattr(db_category, field, value)
+    
+    db.commit()
+    db.refresh(db_category)
+    
+    return db_category
+
+
 # Product endpoints
 @router.post("/", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
 async def create_product(
@@ -91,47 +151,63 @@ async def create_product(
     return _enrich_product_response(db_product)
 
 
+@router.post("/import", response_model=CatalogImportResponse)
+async def import_products_file(
+    file: UploadFile = File(..., description="CSV, XLSX or NDJSON file, one product per row"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Bulk import products, upserting on code (Admin only)"""
+    
+    try:
+        file_format, rows = await read_import_upload(file)
+    except ImportFileError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    
+    # Set-based batches; run off the event loop
+    report = await run_in_threadpool(import_products, db, rows)
+    await run_in_threadpool(refresh_product_index, db)
+    
+    return CatalogImportResponse(entity="products", file_format=file_format, **report)
+
+
 @router.get("/", response_model=List[ProductResponse])
 async def get_products(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     search: Optional[str] = Query(None, description="Search by name, code, or brand"),
-    category_id: Optional[int] = None,
+    category_id: Optional[int] = Query(None, description="Category, including its subcategories"),
     is_active: Optional[bool] = True,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields (default: all)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get products with filtering and search"""
     
-    query = db.query(Product)\
-        .options(joinedload(Product.category))\
-        .filter(Product.is_active == True)
+    # Select only the requested columns; rows are encoded without ORM hydration
+    fieldset = PRODUCT_LIST.select(fields)
+    query = db.query(*fieldset.columns).select_from(Product)
+    if fieldset.uses(ProductCategory):
+        query = query.outerjoin(ProductCategory, Product.category_id == ProductCategory.id)
+    query = query.filter(Product.is_active == True)
     
-    # Apply filters
+    # Apply filters (indexed search, ranked by relevance)
     if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            or_(
-                Product.name.ilike(search_filter),
-                Product.code.ilike(search_filter),
-                Product.brand.ilike(search_filter),
-                Product.active_ingredient.ilike(search_filter)
-            )
-        )
+        query = apply_product_search(query, search)
     
     if category_id:
-        query = query.filter(Product.category_id == category_id)
+        query = query.filter(Product.category_id.in_(category_subtree(category_id)))
     
     if is_active is not None:
         query = query.filter(Product.is_available == is_active)
     
     # Get total count and paginate
-    products = query.order_by(Product.name)\
+    rows = query.order_by(Product.name)\
         .offset(skip)\
         .limit(limit)\
         .all()
     
-    return [_enrich_product_response(product) for product in products]
+    return FastJSONResponse(fieldset.encode_all(rows))
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
@@ -222,6 +298,7 @@ async def delete_product(
         )
     
     product.is_active = False
+    product.deleted_at = datetime.now(timezone.utc)
     db.commit()
 
 
@@ -234,18 +311,17 @@ async def get_product_suggestions(
 ):
     """Get product suggestions for autocomplete"""
     
-    search_filter = f"%{query}%"
+    # Served from the in-memory prefix index once it has been built
+    if product_index.ready:
+        return product_index.search(query, limit)
     
-    products = db.query(Product)\
+    products_query = db.query(Product)\
         .filter(
             Product.is_active == True,
-            Product.is_available == True,
-            or_(
-                Product.name.ilike(search_filter),
-                Product.code.ilike(search_filter),
-                Product.brand.ilike(search_filter)
-            )
-        )\
+            Product.is_available == True
+        )
+    
+    products = apply_product_search(products_query, query, columns=("name", "code", "brand"))\
         .order_by(Product.name)\
         .limit(limit)\
         .all()
@@ -293,4 +369,25 @@ def _enrich_product_response(product: Product) -> dict:
         # Related data
         "category_name": product.category.name if product.category else None,
         "full_description": product.full_description
-    }
\ No newline at end of file
+    }
+
+
+def _full_description(row):
+    parts = [row.name]
+    if row.dosage:
+        parts.append(f"({row.dosage})")
+    if row.package_size:
+        parts.append(f"- {row.package_size}")
+    return " ".join(parts)
+
+
+# Column-level twin of _enrich_product_response for the list endpoint
+PRODUCT_LIST = RowEncoder(
+    ProductResponse,
+    columns={
+        **{name: getattr(Product, name) for name in ProductResponse.model_fields if name in Product.__table__.c},
+        "category_name": ProductCategory.name,
+    },
+    computed={"full_description": _full_description},
+    requires={"full_description": ("name", "dosage", "package_size")}
+)
@@ -15,10 +15,15 @@ from backend.models.products import Product
 from backend.models.pharmacies import Pharmacy
 from backend.models.user import User
 from backend.core.config import settings
+from backend.core.memory import measure_request_memory, measured
+from backend.core.tracing import traced
 
 router = APIRouter()
 
 
+# Not measured per request: a yield dependency is closed only after the
+# background tasks, so it would cover the whole report run, which
+# _generate_report_file measures on its own
 @router.post("/generate", response_model=ReportResponse, status_code=status.HTTP_202_ACCEPTED)
 async def generate_report(
     report_request: ReportRequest,
@@ -55,7 +60,7 @@ async def generate_report(
     return _convert_to_response(db_report, current_user.full_name)
 
 
-@router.get("/", response_model=ReportListResponse)
+@router.get("/", response_model=ReportListResponse, dependencies=[Depends(measure_request_memory)])
 async def get_reports(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
@@ -99,7 +104,7 @@ async def get_reports(
     )
 
 
-@router.get("/{report_id}", response_model=ReportResponse)
+@router.get("/{report_id}", response_model=ReportResponse, dependencies=[Depends(measure_request_memory)])
 async def get_report(
     report_id: int,
     db: Session = Depends(get_db),
@@ -124,7 +129,7 @@ async def get_report(
     return _convert_to_response(report, "System")
 
 
-@router.get("/{report_id}/download")
+@router.get("/{report_id}/download", dependencies=[Depends(measure_request_memory)])
 async def download_report(
     report_id: int,
     db: Session = Depends(get_db),
@@ -172,7 +177,7 @@ async def download_report(
     )
 
 
-@router.delete("/{report_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{report_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(measure_request_memory)])
 async def delete_report(
     report_id: int,
     db: Session = Depends(get_db),
@@ -203,11 +208,14 @@ async def delete_report(
     db.commit()
 
 
+@measured("report generation")
 async def _generate_report_file(report_id: int, report_request: ReportRequest, user_id: int):
     """Background task to generate report file"""
-    from database.base import SessionLocal
+    from backend.database.base import AnalyticsSessionLocal, ReplicaSessionLocal
     
-    db = SessionLocal()
+    db = AnalyticsSessionLocal()
+    # Report data is read-only and may come from a read replica
+    replica_db = ReplicaSessionLocal()
     
     try:
         # Get report record
@@ -220,13 +228,13 @@ async def _generate_report_file(report_id: int, report_request: ReportRequest, u
         
         # Get data based on report type
         if report_request.report_type == ReportType.SALES_SUMMARY:
-            data = _get_sales_summary_data(db, report_request)
+            data = _get_sales_summary_data(replica_db, report_request)
         elif report_request.report_type == ReportType.MONTHLY_REPORT:
-            data = _get_monthly_report_data(db, report_request)
+            data = _get_monthly_report_data(replica_db, report_request)
         elif report_request.report_type == ReportType.PRODUCT_ANALYSIS:
-            data = _get_product_analysis_data(db, report_request)
+            data = _get_product_analysis_data(replica_db, report_request)
         else:
-            data = _get_sales_summary_data(db, report_request)  # Default
+            data = _get_sales_summary_data(replica_db, report_request)  # Default
         
         # Generate file
         file_path = _create_report_file(data, report_request, report_id)
@@ -250,9 +258,11 @@ async def _generate_report_file(report_id: int, report_request: ReportRequest, u
         db.commit()
         
     finally:
+        replica_db.close()
         db.close()
 
 
+@traced("report.sales_summary_data")
 def _get_sales_summary_data(db: Session, request: ReportRequest) -> List[dict]:
     """Get sales summary data"""
     
@@ -294,6 +304,7 @@ def _get_monthly_report_data(db: Session, request: ReportRequest) -> List[dict]:
     return _get_sales_summary_data(db, request)
 
 
+@traced("report.product_analysis_data")
 def _get_product_analysis_data(db: Session, request: ReportRequest) -> List[dict]:
     """Get product analysis data"""
     from sqlalchemy import func
@@ -328,6 +339,7 @@ def _get_product_analysis_data(db: Session, request: ReportRequest) -> List[dict
     ]
 
 
+@traced("report.write_file")
 def _create_report_file(data: List[dict], request: ReportRequest, report_id: int) -> str:
     """Create report file in specified format"""
     
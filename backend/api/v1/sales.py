@@ -1,20 +1,33 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc, and_, or_
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, aliased, joinedload
+from sqlalchemy import String, and_, cast, desc, func, insert, literal, literal_column, or_, select
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
-from datetime import datetime, date
+from datetime import datetime, date, timezone
 from decimal import Decimal
+from types import SimpleNamespace
 
+from backend.core.config import settings
 from backend.database.base import get_db
+from backend.api.admission import admission
 from backend.api.dependencies import get_current_active_user, get_admin_user
+from backend.api.fast_json import FastJSONResponse, RowEncoder
 from backend.schemas.sales import (
     SaleCreate, SaleUpdate, SaleResponse, SaleListResponse, 
-    SalesSummary, SalesFilters
+    SalesSummary, SalesFilters, SaleStatusBulkUpdate, SaleStatusBulkResponse, SaleStatusFilters
 )
 from backend.models.sales import Sale, SaleStatus, PaymentMethod
 from backend.models.user import User
 from backend.models.products import Product
 from backend.models.pharmacies import Pharmacy
+from backend.services.archive import compact_soft_deleted
+from backend.services.dimension_cache import product_cache, pharmacy_cache, user_cache
+from backend.services.sale_status import TRANSITION_COLUMNS, transition_sales
+from backend.services.sales_export import EXPORT_MEDIA_TYPES, sales_export_query, stream_sales_export
+from backend.services import pharmacy_counters  # registers the Sale -> Pharmacy counter listeners
+from backend.services import outbox  # registers the Sale -> outbox event listeners
 
 router = APIRouter()
 
@@ -27,51 +40,69 @@ async def create_sale(
 ):
     """Create a new sale"""
     
-    # Verify product exists
-    product = db.query(Product).filter(Product.id == sale.product_id).first()
+    # Verify product and pharmacy exist (cached; no query on a hit)
+    product = product_cache.get(db, sale.product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
     
-    # Verify pharmacy exists
-    pharmacy = db.query(Pharmacy).filter(Pharmacy.id == sale.pharmacy_id).first()
+    pharmacy = pharmacy_cache.get(db, sale.pharmacy_id)
     if not pharmacy:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Pharmacy not found"
         )
     
-    # Create sale object
-    db_sale = Sale(**sale.dict())
+    values = sale.dict()
     
     # Set sales rep if not specified
-    if not db_sale.sales_rep_id:
-        db_sale.sales_rep_id = current_user.id
+    if not values["sales_rep_id"]:
+        values["sales_rep_id"] = current_user.id
     
-    # Calculate totals
-    db_sale.calculate_totals()
-    
-    # Generate order number if not provided
-    if not db_sale.order_number:
-        db_sale.order_number = f"ORD-{datetime.now().strftime('%Y%m%d')}-{db.query(Sale).count() + 1:06d}"
+    # sale_date is the partition key; never leave it NULL
+    if not values["sale_date"]:
+        values["sale_date"] = datetime.now(timezone.utc)
     
-    db.add(db_sale)
-    db.commit()
-    db.refresh(db_sale)
+    # Calculate totals
+    values["discount_amount"] = values["discount_amount"] or 0
+    values["tax_amount"] = values["tax_amount"] or 0
+    values["total_price"], values["final_amount"] = Sale.compute_totals(
+        sale.quantity, sale.unit_price, values["discount_amount"], values["tax_amount"]
+    )
     
-    # Load related data
-    db_sale = db.query(Sale)\
-        .options(
-            joinedload(Sale.product),
-            joinedload(Sale.pharmacy),
-            joinedload(Sale.sales_rep)
-        )\
-        .filter(Sale.id == db_sale.id)\
-        .first()
+    try:
+        row = _insert_sale(db, values)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        product_cache.invalidate(sale.product_id)
+        pharmacy_cache.invalidate(sale.pharmacy_id)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Sale conflicts with existing data (unknown product/pharmacy or duplicate order/invoice number)"
+        )
     
-    return _enrich_sale_response(db_sale)
+    # Build the response from the returned row and the cached dimensions
+    if values["sales_rep_id"] == current_user.id:
+        sales_rep = {"first_name": current_user.first_name, "last_name": current_user.last_name}
+    else:
+        sales_rep = user_cache.get(db, values["sales_rep_id"]) or {"first_name": None, "last_name": None}
+    
+    response = SALE_LIST.all_fields.encode_all([SimpleNamespace(
+        **row._mapping,
+        product_name=product["name"],
+        product_code=product["code"],
+        product_cost_price=product["cost_price"],
+        pharmacy_name=pharmacy["name"],
+        pharmacy_city=pharmacy["city"],
+        pharmacy_state=pharmacy["state"],
+        sales_rep_first_name=sales_rep["first_name"],
+        sales_rep_last_name=sales_rep["last_name"]
+    )])[0]
+    
+    return FastJSONResponse(response, status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/", response_model=SaleListResponse)
@@ -84,55 +115,61 @@ async def get_sales(
     status: Optional[SaleStatus] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields (default: all)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get sales with filtering and pagination"""
     
-    # Build query
-    query = db.query(Sale).options(
-        joinedload(Sale.product),
-        joinedload(Sale.pharmacy),
-        joinedload(Sale.sales_rep)
-    ).filter(Sale.is_active == True)
-    
-    # Apply role-based filtering
-    if current_user.role.value == "sales_rep":
-        query = query.filter(Sale.sales_rep_id == current_user.id)
-    
-    # Apply filters
-    if product_id:
-        query = query.filter(Sale.product_id == product_id)
-    if pharmacy_id:
-        query = query.filter(Sale.pharmacy_id == pharmacy_id)
-    if sales_rep_id and current_user.is_admin:
-        query = query.filter(Sale.sales_rep_id == sales_rep_id)
-    if status:
-        query = query.filter(Sale.status == status)
-    if start_date:
-        query = query.filter(Sale.sale_date >= start_date)
-    if end_date:
-        query = query.filter(Sale.sale_date <= end_date)
+    fieldset = SALE_LIST.select(fields)
+    filters = (current_user, product_id, pharmacy_id, sales_rep_id, status, start_date, end_date)
     
-    # Get total count
-    total = query.count()
+    # Get total count (no joins needed)
+    total = _apply_sale_filters(
+        db.query(func.count(Sale.id)).filter(Sale.is_active == True), *filters
+    ).scalar()
     
-    # Apply pagination
-    sales = query.order_by(desc(Sale.created_at))\
+    # Select only the response columns; rows are encoded without ORM hydration
+    rows = _apply_sale_filters(_sale_list_query(db, fieldset), *filters)\
+        .order_by(desc(Sale.created_at))\
         .offset(skip)\
         .limit(limit)\
         .all()
     
-    # Enrich responses
-    enriched_sales = [_enrich_sale_response(sale) for sale in sales]
-    
-    return {
-        "items": enriched_sales,
+    return FastJSONResponse({
+        "items": fieldset.encode_all(rows),
         "total": total,
         "page": (skip // limit) + 1,
         "size": limit,
         "pages": (total + limit - 1) // limit
-    }
+    })
+
+
+@router.get("/export", dependencies=[Depends(admission("exports"))])
+async def export_sales(
+    format: str = Query("csv", regex="^(csv|ndjson)$"),
+    product_id: Optional[int] = None,
+    pharmacy_id: Optional[int] = None,
+    sales_rep_id: Optional[int] = None,
+    status: Optional[SaleStatus] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Stream every matching sale as CSV or NDJSON (same filters as the sales list)"""
+    
+    statement = _apply_sale_filters(
+        sales_export_query(), current_user,
+        product_id, pharmacy_id, sales_rep_id, status, start_date, end_date
+    )
+    
+    filename = f"sales_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+    
+    return StreamingResponse(
+        stream_sales_export(statement, format, chunk_size=settings.EXPORT_CHUNK_ROWS),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 @router.get("/{sale_id}", response_model=SaleResponse)
@@ -232,7 +269,76 @@ async def delete_sale(
         )
     
     sale.is_active = False
+    sale.deleted_at = datetime.now(timezone.utc)
+    db.commit()
+
+
+@router.post("/status/bulk", response_model=SaleStatusBulkResponse)
+async def bulk_update_sale_status(
+    bulk_update: SaleStatusBulkUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Move many sales to a new status in one statement (by ids and/or filters)"""
+    
+    if not bulk_update.sale_ids and not bulk_update.filters:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide sale_ids or filters"
+        )
+    
+    query = db.query(*TRANSITION_COLUMNS).filter(Sale.is_active == True)
+    if bulk_update.sale_ids:
+        query = query.filter(Sale.id.in_(bulk_update.sale_ids))
+    filters = bulk_update.filters or SaleStatusFilters()
+    query = _apply_sale_filters(
+        query, current_user, filters.product_id, filters.pharmacy_id, filters.sales_rep_id,
+        filters.status, filters.start_date, filters.end_date
+    )
+    
+    # Lock the rows so the transition checks hold until commit
+    rows = query.order_by(Sale.id)\
+        .limit(settings.BULK_STATUS_MAX_ROWS + 1)\
+        .with_for_update()\
+        .all()
+    
+    if len(rows) > settings.BULK_STATUS_MAX_ROWS:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"More than {settings.BULK_STATUS_MAX_ROWS} sales match; narrow the filters"
+        )
+    
+    outcomes = transition_sales(db, rows, bulk_update.status)
     db.commit()
+    
+    # Requested ids that are missing, deleted or outside the user's scope
+    for sale_id in bulk_update.sale_ids or []:
+        outcomes.setdefault(sale_id, {"id": sale_id, "outcome": "not_found", "previous_status": None})
+    
+    return {
+        "status": bulk_update.status,
+        "updated": sum(1 for outcome in outcomes.values() if outcome["outcome"] == "updated"),
+        "outcomes": list(outcomes.values())
+    }
+
+
+@router.post("/archive/compact")
+async def compact_archive(
+    retention_days: Optional[int] = Query(None, ge=0, description="Override ARCHIVE_RETENTION_DAYS"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Move old soft-deleted sales, products and pharmacies into the archive tables (Admin only)"""
+    
+    moved = await run_in_threadpool(
+        compact_soft_deleted,
+        db,
+        retention_days=settings.ARCHIVE_RETENTION_DAYS if retention_days is None else retention_days,
+        batch_size=settings.ARCHIVE_BATCH_SIZE
+    )
+    
+    return {"archived": moved}
 
 
 @router.get("/summary/overview", response_model=SalesSummary)
@@ -321,6 +427,81 @@ async def get_sales_summary(
     )
 
 
+def _insert_sale(db: Session, values: dict):
+    """INSERT ... RETURNING in one round trip, generating the order number in the same statement.
+
+    The new id is drawn inside the statement (sequence on PostgreSQL,
+    max(id) + 1 under SQLite's single-writer lock) and the default order
+    number is derived from it. A Core insert skips the mapper listeners,
+    so the pharmacy counters and outbox event are written here.
+    """
+    table = Sale.__table__
+    connection = db.connection()
+    
+    if connection.dialect.name == "postgresql":
+        next_id = select(func.nextval(literal_column("'sales_id_seq'")).label("id"))
+    else:
+        next_id = select((func.coalesce(func.max(table.c.id), 0) + 1).label("id"))
+    next_id = next_id.subquery("next_sale")
+    
+    columns = {"id": next_id.c.id}
+    columns.update({name: literal(value, table.c[name].type) for name, value in values.items()})
+    if not values.get("order_number"):
+        if connection.dialect.name == "postgresql":
+            digits = cast(next_id.c.id, String)
+            sequence_number = func.lpad(digits, func.greatest(6, func.length(digits)), "0")
+        elif connection.dialect.name == "sqlite":
+            sequence_number = func.printf("%06d", next_id.c.id)
+        else:
+            sequence_number = cast(next_id.c.id, String)
+        columns["order_number"] = literal(f"ORD-{datetime.now().strftime('%Y%m%d')}-", String) + sequence_number
+    
+    row = connection.execute(
+        insert(table)
+        .from_select(list(columns), select(*columns.values()).select_from(next_id))
+        .returning(*table.c)
+    ).one()
+    
+    pharmacy_counters.count_new_sale(
+        connection, row.pharmacy_id, row.is_active, row.status, row.sale_date, row.final_amount
+    )
+    outbox.record_sale_created(connection, row.id, row)
+    
+    return row
+
+
+def _apply_sale_filters(
+    query,
+    current_user: User,
+    product_id: Optional[int] = None,
+    pharmacy_id: Optional[int] = None,
+    sales_rep_id: Optional[int] = None,
+    status: Optional[SaleStatus] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+):
+    """Apply role scoping and the list filters to a Query or Select over sales"""
+    # Apply role-based filtering
+    if current_user.role.value == "sales_rep":
+        query = query.filter(Sale.sales_rep_id == current_user.id)
+    
+    # Apply filters
+    if product_id:
+        query = query.filter(Sale.product_id == product_id)
+    if pharmacy_id:
+        query = query.filter(Sale.pharmacy_id == pharmacy_id)
+    if sales_rep_id and current_user.is_admin:
+        query = query.filter(Sale.sales_rep_id == sales_rep_id)
+    if status:
+        query = query.filter(Sale.status == status)
+    if start_date:
+        query = query.filter(Sale.sale_date >= start_date)
+    if end_date:
+        query = query.filter(Sale.sale_date <= end_date)
+    
+    return query
+
+
 def _enrich_sale_response(sale: Sale) -> dict:
     """Enrich sale response with additional data"""
     sale_dict = {
@@ -360,4 +541,74 @@ def _enrich_sale_response(sale: Sale) -> dict:
         "profit_margin": sale.profit_margin,
     }
     
-    return sale_dict
\ No newline at end of file
+    return sale_dict
+
+
+SalesRep = aliased(User, name="sales_rep")
+
+
+def _sales_rep_name(row):
+    return f"{row.sales_rep_first_name} {row.sales_rep_last_name}" if row.sales_rep_first_name is not None else None
+
+
+def _discount_percentage(row):
+    if row.total_price > 0:
+        return (float(row.discount_amount) / float(row.total_price)) * 100
+    return 0
+
+
+def _profit_margin(row):
+    if row.product_cost_price:
+        cost = float(row.product_cost_price) * row.quantity
+        revenue = float(row.final_amount)
+        return ((revenue - cost) / revenue) * 100 if revenue > 0 else 0
+    return None
+
+
+# Column-level twin of _enrich_sale_response for the list endpoint
+SALE_LIST = RowEncoder(
+    SaleResponse,
+    columns={
+        **{name: getattr(Sale, name) for name in (
+            "id", "product_id", "pharmacy_id", "quantity", "unit_price", "total_price",
+            "discount_amount", "tax_amount", "final_amount", "payment_method", "status",
+            "sale_date", "delivery_date", "order_number", "po_number", "campaign_id",
+            "promotion_code", "territory", "region", "notes", "invoice_number",
+            "created_at", "updated_at"
+        )},
+        "product_name": Product.name,
+        "product_code": Product.code,
+        "product_cost_price": Product.cost_price,
+        "pharmacy_name": Pharmacy.name,
+        "pharmacy_city": Pharmacy.city,
+        "pharmacy_state": Pharmacy.state,
+        "sales_rep_first_name": SalesRep.first_name,
+        "sales_rep_last_name": SalesRep.last_name,
+    },
+    computed={
+        "pharmacy_location": lambda row: f"{row.pharmacy_city}, {row.pharmacy_state}" if row.pharmacy_name is not None else None,
+        "sales_rep_name": _sales_rep_name,
+        "discount_percentage": _discount_percentage,
+        "profit_margin": _profit_margin,
+    },
+    requires={
+        "pharmacy_location": ("pharmacy_name", "pharmacy_city", "pharmacy_state"),
+        "sales_rep_name": ("sales_rep_first_name", "sales_rep_last_name"),
+        "discount_percentage": ("total_price", "discount_amount"),
+        "profit_margin": ("product_cost_price", "quantity", "final_amount"),
+    }
+)
+
+
+def _sale_list_query(db: Session, fieldset):
+    """Select the field set's columns, joining only the tables they come from"""
+    query = db.query(*fieldset.columns).select_from(Sale)
+    
+    if fieldset.uses(Product):
+        query = query.outerjoin(Product, Sale.product_id == Product.id)
+    if fieldset.uses(Pharmacy):
+        query = query.outerjoin(Pharmacy, Sale.pharmacy_id == Pharmacy.id)
+    if fieldset.uses(SalesRep):
+        query = query.outerjoin(SalesRep, Sale.sales_rep_id == SalesRep.id)
+    
+    return query.filter(Sale.is_active == True)
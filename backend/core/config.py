@@ -23,6 +23,36 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "pharmalitics"
     POSTGRES_PORT: int = 5432
     
+    # Connection pools: transactional routes and analytical routes
+    # (analytics, reports, exports) never compete for the same connections
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a connection
+    ANALYTICS_POOL_SIZE: int = 5
+    ANALYTICS_MAX_OVERFLOW: int = 3
+    ANALYTICS_POOL_TIMEOUT: int = 10
+    
+    # Read replicas for read-only analytics, report data and exports
+    # (database/replicas.py); empty keeps everything on the primary
+    READ_REPLICA_URLS: Union[List[str], str] = []
+    REPLICA_MAX_LAG_SECONDS: float = 10.0  # lagging replicas fall back to the primary
+    REPLICA_LAG_CHECK_SECONDS: int = 15
+    REPLICA_POOL_SIZE: int = 5
+    REPLICA_MAX_OVERFLOW: int = 3
+    
+    @field_validator('READ_REPLICA_URLS', mode='before')
+    @classmethod
+    def parse_replica_urls(cls, v):
+        """Parse replica URLs from a JSON list or comma-separated string"""
+        if isinstance(v, str):
+            if not v.strip():
+                return []
+            try:
+                return json.loads(v)
+            except json.JSONDecodeError:
+                return [url.strip() for url in v.split(',') if url.strip()]
+        return v
+    
     def get_database_url(self) -> str:
         """
         Construct DATABASE_URL from individual PostgreSQL components.
@@ -80,7 +110,11 @@ class Settings(BaseSettings):
     REPORTS_DIR: str = "./reports"
     UPLOADS_DIR: str = "./uploads"
     MAX_FILE_SIZE: int = 10485760  # 10MB
-    ALLOWED_FILE_TYPES: List[str] = ["csv", "xlsx", "xls", "pdf"]
+    ALLOWED_FILE_TYPES: List[str] = ["csv", "xlsx", "xls", "ndjson", "pdf"]
+    IMPORT_BATCH_SIZE: int = 1000  # rows validated and upserted per statement
+    EXPORT_CHUNK_ROWS: int = 1000  # rows fetched from the cursor and flushed per chunk
+    BULK_STATUS_MAX_ROWS: int = 5000  # sales one bulk status transition may touch
+    DIMENSION_CACHE_TTL_SECONDS: int = 60  # product/pharmacy/user lookups on the sale write path
     
     # Email (Optional)
     SMTP_TLS: bool = True
@@ -91,7 +125,43 @@ class Settings(BaseSettings):
     
     # Monitoring & Logging
     LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # json | console
+    LOG_QUEUE_SIZE: int = 10000  # records waiting for the writer thread; more are dropped, never blocked on
+    LOG_DEBUG_SAMPLE_RATE: float = 0.1  # fraction of DEBUG records kept
     SENTRY_DSN: Optional[str] = None
+    METRICS_ENABLED: bool = True  # Prometheus exposition at /metrics
+    
+    # SQL instrumentation (database/instrumentation.py)
+    SQL_SLOW_QUERY_MS: int = 500  # statements slower than this are logged, parameters redacted
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10  # same statement this often in one request is flagged
+    SQL_DEBUG_HEADER: bool = False  # X-SQL-Queries response header
+    SQL_STATEMENT_STATS_MAX: int = 1000  # distinct statements kept for the top-statements view
+    
+    # On-demand request profiling (api/profiling.py), admins only
+    PROFILING_ENABLED: bool = True
+    PROFILING_HEADER: str = "X-Profile"  # html | speedscope | store
+    PROFILING_INTERVAL_SECONDS: float = 0.001  # sampling interval
+    PROFILES_DIR: str = "./profiles"
+    PROFILES_KEPT: int = 50  # newest stored profiles kept per worker directory
+    
+    # Request tracing (core/tracing.py)
+    TRACING_SAMPLE_RATE: float = 0.0  # fraction of requests traced; 0 disables sampling
+    TRACING_FOLLOW_PARENT: bool = False  # also trace requests whose W3C traceparent is sampled (only while sampling is on)
+    TRACING_EXPORTER: str = "file"  # file (OTLP/JSON lines) | otlp (OTLP/HTTP collector)
+    TRACING_FILE: str = "./traces/spans.jsonl"
+    TRACING_FILE_MAX_MB: int = 100  # the file exporter rotates the file at this size
+    TRACING_FILE_BACKUPS: int = 3  # rotated files kept (spans.jsonl.1 ... .N)
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_SERVICE_NAME: str = "qsdpharmalitics-api"
+    TRACING_QUEUE_MAX: int = 10000  # finished spans buffered for export; more are dropped
+    TRACING_BATCH_SIZE: int = 512
+    TRACING_EXPORT_INTERVAL_SECONDS: float = 2.0
+    
+    # Memory diagnostics (core/memory.py), per worker
+    MEMORY_TRACE_FRAMES: int = 10  # traceback depth recorded when tracemalloc is started from the API
+    MEMORY_SNAPSHOTS_KEPT: int = 5  # snapshots held for diffing; the oldest is dropped
+    MEMORY_REQUEST_PEAKS_ENABLED: bool = False  # measure analytics/report request peaks from startup
+    MEMORY_REQUEST_PEAKS_KEPT: int = 200
     
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 100
@@ -101,6 +171,36 @@ class Settings(BaseSettings):
     ENABLE_ADVANCED_ANALYTICS: bool = True
     ML_MODEL_UPDATE_INTERVAL: int = 24  # hours
     CACHE_TTL_SECONDS: int = 3600  # 1 hour
+    PHARMACY_COUNTERS_RECONCILE_SECONDS: int = 3600  # drift repair + trailing-year age-out
+    
+    # Sales partitioning (PostgreSQL, see alembic revision b8d5e1f3a703)
+    SALES_PARTITION_MONTHS_AHEAD: int = 3
+    SALES_PARTITION_RETENTION_MONTHS: Optional[int] = None  # detach older months; None keeps everything
+    SALES_ARCHIVE_SCHEMA: str = "sales_archive"
+    
+    # Soft-delete compaction (services/archive.py)
+    ARCHIVE_RETENTION_DAYS: int = 90  # soft-deleted rows stay in the hot tables this long
+    ARCHIVE_BATCH_SIZE: int = 1000
+    ARCHIVE_COMPACTION_SECONDS: int = 24 * 3600
+    
+    # Transactional outbox (services/outbox.py)
+    OUTBOX_POLL_SECONDS: int = 5
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_RETENTION_DAYS: int = 7  # processed events kept this long
+    
+    # Admission control (api/admission.py): concurrent requests per route
+    # class, and how many more may wait before new ones get a 503
+    ANALYTICS_MAX_CONCURRENT: int = 4
+    ANALYTICS_MAX_QUEUE: int = 8
+    REPORTS_MAX_CONCURRENT: int = 2
+    REPORTS_MAX_QUEUE: int = 4
+    EXPORTS_MAX_CONCURRENT: int = 2
+    EXPORTS_MAX_QUEUE: int = 2
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 10.0  # queued requests give up with a 503 after this
+    ADMISSION_RETRY_AFTER_SECONDS: int = 5
+    
+    # Search & Autocomplete
+    AUTOCOMPLETE_REFRESH_SECONDS: int = 300  # full rebuild, picks up other workers' writes
     
     # Timezone
     TIMEZONE: str = "UTC"
@@ -0,0 +1,181 @@
+import atexit
+import copy
+import logging
+import queue
+import random
+import re
+import sys
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterator, Optional
+
+import orjson
+import structlog
+
+from backend.core.config import settings
+from backend.core.tracing import current_span
+
+# Set per request by the HTTP middleware (and copied into its threadpool work
+# and background tasks), stamped on every record logged on its behalf
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Incoming X-Request-ID values are reused only when they look like an id
+_REQUEST_ID = re.compile(r"^[\w.\-]{1,64}$")
+
+_listener: Optional[QueueListener] = None
+
+
+def request_id_for(header_value: Optional[str]) -> str:
+    """The caller's X-Request-ID when usable, otherwise a fresh id"""
+    if header_value and _REQUEST_ID.match(header_value):
+        return header_value
+    return uuid.uuid4().hex
+
+
+@contextmanager
+def bind_request_id(request_id: str) -> Iterator[None]:
+    token = request_id_var.set(request_id)
+    try:
+        yield
+    finally:
+        request_id_var.reset(token)
+
+
+class DebugSampler(logging.Filter):
+    """Pass only a fraction of DEBUG (and lower) records; higher levels always pass"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the writer thread; drops them instead of blocking when the queue is full.
+
+    Only the work that needs the caller's context happens here: the message
+    is merged with its arguments and the request and trace ids are stamped.
+    Formatting, JSON encoding and the write itself happen on the writer thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # structlog event dicts are rendered by the formatter; plain records are
+        # resolved now, while their arguments still hold the values they were logged with
+        if not isinstance(record.msg, dict):
+            record.msg = record.getMessage()
+            record.args = None
+        record.request_id = request_id_var.get()
+        span = current_span.get()
+        record.trace_id = span.trace_id if span is not None else None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            notice = logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                f"{dropped} log records dropped: log queue full", None, None
+            )
+            notice.request_id = notice.trace_id = None
+            try:
+                self.queue.put_nowait(notice)
+            except queue.Full:
+                self.dropped += dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _add_record_context(logger, method_name: str, event_dict: dict) -> dict:
+    record = event_dict.get("_record")
+    if record is not None:
+        event_dict["timestamp"] = datetime.fromtimestamp(record.created, timezone.utc).isoformat()
+        event_dict.setdefault("logger", record.name)
+        for key in ("request_id", "trace_id"):
+            value = getattr(record, key, None)
+            if value is not None:
+                event_dict.setdefault(key, value)
+    return event_dict
+
+
+def _json_dumps(event_dict: dict, **kwargs) -> str:
+    return orjson.dumps(event_dict, default=str).decode()
+
+
+def configure_logging() -> None:
+    """Route all logging (stdlib, structlog and uvicorn) through a queue to a background writer thread"""
+    global _listener
+    if _listener is not None:
+        return
+
+    renderer = structlog.dev.ConsoleRenderer(colors=False) if settings.LOG_FORMAT == "console" \
+        else structlog.processors.JSONRenderer(serializer=_json_dumps)
+
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            structlog.stdlib.filter_by_level,
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+        ],
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+    writer = logging.StreamHandler(sys.stdout)
+    writer.setFormatter(structlog.stdlib.ProcessorFormatter(
+        foreign_pre_chain=[structlog.stdlib.add_log_level],
+        processors=[
+            _add_record_context,
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.format_exc_info,
+            renderer,
+        ],
+    ))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(DebugSampler(settings.LOG_DEBUG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(getattr(logging, settings.LOG_LEVEL))
+
+    # Libraries install their own (synchronous) handlers: uvicorn, and SQLAlchemy
+    # for echo=True on engines created before this runs. Send their records
+    # through the queue too
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name)
+    for existing in list(logging.root.manager.loggerDict.values()):
+        if isinstance(existing, logging.PlaceHolder):
+            continue
+        existing.handlers.clear()
+        existing.propagate = True
+
+    _listener = QueueListener(log_queue, writer, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Write out the records still queued and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
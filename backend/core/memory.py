@@ -0,0 +1,217 @@
+import functools
+import gc
+import inspect
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+from threading import Lock
+from typing import Iterator, List, Optional
+
+import psutil
+from fastapi import Request
+
+from backend.core.config import settings
+from backend.core.metrics import route_label
+
+# Allocations made by the profiler itself and by imports are noise in every view
+_NOISE = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _frames(traceback: tracemalloc.Traceback) -> List[str]:
+    # Most recent call first, as tracemalloc stores them
+    return [f"{frame.filename}:{frame.lineno}" for frame in traceback]
+
+
+def _stat(stat: tracemalloc.Statistic) -> dict:
+    return {
+        "size_kb": round(stat.size / 1024, 1),
+        "count": stat.count,
+        "average_bytes": stat.size // stat.count if stat.count else 0,
+        "traceback": _frames(stat.traceback),
+    }
+
+
+def _stat_diff(stat: tracemalloc.StatisticDiff) -> dict:
+    return {
+        "size_kb": round(stat.size / 1024, 1),
+        "size_diff_kb": round(stat.size_diff / 1024, 1),
+        "count": stat.count,
+        "count_diff": stat.count_diff,
+        "traceback": _frames(stat.traceback),
+    }
+
+
+class MemoryProfiler:
+    """tracemalloc control and a small per-worker store of snapshots to compare"""
+
+    def __init__(self, max_snapshots: int):
+        self.max_snapshots = max_snapshots
+        # id -> (taken at, snapshot)
+        self._snapshots: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = Lock()
+
+    def start(self, frames: int) -> None:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        # Snapshots already taken stay usable
+        tracemalloc.stop()
+
+    def status(self) -> dict:
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_current_kb": round(current / 1024, 1),
+            "traced_peak_kb": round(peak / 1024, 1),
+            "tracemalloc_overhead_kb": round(tracemalloc.get_tracemalloc_memory() / 1024, 1),
+            "rss_kb": psutil.Process().memory_info().rss // 1024,
+            "snapshots": [
+                {"id": snapshot_id, "taken_at": taken_at}
+                for snapshot_id, (taken_at, _) in self._snapshots.items()
+            ],
+        }
+
+    def take_snapshot(self) -> str:
+        """Store a snapshot of the live traced allocations and return its id"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing")
+        snapshot = tracemalloc.take_snapshot().filter_traces(_NOISE)
+        snapshot_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._snapshots[snapshot_id] = (time.time(), snapshot)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def _get(self, snapshot_id: str) -> Optional[tracemalloc.Snapshot]:
+        entry = self._snapshots.get(snapshot_id)
+        return entry[1] if entry else None
+
+    def delete(self, snapshot_id: str) -> bool:
+        with self._lock:
+            return self._snapshots.pop(snapshot_id, None) is not None
+
+    def top(self, snapshot_id: str, group_by: str = "lineno", limit: int = 20) -> Optional[List[dict]]:
+        """Allocation sites holding the most memory in one snapshot"""
+        snapshot = self._get(snapshot_id)
+        if snapshot is None:
+            return None
+        return [_stat(stat) for stat in snapshot.statistics(group_by)[:limit]]
+
+    def diff(self, base_id: str, target_id: str, group_by: str = "lineno", limit: int = 20) -> Optional[List[dict]]:
+        """Allocation sites that grew the most from ``base_id`` to ``target_id``"""
+        base, target = self._get(base_id), self._get(target_id)
+        if base is None or target is None:
+            return None
+        return [_stat_diff(stat) for stat in target.compare_to(base, group_by)[:limit]]
+
+
+def live_objects(limit: int = 20) -> List[dict]:
+    """Most numerous live objects by type (what keeps memory, whoever allocated it)"""
+    gc.collect()
+    counts = Counter(f"{type(obj).__module__}.{type(obj).__qualname__}" for obj in gc.get_objects())
+    return [{"type": name, "count": count} for name, count in counts.most_common(limit)]
+
+
+class RequestPeaks:
+    """Peak traced memory of individual analytics and report requests.
+
+    tracemalloc keeps one process-wide peak, so it is reset only when no
+    measured request is running; a measurement that overlapped another one
+    is flagged, since its peak includes the other request's allocations.
+    """
+
+    def __init__(self, max_measurements: int):
+        self.enabled = False
+        self.measurements = deque(maxlen=max_measurements)
+        self._active: List[dict] = []
+        self._lock = Lock()
+
+    def enable(self, frames: int = 1) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    @contextmanager
+    def measure(self, label: str) -> Iterator[None]:
+        if not self.enabled or not tracemalloc.is_tracing():
+            yield
+            return
+
+        process = psutil.Process()
+        measurement = {"label": label, "started_at": time.time(), "overlapped": False}
+        with self._lock:
+            if self._active:
+                measurement["overlapped"] = True
+                for other in self._active:
+                    other["overlapped"] = True
+            else:
+                tracemalloc.reset_peak()
+            measurement["_start"] = tracemalloc.get_traced_memory()[0]
+            self._active.append(measurement)
+        rss_start = process.memory_info().rss
+
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            rss_end = process.memory_info().rss
+            with self._lock:
+                self._active.remove(measurement)
+                start = measurement.pop("_start")
+                measurement.update({
+                    "duration_ms": round((time.time() - measurement["started_at"]) * 1000, 1),
+                    "peak_kb": round((peak - start) / 1024, 1),
+                    "retained_kb": round((current - start) / 1024, 1),
+                    "rss_delta_kb": (rss_end - rss_start) // 1024,
+                })
+                self.measurements.append(measurement)
+
+    def top(self, limit: int = 50) -> List[dict]:
+        with self._lock:
+            return sorted(self.measurements, key=lambda measurement: measurement["peak_kb"], reverse=True)[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self.measurements.clear()
+
+
+memory_profiler = MemoryProfiler(settings.MEMORY_SNAPSHOTS_KEPT)
+request_peaks = RequestPeaks(settings.MEMORY_REQUEST_PEAKS_KEPT)
+
+
+async def measure_request_memory(request: Request):
+    """Router dependency: record the peak memory of the request while peak mode is on"""
+    with request_peaks.measure(f"{request.method} {route_label(request.scope)}"):
+        yield
+
+
+def measured(label: str):
+    """Decorator: record the peak memory of each call of an (async) function while peak mode is on"""
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with request_peaks.measure(label):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with request_peaks.measure(label):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,147 @@
+from typing import Iterable
+import logging
+
+import psutil
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import func
+from sqlalchemy.pool import QueuePool
+
+from backend.database.instrumentation import RequestQueries
+
+logger = logging.getLogger(__name__)
+
+# Metrics are per worker process; scrape each worker (or aggregate upstream)
+registry = CollectorRegistry()
+
+# Latency buckets from fast list endpoints up to slow analytics/report calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by route",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS, registry=registry
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests currently being handled", registry=registry
+)
+DB_STATEMENTS = Counter(
+    "db_statements_total", "SQL statements executed, by route", ["route"], registry=registry
+)
+DB_STATEMENT_SECONDS = Counter(
+    "db_statement_seconds_total", "Time spent executing SQL, by route", ["route"], registry=registry
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "Time a request waited for pooled connections, by route",
+    ["route"], buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30), registry=registry
+)
+DB_STATEMENTS_PER_REQUEST = Histogram(
+    "http_request_db_statements", "SQL statements per request, by route",
+    ["route"], buckets=(0, 1, 2, 5, 10, 25, 50, 100, 250, 1000), registry=registry
+)
+
+# Label for requests that matched no route (404s, probes); keeps cardinality bounded
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_label(scope: dict) -> str:
+    """The matched route's path template, e.g. /api/v1/sales/{sale_id}"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def record_request(method: str, route: str, status_code: int, seconds: float, queries: RequestQueries) -> None:
+    REQUEST_LATENCY.labels(method, route, str(status_code)).observe(seconds)
+    DB_STATEMENTS_PER_REQUEST.labels(route).observe(queries.statements)
+    DB_POOL_WAIT.labels(route).observe(queries.pool_wait)
+    if queries.statements:
+        DB_STATEMENTS.labels(route).inc(queries.statements)
+        DB_STATEMENT_SECONDS.labels(route).inc(queries.seconds)
+
+
+class PoolCollector:
+    """Connection pool occupancy of every engine, read at scrape time"""
+
+    def collect(self) -> Iterable:
+        from backend.database.base import engine, analytics_engine, ReplicaSessionLocal
+
+        pools = {"transactional": engine.pool, "analytics": analytics_engine.pool}
+        for replica in ReplicaSessionLocal.replicas.values():
+            pools[f"replica:{replica.url.render_as_string(hide_password=True)}"] = replica.pool
+
+        gauges = {
+            "size": GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["pool"]),
+            "checkedout": GaugeMetricFamily("db_pool_checked_out", "Connections in use", labels=["pool"]),
+            "checkedin": GaugeMetricFamily("db_pool_checked_in", "Idle pooled connections", labels=["pool"]),
+            "overflow": GaugeMetricFamily("db_pool_overflow", "Connections open beyond the pool size", labels=["pool"]),
+        }
+        for name, pool in pools.items():
+            # SQLite in-memory/static pools have no occupancy to report
+            if not isinstance(pool, QueuePool):
+                continue
+            for attribute, gauge in gauges.items():
+                gauge.add_metric([name], getattr(pool, attribute)())
+        yield from gauges.values()
+
+
+class AdmissionCollector:
+    """Bulkhead occupancy and rejections per route class"""
+
+    def collect(self) -> Iterable:
+        from backend.api.admission import bulkheads
+
+        running = GaugeMetricFamily("admission_running", "Requests running per route class", labels=["route_class"])
+        queued = GaugeMetricFamily("admission_queued", "Requests waiting for a slot", labels=["route_class"])
+        rejected = CounterMetricFamily("admission_rejected", "Requests rejected with a 503", labels=["route_class"])
+        for name, bulkhead in bulkheads.items():
+            running.add_metric([name], bulkhead.active)
+            queued.add_metric([name], bulkhead.waiting)
+            rejected.add_metric([name], bulkhead.rejected)
+        yield from (running, queued, rejected)
+
+
+class ReportQueueCollector:
+    """Report generation jobs that have been requested but not finished"""
+
+    def collect(self) -> Iterable:
+        from backend.database.base import AnalyticsSessionLocal
+        from backend.models.analytics import ReportGeneration
+
+        depth = GaugeMetricFamily("report_jobs_pending", "Report generation jobs still pending")
+        db = AnalyticsSessionLocal()
+        try:
+            pending = db.query(func.count(ReportGeneration.id))\
+                .filter(ReportGeneration.status == "pending")\
+                .scalar()
+            depth.add_metric([], pending)
+        except Exception as e:
+            logger.warning(f"Report queue depth unavailable: {e}")
+            return
+        finally:
+            db.close()
+        yield depth
+
+
+class ProcessCollector:
+    """Resident memory and CPU of this worker via psutil"""
+
+    def collect(self) -> Iterable:
+        # Looked up per scrape: workers are forked after this module is imported
+        process = psutil.Process()
+        with process.oneshot():
+            memory = process.memory_info()
+            cpu = process.cpu_times()
+            threads = process.num_threads()
+
+        yield GaugeMetricFamily("process_resident_memory_bytes", "Resident set size", value=memory.rss)
+        yield GaugeMetricFamily("process_virtual_memory_bytes", "Virtual memory size", value=memory.vms)
+        yield CounterMetricFamily("process_cpu_seconds", "User and system CPU time", value=cpu.user + cpu.system)
+        yield GaugeMetricFamily("process_threads", "Threads in this worker", value=threads)
+
+
+for collector in (PoolCollector(), AdmissionCollector(), ReportQueueCollector(), ProcessCollector()):
+    registry.register(collector)
+
+
+def render_metrics() -> bytes:
+    """Prometheus text exposition of every metric (blocking: pool and report queries)"""
+    return generate_latest(registry)
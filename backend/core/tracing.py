@@ -0,0 +1,294 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from fastapi.responses import JSONResponse
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# W3C trace context: version-traceid-parentid-flags
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+
+
+class Span:
+    """One timed operation of a sampled request"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: int = SPAN_KIND_INTERNAL,
+                 start_ns: Optional[int] = None, **attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.error = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def child(self, name: str, **attributes) -> "Span":
+        return Span(name, self.trace_id, self.span_id, **attributes)
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        self.end_ns = end_ns or time.time_ns()
+        exporter.submit(self)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(spans: List[Span]) -> dict:
+    """OTLP/JSON ExportTraceServiceRequest for a batch of finished spans"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": settings.TRACING_SERVICE_NAME}}]},
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [
+                    {
+                        "traceId": span.trace_id,
+                        "spanId": span.span_id,
+                        "parentSpanId": span.parent_id or "",
+                        "name": span.name,
+                        "kind": span.kind,
+                        "startTimeUnixNano": str(span.start_ns),
+                        "endTimeUnixNano": str(span.end_ns),
+                        "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+                        "status": {"code": 2, "message": span.error} if span.error else {"code": 0},
+                    }
+                    for span in spans
+                ],
+            }],
+        }]
+    }
+
+
+class SpanExporter:
+    """Ships finished spans from a background thread so request handlers never wait on export I/O.
+
+    ``file`` appends one OTLP/JSON request per line (the format of the
+    OpenTelemetry collector's file exporter) and rotates the file at
+    TRACING_FILE_MAX_MB; ``otlp`` posts the same payload to an OTLP/HTTP
+    collector. Spans beyond the queue size are dropped rather than blocking.
+    """
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue(maxsize=settings.TRACING_QUEUE_MAX)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._client = None
+        self.dropped = 0
+
+    def submit(self, span: Span) -> None:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + settings.TRACING_EXPORT_INTERVAL_SECONDS
+            while len(batch) < settings.TRACING_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            spans = [span for span in batch if span is not None]
+            if spans:
+                self._export(spans)
+            if len(spans) < len(batch):
+                # shutdown() marker
+                return
+
+    def _export(self, spans: List[Span]) -> None:
+        try:
+            payload = otlp_payload(spans)
+            if settings.TRACING_EXPORTER == "otlp":
+                if self._client is None:
+                    import httpx
+                    self._client = httpx.Client(timeout=10)
+                self._client.post(settings.TRACING_OTLP_ENDPOINT, json=payload).raise_for_status()
+            else:
+                directory = os.path.dirname(settings.TRACING_FILE)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                _rotate_if_full(settings.TRACING_FILE)
+                with open(settings.TRACING_FILE, "a") as trace_file:
+                    trace_file.write(json.dumps(payload) + "\n")
+        except Exception as e:
+            logger.warning(f"⚠️ Exporting {len(spans)} spans failed: {e}")
+        if self.dropped:
+            logger.warning(f"⚠️ {self.dropped} spans dropped: export queue full")
+            self.dropped = 0
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Export what is queued and stop the thread"""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        self._thread = None
+
+
+def _rotate_if_full(path: str) -> None:
+    """Shift ``path`` to ``path.1`` (and older files up) once it reaches TRACING_FILE_MAX_MB"""
+    try:
+        if os.path.getsize(path) < settings.TRACING_FILE_MAX_MB * 1024 * 1024:
+            return
+    except FileNotFoundError:
+        return
+    if settings.TRACING_FILE_BACKUPS <= 0:
+        os.remove(path)
+        return
+    for number in range(settings.TRACING_FILE_BACKUPS - 1, 0, -1):
+        if os.path.exists(f"{path}.{number}"):
+            os.replace(f"{path}.{number}", f"{path}.{number + 1}")
+    os.replace(path, f"{path}.1")
+
+
+exporter = SpanExporter()
+
+# Innermost open span of the current (sampled) request; None means not traced,
+# which every instrumentation point checks first
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def _sampled_trace(traceparent: Optional[str]):
+    """(trace id, remote parent span id) when this request should be traced, else None"""
+    # An incoming sampled flag is honoured only while tracing is on: callers
+    # must not be able to switch it on
+    if settings.TRACING_SAMPLE_RATE <= 0:
+        return None
+    if traceparent and settings.TRACING_FOLLOW_PARENT:
+        match = _TRACEPARENT.match(traceparent.strip().lower())
+        if match:
+            trace_id, parent_id, flags = match.groups()
+            return (trace_id, parent_id) if int(flags, 16) & 1 else None
+    if random.random() < settings.TRACING_SAMPLE_RATE:
+        return secrets.token_hex(16), None
+    return None
+
+
+@contextmanager
+def trace_request(method: str, path: str, traceparent: Optional[str] = None) -> Iterator[Optional[Span]]:
+    """Root span of one request, or None when the request is not sampled"""
+    sampled = _sampled_trace(traceparent)
+    if sampled is None:
+        yield None
+        return
+
+    trace_id, parent_id = sampled
+    root = Span(f"{method} {path}", trace_id, parent_id, kind=SPAN_KIND_SERVER, **{"http.method": method, "http.target": path})
+    token = current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.error = repr(e)
+        raise
+    finally:
+        current_span.reset(token)
+        root.end()
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Optional[Span]]:
+    """Child span of the current span; a no-op outside sampled requests"""
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    child = parent.child(name, **attributes)
+    token = current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.error = repr(e)
+        raise
+    finally:
+        current_span.reset(token)
+        child.end()
+
+
+def traced(name: str):
+    """Decorator: run the (sync or async) function inside ``span(name)``"""
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                if current_span.get() is None:
+                    return await function(*args, **kwargs)
+                with span(name):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if current_span.get() is None:
+                return function(*args, **kwargs)
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_span(name: str, seconds: float, **attributes) -> None:
+    """Add an already finished child span that ended now and lasted ``seconds``"""
+    parent = current_span.get()
+    if parent is None:
+        return
+    end_ns = time.time_ns()
+    child = Span(name, parent.trace_id, parent.span_id, start_ns=end_ns - int(seconds * 1e9), **attributes)
+    child.end(end_ns)
+
+
+class TracedJSONResponse(JSONResponse):
+    """Default JSON response whose body encoding shows up as a span"""
+
+    def render(self, content) -> bytes:
+        if current_span.get() is None:
+            return super().render(content)
+        with span("response.encode") as encode:
+            body = super().render(content)
+            encode.set(**{"http.response_content_length": len(body)})
+            return body
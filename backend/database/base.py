@@ -1,29 +1,71 @@
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from backend.core.config import settings
+from backend.database.instrumentation import TimedQueuePool
+from backend.database.replicas import ReplicaRouter
 
 # Create SQLAlchemy engine
 engine = create_engine(
     settings.get_database_url(),
     echo=settings.DEBUG,
+    poolclass=TimedQueuePool,
     pool_pre_ping=True,
     pool_recycle=300,
-    pool_size=10,
-    max_overflow=20
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT
+)
+
+# Separate, smaller pool for analytics, reports and exports so long-running
+# aggregations cannot starve sale entry of connections
+analytics_engine = create_engine(
+    settings.get_database_url(),
+    echo=settings.DEBUG,
+    poolclass=TimedQueuePool,
+    pool_pre_ping=True,
+    pool_recycle=300,
+    pool_size=settings.ANALYTICS_POOL_SIZE,
+    max_overflow=settings.ANALYTICS_MAX_OVERFLOW,
+    pool_timeout=settings.ANALYTICS_POOL_TIMEOUT
 )
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AnalyticsSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=analytics_engine)
+
+# Read-only sessions: an in-sync replica when one is configured, otherwise
+# (or while all replicas lag) the analytics pool on the primary
+ReplicaSessionLocal = ReplicaRouter(
+    analytics_engine,
+    settings.READ_REPLICA_URLS,
+    settings.REPLICA_MAX_LAG_SECONDS,
+    echo=settings.DEBUG,
+    poolclass=TimedQueuePool,
+    pool_pre_ping=True,
+    pool_recycle=300,
+    pool_size=settings.REPLICA_POOL_SIZE,
+    max_overflow=settings.REPLICA_MAX_OVERFLOW,
+    pool_timeout=settings.ANALYTICS_POOL_TIMEOUT
+)
+
+# Session factory per pool name (see api/admission.py)
+session_factories = {
+    "transactional": SessionLocal,
+    "analytics": AnalyticsSessionLocal,
+    "replica": ReplicaSessionLocal,
+}
 
 # Create Base class
 Base = declarative_base()
 
 
-def get_db():
-    """Database dependency"""
-    db = SessionLocal()
+def get_db(request: Request):
+    """Database dependency; uses the pool of the route's admission class"""
+    session_factory = session_factories[getattr(request.state, "db_pool", "transactional")]
+    db = session_factory()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,203 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from threading import Lock
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+import re
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from backend.core.config import settings
+from backend.core.tracing import current_span, record_span
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)"
+# Expanded IN lists differ in length per call; collapse them to one shape
+_IN_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+
+@lru_cache(maxsize=2048)
+def normalize_statement(statement: str) -> str:
+    """Statement text with literals and IN-list lengths folded, for grouping"""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    return _IN_LIST.sub("(...)", statement)
+
+
+def redact_parameters(parameters, executemany: bool = False):
+    """Bind parameters with every value replaced by its type name"""
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+class RequestQueries:
+    """SQL statements executed on behalf of one request"""
+
+    __slots__ = ("statements", "seconds", "by_statement", "pool_wait")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+        # Time spent waiting for a pooled connection
+        self.pool_wait = 0.0
+        # normalized statement -> [executions, seconds]
+        self.by_statement: Dict[str, list] = {}
+
+    def add(self, statement: str, seconds: float) -> None:
+        self.statements += 1
+        self.seconds += seconds
+        entry = self.by_statement.get(statement)
+        if entry is None:
+            self.by_statement[statement] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    @property
+    def duplicates(self) -> int:
+        """Executions beyond the first of every statement"""
+        return self.statements - len(self.by_statement)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int, float]]:
+        """Statements executed at least ``threshold`` times, most frequent first"""
+        return sorted(
+            ((statement, count, seconds) for statement, (count, seconds) in self.by_statement.items() if count >= threshold),
+            key=lambda item: item[1], reverse=True
+        )
+
+
+class StatementStats:
+    """Process-wide totals per normalized statement"""
+
+    def __init__(self, max_statements: int):
+        self.max_statements = max_statements
+        self._stats: Dict[str, list] = {}
+        self._lock = Lock()
+
+    def add(self, statement: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._stats.get(statement)
+            if entry is None:
+                if len(self._stats) >= self.max_statements:
+                    # Make room by dropping the statement with the least total time
+                    del self._stats[min(self._stats, key=lambda key: self._stats[key][1])]
+                self._stats[statement] = [1, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                entry[2] = max(entry[2], seconds)
+
+    def top(self, limit: int = 20, order_by: str = "total") -> List[dict]:
+        with self._lock:
+            rows = [
+                {
+                    "statement": statement,
+                    "calls": calls,
+                    "total_ms": round(total * 1000, 3),
+                    "mean_ms": round(total / calls * 1000, 3),
+                    "max_ms": round(longest * 1000, 3),
+                }
+                for statement, (calls, total, longest) in self._stats.items()
+            ]
+        key = {"total": "total_ms", "mean": "mean_ms", "max": "max_ms", "calls": "calls"}[order_by]
+        return sorted(rows, key=lambda row: row[key], reverse=True)[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+statement_stats = StatementStats(settings.SQL_STATEMENT_STATS_MAX)
+
+# Set per request by the HTTP middleware; copied into worker threads along
+# with the rest of the context, so threadpool and streaming work is counted.
+# The request metrics are recorded once the body has been sent; the
+# X-SQL-Queries header is written before a streamed body is produced
+current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[RequestQueries]:
+    """Attribute every statement run inside the block (on any engine) to one request"""
+    queries = RequestQueries()
+    token = current_queries.set(queries)
+    try:
+        yield queries
+    finally:
+        current_queries.reset(token)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that charges the time a checkout waits for a connection to the current request"""
+
+    def _do_get(self):
+        started = perf_counter()
+        connection = super()._do_get()
+        queries = current_queries.get()
+        if queries is not None:
+            queries.pool_wait += perf_counter() - started
+        return connection
+
+
+def log_repeated_statements(queries: RequestQueries, route: str) -> None:
+    """Warn about statements a single request repeated often enough to suggest N+1 loading"""
+    for statement, count, seconds in queries.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD):
+        logger.warning(f"🔁 Possible N+1 in {route}: {count}x ({seconds * 1000:.1f} ms) {statement[:300]}")
+
+
+def debug_header(queries: RequestQueries) -> str:
+    """Value of the X-SQL-Queries debug response header"""
+    return f"count={queries.statements}; time_ms={queries.seconds * 1000:.1f}; " \
+           f"distinct={len(queries.by_statement)}; duplicates={queries.duplicates}; " \
+           f"pool_wait_ms={queries.pool_wait * 1000:.1f}"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_started", []).append(perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_statement(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("statement_started")
+    if not started:
+        return
+    seconds = perf_counter() - started.pop()
+    normalized = normalize_statement(statement)
+
+    statement_stats.add(normalized, seconds)
+    queries = current_queries.get()
+    if queries is not None:
+        queries.add(normalized, seconds)
+
+    if current_span.get() is not None:
+        record_span("sql", seconds, **{"db.system": conn.dialect.name, "db.statement": normalized[:1000]})
+
+    if seconds * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        logger.warning(
+            f"🐢 Slow query ({seconds * 1000:.1f} ms): {normalized[:1000]} "
+            f"params={redact_parameters(parameters, executemany)}"
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _failed_statement(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    started = connection.info.get("statement_started") if connection is not None else None
+    if started:
+        started.pop()
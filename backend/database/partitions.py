@@ -0,0 +1,113 @@
+from datetime import date
+from typing import List, Optional
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+# Catch-all partition for rows outside the monthly ranges (e.g. far-future dates)
+DEFAULT_PARTITION = "sales_default"
+
+
+def month_start(day: date, offset: int = 0) -> date:
+    """First day of the month ``offset`` months after ``day``'s month"""
+    month_index = day.year * 12 + (day.month - 1) + offset
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"sales_p{month.year}_{month.month:02d}"
+
+
+def create_month_partition_sql(month: date) -> str:
+    start, end = month_start(month), month_start(month, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF sales "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def is_sales_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = 'sales' AND c.relnamespace = 'public'::regnamespace"
+    )).first() is not None
+
+
+def list_sales_partitions(conn: Connection) -> List[str]:
+    return [row[0] for row in conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'sales' ORDER BY c.relname"
+    ))]
+
+
+def ensure_sales_partitions(engine: Engine, months_ahead: int = 3, today: Optional[date] = None) -> List[str]:
+    """Create monthly partitions from the current month through ``months_ahead``.
+
+    No-op unless ``sales`` is a partitioned PostgreSQL table. Run ahead of
+    time: a month cannot be attached once rows for it sit in the default
+    partition.
+    """
+    today = today or date.today()
+    created = []
+
+    with engine.begin() as conn:
+        if not is_sales_partitioned(conn):
+            return created
+
+        existing = set(list_sales_partitions(conn))
+        for offset in range(months_ahead + 1):
+            month = month_start(today, offset)
+            if partition_name(month) in existing:
+                continue
+            try:
+                with conn.begin_nested():
+                    conn.execute(text(create_month_partition_sql(month)))
+                created.append(partition_name(month))
+            except Exception as e:
+                logger.error(f"Could not create sales partition {partition_name(month)}: {e}")
+
+    if created:
+        logger.info(f"🗂️ Created sales partitions: {', '.join(created)}")
+    return created
+
+
+def detach_sales_partitions(
+    engine: Engine,
+    retention_months: int,
+    archive_schema: str = "sales_archive",
+    today: Optional[date] = None
+) -> List[str]:
+    """Detach monthly partitions older than ``retention_months`` into ``archive_schema``.
+
+    Detached partitions keep their data and indexes as plain tables, so they
+    can be queried, dumped or re-attached later.
+    """
+    cutoff = month_start(today or date.today(), -retention_months)
+    detached = []
+
+    with engine.begin() as conn:
+        if not is_sales_partitioned(conn):
+            return detached
+
+        conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}"))
+        for name in list_sales_partitions(conn):
+            if name == DEFAULT_PARTITION:
+                continue
+            year, month = name[len("sales_p"):].split("_")
+            if date(int(year), int(month), 1) >= cutoff:
+                continue
+            conn.execute(text(f"ALTER TABLE sales DETACH PARTITION {name}"))
+            conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {archive_schema}"))
+            detached.append(name)
+
+    if detached:
+        logger.info(f"📦 Detached sales partitions into {archive_schema}: {', '.join(detached)}")
+    return detached
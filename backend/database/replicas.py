@@ -0,0 +1,101 @@
+from itertools import count
+from threading import Lock
+from typing import Dict, List, Optional
+import logging
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary; 0 when it is streaming and has
+# replayed everything it received (an idle primary does not make a replica
+# "late"). Without a streaming WAL receiver nothing new arrives, so having
+# replayed everything proves nothing: the age of the last replayed
+# transaction counts, and NULL (nothing replayed yet) takes it out. The
+# receiver's status is only visible to superusers and pg_read_all_stats
+# members; other monitoring roles always get the age.
+_POSTGRES_LAG = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN
+            CASE
+                WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+            END
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+
+def measure_lag(connection: Connection) -> Optional[float]:
+    """Replication lag in seconds as seen by the replica itself; None when it cannot tell"""
+    if connection.dialect.name == "postgresql":
+        lag = connection.execute(_POSTGRES_LAG).scalar()
+        return float(lag) if lag is not None else None
+    # No replication to measure (e.g. SQLite stand-ins): reachable means current
+    connection.execute(text("SELECT 1"))
+    return 0.0
+
+
+class ReplicaRouter:
+    """Session factory that prefers an in-sync replica over the primary.
+
+    Sessions go round-robin to replicas that answered the last lag check
+    within ``max_lag_seconds``, and to ``primary`` when none did. Only
+    read-only work may use them: writes, and reads that must see the
+    caller's own writes, stay on the primary.
+    """
+
+    def __init__(self, primary: Engine, replica_urls: List[str], max_lag_seconds: float, **engine_options):
+        self.primary = primary
+        self.max_lag_seconds = max_lag_seconds
+        self.replicas: Dict[str, Engine] = {
+            url: create_engine(url, **engine_options) for url in replica_urls
+        }
+        # None until measured, and after a failed check
+        self.lag: Dict[str, Optional[float]] = {url: None for url in self.replicas}
+        self._turn = count()
+        self._lock = Lock()
+        self._session = sessionmaker(autocommit=False, autoflush=False)
+
+    def refresh_lag(self) -> Dict[str, Optional[float]]:
+        """Measure every replica; unreachable ones are taken out of rotation"""
+        for url, replica in self.replicas.items():
+            try:
+                with replica.connect() as connection:
+                    lag = measure_lag(connection)
+                if lag is None:
+                    logger.warning(f"🪞 Read replica {replica.url!r} is not streaming and has replayed nothing")
+            except Exception as e:
+                lag = None
+                logger.warning(f"🪞 Read replica {replica.url!r} unavailable: {e}")
+
+            with self._lock:
+                previous, self.lag[url] = self.lag[url], lag
+            if lag is not None and lag > self.max_lag_seconds and (previous is None or previous <= self.max_lag_seconds):
+                logger.warning(f"🪞 Read replica {replica.url!r} is {lag:.1f}s behind, routing reads to the primary")
+        return dict(self.lag)
+
+    def healthy(self) -> List[Engine]:
+        with self._lock:
+            return [
+                self.replicas[url] for url, lag in self.lag.items()
+                if lag is not None and lag <= self.max_lag_seconds
+            ]
+
+    def choose_engine(self) -> Engine:
+        healthy = self.healthy()
+        if not healthy:
+            return self.primary
+        return healthy[next(self._turn) % len(healthy)]
+
+    def __call__(self) -> Session:
+        return self._session(bind=self.choose_engine())
+
+    def stats(self) -> dict:
+        return {
+            replica.url.render_as_string(hide_password=True): self.lag[url]
+            for url, replica in self.replicas.items()
+        }
@@ -0,0 +1,143 @@
+from typing import Sequence
+import logging
+
+from sqlalchemy import Float, func, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query
+
+from backend.models.products import Product
+
+logger = logging.getLogger(__name__)
+
+# Searchable product columns, in ranking order (name matches weigh the most)
+PRODUCT_SEARCH_COLUMNS = ("name", "code", "brand", "active_ingredient")
+
+# SQLite FTS5 shadow table mirroring the searchable product columns
+PRODUCT_FTS_TABLE = "products_fts"
+
+# Trigram matching needs at least three characters
+MIN_INDEXED_TERM_LENGTH = 3
+
+_SQLITE_FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {PRODUCT_FTS_TABLE} USING fts5(
+        name, code, brand, active_ingredient,
+        content='products', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO {PRODUCT_FTS_TABLE}(rowid, name, code, brand, active_ingredient)
+        VALUES (new.id, new.name, new.code, new.brand, new.active_ingredient);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO {PRODUCT_FTS_TABLE}({PRODUCT_FTS_TABLE}, rowid, name, code, brand, active_ingredient)
+        VALUES ('delete', old.id, old.name, old.code, old.brand, old.active_ingredient);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, code, brand, active_ingredient ON products BEGIN
+        INSERT INTO {PRODUCT_FTS_TABLE}({PRODUCT_FTS_TABLE}, rowid, name, code, brand, active_ingredient)
+        VALUES ('delete', old.id, old.name, old.code, old.brand, old.active_ingredient);
+        INSERT INTO {PRODUCT_FTS_TABLE}(rowid, name, code, brand, active_ingredient)
+        VALUES (new.id, new.name, new.code, new.brand, new.active_ingredient);
+    END
+    """,
+]
+
+_POSTGRES_TRGM_DDL = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f"CREATE INDEX IF NOT EXISTS ix_products_{column}_trgm "
+    f"ON products USING gin ({column} gin_trgm_ops)"
+    for column in PRODUCT_SEARCH_COLUMNS
+]
+
+
+def install_product_search(engine: Engine) -> None:
+    """Create the product search indexes for the current database backend.
+
+    PostgreSQL gets pg_trgm GIN indexes, which serve ``ILIKE '%term%'``
+    directly. SQLite gets an FTS5 trigram shadow table kept in sync with
+    ``products`` by triggers. Safe to call on every startup.
+    """
+    dialect = engine.dialect.name
+
+    with engine.begin() as conn:
+        if dialect == "postgresql":
+            for statement in _POSTGRES_TRGM_DDL:
+                conn.execute(text(statement))
+        elif dialect == "sqlite":
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": PRODUCT_FTS_TABLE}
+            ).first()
+            for statement in _SQLITE_FTS_DDL:
+                conn.execute(text(statement))
+            if not exists:
+                # Backfill rows created before the shadow table existed
+                conn.execute(text(f"INSERT INTO {PRODUCT_FTS_TABLE}({PRODUCT_FTS_TABLE}) VALUES ('rebuild')"))
+        else:
+            logger.warning(f"Product search indexes not supported on '{dialect}', falling back to ILIKE")
+            return
+
+    logger.info(f"🔎 Product search indexes ready ({dialect})")
+
+
+def apply_product_search(
+    query: Query,
+    term: str,
+    columns: Sequence[str] = PRODUCT_SEARCH_COLUMNS,
+    rank: bool = True
+) -> Query:
+    """Filter a ``Product`` query by ``term`` and optionally order it by relevance.
+
+    Uses the index installed by :func:`install_product_search` for the
+    session's backend and falls back to a plain ``ILIKE`` scan otherwise.
+    """
+    term = term.strip()
+    dialect = query.session.get_bind().dialect.name
+
+    if dialect == "sqlite" and len(term) >= MIN_INDEXED_TERM_LENGTH:
+        return _apply_fts5_search(query, term, columns, rank)
+
+    search_filter = f"%{term}%"
+    query = query.filter(
+        or_(*[getattr(Product, column).ilike(search_filter) for column in columns])
+    )
+
+    if rank and dialect == "postgresql":
+        # Best trigram similarity across the searched columns
+        relevance = func.greatest(
+            *[func.coalesce(func.similarity(getattr(Product, column), term), 0) for column in columns]
+        )
+        query = query.order_by(relevance.desc())
+
+    return query
+
+
+def _apply_fts5_search(query: Query, term: str, columns: Sequence[str], rank: bool) -> Query:
+    """Join the FTS5 shadow table and rank matches with bm25"""
+    # Column filter + quoted phrase: a substring match with the trigram tokenizer
+    phrase = '"' + term.replace('"', '""') + '"'
+    match_expression = "{" + " ".join(columns) + "} : " + phrase
+
+    # Heavier weights for name, then code, brand and active ingredient
+    weights = ", ".join(
+        "10.0" if column == "name" else "5.0" if column == "code" else "1.0"
+        for column in PRODUCT_SEARCH_COLUMNS
+    )
+    matches = text(
+        f"SELECT rowid AS product_id, bm25({PRODUCT_FTS_TABLE}, {weights}) AS score "
+        f"FROM {PRODUCT_FTS_TABLE} WHERE {PRODUCT_FTS_TABLE} MATCH :match_expression"
+    ).bindparams(match_expression=match_expression)\
+     .columns(product_id=Product.id.type, score=Float)\
+     .subquery("product_matches")
+
+    query = query.join(matches, matches.c.product_id == Product.id)
+
+    if rank:
+        # bm25 scores are negative; lower is more relevant
+        query = query.order_by(matches.c.score)
+
+    return query
@@ -1,30 +1,92 @@
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
+import asyncio
 import time
 import logging
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
+from prometheus_client import CONTENT_TYPE_LATEST
 
 from backend.core.config import settings
-from backend.database.base import Base, engine
+from backend.core.logging_config import bind_request_id, configure_logging, request_id_for
+from backend.database.base import Base, engine, SessionLocal, ReplicaSessionLocal
+from backend.database.instrumentation import debug_header, log_repeated_statements, track_queries
+from backend.database.search import install_product_search
+from backend.database.partitions import ensure_sales_partitions, detach_sales_partitions
+from backend.services.archive import compact_soft_deleted
+from backend.services.autocomplete import build_autocomplete_indexes
+from backend.services.categories import ensure_category_closure
+from backend.services.outbox import dispatch_outbox, prune_outbox
+from backend.services import sales_metrics  # registers the daily sales metrics outbox consumer
+from backend.services.pharmacy_counters import reconcile_pharmacy_counters
 from backend.api.v1 import api_router
+from backend.api.admission import bulkheads
+from backend.api.profiling import profile_request
+from backend.core.metrics import REQUESTS_IN_FLIGHT, record_request, render_metrics, route_label
+from backend.core.memory import request_peaks
+from backend.core.tracing import TracedJSONResponse, trace_request, exporter as span_exporter
 
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging: structured records written by a background thread
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Rate limiter
 limiter = Limiter(key_func=get_remote_address)
 
 
+def _run_with_session(job):
+    """Run ``job(db)`` with a short-lived session"""
+    db = SessionLocal()
+    try:
+        return job(db)
+    finally:
+        db.close()
+
+
+async def _run_periodically(name: str, job, interval_seconds: int, run_first: bool = False):
+    """Run a blocking maintenance job in a worker thread every ``interval_seconds``"""
+    if not run_first:
+        await asyncio.sleep(interval_seconds)
+    while True:
+        try:
+            await asyncio.to_thread(job)
+        except Exception as e:
+            logger.error(f"{name} failed: {e}")
+        await asyncio.sleep(interval_seconds)
+
+
+def _maintain_sales_partitions():
+    ensure_sales_partitions(engine, months_ahead=settings.SALES_PARTITION_MONTHS_AHEAD)
+    if settings.SALES_PARTITION_RETENTION_MONTHS:
+        detach_sales_partitions(
+            engine,
+            retention_months=settings.SALES_PARTITION_RETENTION_MONTHS,
+            archive_schema=settings.SALES_ARCHIVE_SCHEMA
+        )
+
+
+def _compact_soft_deleted(db):
+    compact_soft_deleted(
+        db,
+        retention_days=settings.ARCHIVE_RETENTION_DAYS,
+        batch_size=settings.ARCHIVE_BATCH_SIZE
+    )
+
+
+def _dispatch_outbox(db):
+    dispatch_outbox(db, batch_size=settings.OUTBOX_BATCH_SIZE)
+
+
+def _prune_outbox(db):
+    prune_outbox(db, retention_days=settings.OUTBOX_RETENTION_DAYS)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
@@ -35,6 +97,46 @@ async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
     logger.info("📊 Database tables created successfully")
     
+    # Product search indexes (pg_trgm / FTS5)
+    install_product_search(engine)
+    
+    # Category ancestry (closure table) backfill
+    _run_with_session(ensure_category_closure)
+    
+    # In-memory autocomplete indexes (per worker)
+    _run_with_session(build_autocomplete_indexes)
+    
+    if settings.MEMORY_REQUEST_PEAKS_ENABLED:
+        request_peaks.enable()
+    
+    # Background maintenance jobs
+    background_jobs = [
+        # Pick up autocomplete changes made by other workers
+        _run_periodically("Autocomplete index refresh", lambda: _run_with_session(build_autocomplete_indexes),
+                          settings.AUTOCOMPLETE_REFRESH_SECONDS),
+        # Pharmacy counters are kept current per sale; this repairs drift
+        _run_periodically("Pharmacy counter reconciliation", lambda: _run_with_session(reconcile_pharmacy_counters),
+                          settings.PHARMACY_COUNTERS_RECONCILE_SECONDS),
+        # Monthly sales partitions (no-op unless sales is partitioned)
+        _run_periodically("Sales partition maintenance", _maintain_sales_partitions,
+                          24 * 3600, run_first=True),
+        # Move old soft-deleted rows out of the hot tables
+        _run_periodically("Soft-delete compaction", lambda: _run_with_session(_compact_soft_deleted),
+                          settings.ARCHIVE_COMPACTION_SECONDS),
+        # Feed sale change events to the outbox consumers
+        _run_periodically("Outbox dispatch", lambda: _run_with_session(_dispatch_outbox),
+                          settings.OUTBOX_POLL_SECONDS, run_first=True),
+        _run_periodically("Outbox pruning", lambda: _run_with_session(_prune_outbox),
+                          24 * 3600),
+    ]
+    if ReplicaSessionLocal.replicas:
+        # Replicas serve reads only once they have passed a lag check
+        background_jobs.append(
+            _run_periodically("Read replica lag check", ReplicaSessionLocal.refresh_lag,
+                              settings.REPLICA_LAG_CHECK_SECONDS, run_first=True)
+        )
+    tasks = [asyncio.create_task(job) for job in background_jobs]
+    
     # Initialize cache connections, background tasks, etc.
     logger.info("✅ QSDPharmalitics API is ready!")
     logger.info(f"📚 Documentation available at: http://localhost:8001{settings.API_V1_STR}/docs")
@@ -43,6 +145,10 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("👋 Shutting down QSDPharmalitics API...")
+    for task in tasks:
+        task.cancel()
+    # Flush spans still queued for export
+    await asyncio.to_thread(span_exporter.shutdown)
 
 
 # Create FastAPI application
@@ -51,6 +157,7 @@ app = FastAPI(
     description="🏥 Advanced Pharmaceutical Analytics & Reporting Platform",
     version=settings.APP_VERSION,
     lifespan=lifespan,
+    default_response_class=TracedJSONResponse,
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc",
     openapi_url=f"{settings.API_V1_STR}/openapi.json"
@@ -76,13 +183,66 @@ app.add_middleware(
 )
 
 
-# Request timing middleware
+def _record_request(request: Request, status_code: int, start_time: float, queries) -> None:
+    route = route_label(request.scope)
+    record_request(request.method, route, status_code, time.time() - start_time, queries)
+    log_repeated_statements(queries, f"{request.method} {route}")
+
+
+async def _record_after_body(body_iterator, record):
+    """Pass the body through and record the request once it has been produced.
+
+    call_next returns as soon as the headers are ready: the body (the whole
+    of a StreamingResponse such as /sales/export) is produced while it is
+    sent, and its time and statements belong to the request too.
+    """
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+    finally:
+        record()
+
+
+# Request timing and metrics middleware
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
+    status_code = 500
+    REQUESTS_IN_FLIGHT.inc()
+    request_id = request_id_for(request.headers.get("X-Request-ID"))
+    request.state.request_id = request_id
+    with trace_request(request.method, request.url.path, request.headers.get("traceparent")) as root_span, \
+            bind_request_id(request_id):
+        try:
+            with track_queries() as queries:
+                if settings.PROFILING_ENABLED and settings.PROFILING_HEADER in request.headers:
+                    response = await profile_request(request, call_next)
+                else:
+                    response = await call_next(request)
+            status_code = response.status_code
+        except BaseException:
+            _record_request(request, status_code, start_time, queries)
+            raise
+        finally:
+            process_time = time.time() - start_time
+            REQUESTS_IN_FLIGHT.dec()
+            route = route_label(request.scope)
+            if root_span is not None:
+                root_span.name = f"{request.method} {route}"
+                root_span.set(**{"http.route": route, "http.status_code": status_code})
     response.headers["X-Process-Time"] = str(process_time)
+    response.headers["X-Request-ID"] = request_id
+    if root_span is not None:
+        response.headers["X-Trace-Id"] = root_span.trace_id
+    if settings.SQL_DEBUG_HEADER:
+        response.headers["X-SQL-Queries"] = debug_header(queries)
+    if hasattr(response, "body_iterator"):
+        response.body_iterator = _record_after_body(
+            response.body_iterator, lambda: _record_request(request, status_code, start_time, queries)
+        )
+    else:
+        # Built in full already (profiled requests)
+        _record_request(request, status_code, start_time, queries)
     return response
 
 
@@ -111,10 +271,19 @@ async def health_check(request: Request):
         "timestamp": time.time(),
         "environment": settings.ENVIRONMENT,
         "database": "connected",
-        "analytics": "enabled" if settings.ENABLE_ADVANCED_ANALYTICS else "basic"
+        "analytics": "enabled" if settings.ENABLE_ADVANCED_ANALYTICS else "basic",
+        "admission": {name: bulkhead.stats() for name, bulkhead in bulkheads.items()},
+        "replica_lag_seconds": ReplicaSessionLocal.stats()
     }
 
 
+# Prometheus metrics (per worker process)
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(await run_in_threadpool(render_metrics), media_type=CONTENT_TYPE_LATEST)
+
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
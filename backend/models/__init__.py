@@ -1,8 +1,10 @@
 # Import all models here for Alembic auto-generation
 from .user import User
 from .sales import Sale
-from .products import Product, ProductCategory
+from .products import Product, ProductCategory, ProductCategoryClosure
 from .pharmacies import Pharmacy
+from .outbox import OutboxEvent, OutboxCheckpoint
+from .archive import archived_sales, archived_products, archived_pharmacies
 from .analytics import (
     SalesMetric,
     MarketShareData,
@@ -15,7 +17,13 @@ __all__ = [
     "Sale", 
     "Product",
     "ProductCategory",
+    "ProductCategoryClosure",
     "Pharmacy",
+    "OutboxEvent",
+    "OutboxCheckpoint",
+    "archived_sales",
+    "archived_products",
+    "archived_pharmacies",
     "SalesMetric",
     "MarketShareData", 
     "TrendAnalysis",
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, DateTime, Table
+from sqlalchemy.sql import func
+from backend.database.base import Base
+from .sales import Sale
+from .products import Product
+from .pharmacies import Pharmacy
+
+
+def _archive_table(source: Table, name: str) -> Table:
+    """Column-for-column copy of ``source`` without foreign keys or unique constraints.
+
+    Archived rows keep their ids, so archived sales still resolve to their
+    product and pharmacy in either the hot or the archive table.
+    """
+    columns = [
+        Column(column.name, column.type, primary_key=column.name == "id", nullable=column.nullable)
+        for column in source.columns
+    ]
+    return Table(
+        name,
+        Base.metadata,
+        *columns,
+        Column("archived_at", DateTime(timezone=True), server_default=func.now(), index=True)
+    )
+
+
+archived_sales = _archive_table(Sale.__table__, "archived_sales")
+archived_products = _archive_table(Product.__table__, "archived_products")
+archived_pharmacies = _archive_table(Pharmacy.__table__, "archived_pharmacies")
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, JSON
+from sqlalchemy.sql import func
+from backend.database.base import Base
+
+# SQLite only autoincrements INTEGER PRIMARY KEY columns
+EventId = BigInteger().with_variant(Integer(), "sqlite")
+
+
+class OutboxEvent(Base):
+    """A change to an aggregate, written in the same transaction as the change itself"""
+    __tablename__ = "outbox_events"
+
+    id = Column(EventId, primary_key=True, autoincrement=True)
+    aggregate_type = Column(String(50), nullable=False)
+    aggregate_id = Column(Integer, nullable=False)
+    event_type = Column(String(50), nullable=False, index=True)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<OutboxEvent(id={self.id}, type={self.event_type}, aggregate={self.aggregate_type}:{self.aggregate_id})>"
+
+
+class OutboxCheckpoint(Base):
+    """How far a consumer has processed the outbox"""
+    __tablename__ = "outbox_checkpoints"
+
+    consumer = Column(String(100), primary_key=True)
+    last_event_id = Column(EventId, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<OutboxCheckpoint(consumer={self.consumer}, last_event_id={self.last_event_id})>"
@@ -57,14 +57,16 @@ class Pharmacy(Base):
     territory = Column(String(50), nullable=True)
     population_density = Column(String(20), nullable=True)  # Urban, Suburban, Rural
     
-    # Performance Metrics
-    annual_volume = Column(Numeric(12, 2), default=0.00)
+    # Performance Metrics (maintained from sales, see services/pharmacy_counters.py)
+    annual_volume = Column(Numeric(12, 2), default=0.00, index=True)
+    annual_order_count = Column(Integer, default=0, nullable=False, server_default="0")
     average_order_value = Column(Numeric(10, 2), default=0.00)
     last_order_date = Column(DateTime(timezone=True), nullable=True)
     
     # Status & Metadata
     is_active = Column(Boolean, default=True, nullable=False)
     is_verified = Column(Boolean, default=False, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Numeric
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Numeric, event, inspect, literal, select, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from backend.database.base import Base
@@ -25,6 +25,58 @@ class ProductCategory(Base):
         return f"<ProductCategory(id={self.id}, name={self.name})>"
 
 
+class ProductCategoryClosure(Base):
+    """Closure table: one row per (ancestor, descendant) pair, including self at depth 0"""
+    __tablename__ = "product_category_closure"
+
+    ancestor_id = Column(Integer, ForeignKey("product_categories.id"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("product_categories.id"), primary_key=True, index=True)
+    depth = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<ProductCategoryClosure(ancestor={self.ancestor_id}, descendant={self.descendant_id}, depth={self.depth})>"
+
+
+@event.listens_for(ProductCategory, "after_insert")
+def _add_category_paths(mapper, connection, target):
+    """Link a new category to itself and to every ancestor of its parent"""
+    closure = ProductCategoryClosure.__table__
+    connection.execute(
+        closure.insert().from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(closure.c.ancestor_id, literal(target.id), closure.c.depth + 1)
+            .where(closure.c.descendant_id == target.parent_id)
+            .union_all(select(literal(target.id), literal(target.id), literal(0)))
+        )
+    )
+
+
+@event.listens_for(ProductCategory, "after_update")
+def _move_category_paths(mapper, connection, target):
+    """Re-hang the category's subtree under its new parent"""
+    if not inspect(target).attrs.parent_id.history.has_changes():
+        return
+    
+    params = {"node_id": target.id, "parent_id": target.parent_id}
+    
+    # Drop paths from the old ancestors into the subtree
+    connection.execute(text("""
+        DELETE FROM product_category_closure
+        WHERE descendant_id IN (SELECT descendant_id FROM product_category_closure WHERE ancestor_id = :node_id)
+          AND ancestor_id NOT IN (SELECT descendant_id FROM product_category_closure WHERE ancestor_id = :node_id)
+    """), params)
+    
+    # Connect every ancestor of the new parent to every node of the subtree
+    if target.parent_id is not None:
+        connection.execute(text("""
+            INSERT INTO product_category_closure (ancestor_id, descendant_id, depth)
+            SELECT above.ancestor_id, below.descendant_id, above.depth + below.depth + 1
+            FROM product_category_closure above
+            CROSS JOIN product_category_closure below
+            WHERE above.descendant_id = :parent_id AND below.ancestor_id = :node_id
+        """), params)
+
+
 class Product(Base):
     __tablename__ = "products"
 
@@ -46,7 +98,7 @@ class Product(Base):
     cost_price = Column(Numeric(10, 2), nullable=True)
     
     # Classification
-    category_id = Column(Integer, ForeignKey("product_categories.id"), nullable=False)
+    category_id = Column(Integer, ForeignKey("product_categories.id"), nullable=False, index=True)
     therapeutic_class = Column(String(100), nullable=True)
     controlled_substance = Column(Boolean, default=False)
     prescription_required = Column(Boolean, default=False)
@@ -59,6 +111,7 @@ class Product(Base):
     # Status
     is_active = Column(Boolean, default=True, nullable=False)
     is_available = Column(Boolean, default=True, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
     
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
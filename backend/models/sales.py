@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum, Numeric
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum, Numeric, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -47,7 +47,8 @@ class Sale(Base):
     sale_date = Column(DateTime(timezone=True), server_default=func.now())
     delivery_date = Column(DateTime(timezone=True), nullable=True)
     
-    # Reference Numbers
+    # Reference Numbers (unique indexes here; on the partitioned PostgreSQL
+    # table uniqueness is enforced through sales_reference_numbers, see alembic/versions)
     order_number = Column(String(50), unique=True, nullable=True, index=True)
     invoice_number = Column(String(50), unique=True, nullable=True, index=True)
     po_number = Column(String(50), nullable=True)  # Purchase Order from customer
@@ -70,6 +71,25 @@ class Sale(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     is_active = Column(Boolean, default=True, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # set on soft delete, drives archiving
+    
+    # Access-path indexes: every listing and analytics query filters on
+    # is_active, so they are partial on live rows (see alembic/versions)
+    __table_args__ = (
+        Index("ix_sales_active_sale_date", sale_date,
+              postgresql_where=is_active == True, sqlite_where=is_active == True),
+        Index("ix_sales_active_created_at", created_at,
+              postgresql_where=is_active == True, sqlite_where=is_active == True),
+        Index("ix_sales_rep_created_at", sales_rep_id, created_at,
+              postgresql_where=is_active == True, sqlite_where=is_active == True),
+        Index("ix_sales_product_sale_date", product_id, sale_date,
+              postgresql_where=is_active == True, sqlite_where=is_active == True),
+        Index("ix_sales_pharmacy_sale_date", pharmacy_id, sale_date,
+              postgresql_where=is_active == True, sqlite_where=is_active == True),
+        # Soft-deleted rows waiting to be archived (services/archive.py)
+        Index("ix_sales_deleted_at", deleted_at,
+              postgresql_where=is_active == False, sqlite_where=is_active == False),
+    )
     
     # Relationships
     product = relationship("Product", back_populates="sales")
@@ -93,7 +113,14 @@ class Sale(Base):
             return (float(self.discount_amount) / float(self.total_price)) * 100
         return 0
     
+    @staticmethod
+    def compute_totals(quantity, unit_price, discount_amount=0, tax_amount=0) -> tuple:
+        """(total_price, final_amount) for the given line values"""
+        total_price = quantity * unit_price
+        return total_price, total_price - (discount_amount or 0) + (tax_amount or 0)
+    
     def calculate_totals(self):
         """Calculate all monetary fields based on quantity and unit_price"""
-        self.total_price = self.quantity * self.unit_price
-        self.final_amount = self.total_price - self.discount_amount + self.tax_amount
\ No newline at end of file
+        self.total_price, self.final_amount = Sale.compute_totals(
+            self.quantity, self.unit_price, self.discount_amount, self.tax_amount
+        )
\ No newline at end of file
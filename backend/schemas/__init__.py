@@ -10,6 +10,7 @@ from .analytics import (
     DashboardSummaryResponse
 )
 from .reports import ReportRequest, ReportResponse
+from .imports import CatalogImportResponse, ImportRowError
 
 __all__ = [
     "UserCreate", "UserUpdate", "UserResponse", "UserLogin", "Token",
@@ -19,5 +20,6 @@ __all__ = [
     "PharmacyCreate", "PharmacyUpdate", "PharmacyResponse",
     "AnalyticsResponse", "SalesPerformanceResponse", "MarketShareResponse",
     "TrendAnalysisResponse", "DashboardSummaryResponse",
-    "ReportRequest", "ReportResponse"
+    "ReportRequest", "ReportResponse",
+    "CatalogImportResponse", "ImportRowError"
 ]
\ No newline at end of file
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+class ImportRowError(BaseModel):
+    row: int  # 1-based data row (header excluded)
+    code: Optional[str] = None
+    errors: List[str]
+
+
+class CatalogImportResponse(BaseModel):
+    entity: str
+    file_format: str
+    total_rows: int
+    inserted: int
+    updated: int
+    failed: int
+    errors: List[ImportRowError]
@@ -67,6 +67,7 @@ class PharmacyUpdate(BaseModel):
 class PharmacyResponse(PharmacyBase):
     id: int
     annual_volume: Decimal
+    annual_order_count: int = 0
     average_order_value: Decimal
     last_order_date: Optional[datetime] = None
     is_active: bool
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import datetime
 from decimal import Decimal
+from backend.core.config import settings
 from backend.models.sales import PaymentMethod, SaleStatus
 
 
@@ -78,6 +79,33 @@ class SaleListResponse(BaseModel):
     pages: int
 
 
+class SaleStatusFilters(BaseModel):
+    product_id: Optional[int] = None
+    pharmacy_id: Optional[int] = None
+    sales_rep_id: Optional[int] = None
+    status: Optional[SaleStatus] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+
+
+class SaleStatusBulkUpdate(BaseModel):
+    status: SaleStatus
+    sale_ids: Optional[List[int]] = Field(None, min_length=1, max_length=settings.BULK_STATUS_MAX_ROWS)
+    filters: Optional[SaleStatusFilters] = None
+
+
+class SaleStatusOutcome(BaseModel):
+    id: int
+    outcome: Literal["updated", "unchanged", "invalid_transition", "conflict", "not_found"]
+    previous_status: Optional[SaleStatus] = None
+
+
+class SaleStatusBulkResponse(BaseModel):
+    status: SaleStatus
+    updated: int
+    outcomes: List[SaleStatusOutcome]
+
+
 class SalesSummary(BaseModel):
     total_sales: int
     total_revenue: Decimal
@@ -0,0 +1 @@
+# Backend Services Module
\ No newline at end of file
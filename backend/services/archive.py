@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+import logging
+
+from sqlalchemy import Table, and_, delete, exists, insert, select, text
+from sqlalchemy.orm import Session
+
+from backend.models.archive import archived_sales, archived_products, archived_pharmacies
+from backend.models.pharmacies import Pharmacy
+from backend.models.products import Product
+from backend.models.sales import Sale
+
+logger = logging.getLogger(__name__)
+
+
+def _move_batches(db: Session, source: Table, archive: Table, condition, batch_size: int) -> int:
+    """Copy matching rows into ``archive`` and delete them from ``source``, one batch per transaction"""
+    columns = [column.name for column in source.columns]
+    moved = 0
+
+    while True:
+        ids = db.execute(
+            select(source.c.id).where(condition).order_by(source.c.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+
+        db.execute(
+            insert(archive).from_select(
+                columns, select(*[source.c[name] for name in columns]).where(source.c.id.in_(ids))
+            )
+        )
+        db.execute(delete(source).where(source.c.id.in_(ids)))
+        db.commit()
+        moved += len(ids)
+
+    return moved
+
+
+def _vacuum(db: Session, tables) -> None:
+    """Reclaim dead tuples and refresh statistics after a large delete (PostgreSQL)"""
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in tables:
+            conn.execute(text(f"VACUUM (ANALYZE) {table}"))
+
+
+def compact_soft_deleted(db: Session, retention_days: int = 90, batch_size: int = 1000) -> Dict[str, int]:
+    """Move rows soft-deleted more than ``retention_days`` ago into the archive tables.
+
+    Sales go first so their products and pharmacies can follow. A product
+    or pharmacy is only archived once no row left in ``sales`` references
+    it, so every report join over the hot tables stays intact. Pharmacy
+    counters only count active sales and do not change.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    sales = Sale.__table__
+    products = Product.__table__
+    pharmacies = Pharmacy.__table__
+
+    def expired(table):
+        return and_(table.c.is_active == False, table.c.deleted_at != None, table.c.deleted_at < cutoff)
+
+    def unreferenced(foreign_key, table):
+        # Live and dead sales checked separately so each uses its partial index
+        return and_(
+            ~exists().where(foreign_key == table.c.id, sales.c.is_active == True),
+            ~exists().where(foreign_key == table.c.id, sales.c.is_active == False)
+        )
+
+    moved = {
+        "sales": _move_batches(db, sales, archived_sales, expired(sales), batch_size),
+        "products": _move_batches(
+            db, products, archived_products,
+            and_(expired(products), unreferenced(sales.c.product_id, products)),
+            batch_size
+        ),
+        "pharmacies": _move_batches(
+            db, pharmacies, archived_pharmacies,
+            and_(expired(pharmacies), unreferenced(sales.c.pharmacy_id, pharmacies)),
+            batch_size
+        ),
+    }
+
+    touched = [table for table, count in moved.items() if count]
+    if touched:
+        _vacuum(db, touched)
+        logger.info(f"🗄️ Archived soft-deleted rows: {', '.join(f'{count} {table}' for table, count in moved.items())}")
+
+    return moved
@@ -0,0 +1,212 @@
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import logging
+import re
+import threading
+import unicodedata
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.models.products import Product
+from backend.models.pharmacies import Pharmacy
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_SPLIT = re.compile(r"[\s,;/()\-]+")
+
+
+def _normalize(value: str) -> str:
+    """Lowercase and strip accents so 'Farmácia' matches 'farmacia'"""
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).strip()
+
+
+def _tokenize(values: Iterable[Optional[str]]) -> Set[str]:
+    """Index each field as a whole (phrase prefixes) and word by word"""
+    tokens = set()
+    for value in values:
+        if not value:
+            continue
+        normalized = _normalize(value)
+        tokens.add(normalized)
+        tokens.update(word for word in _TOKEN_SPLIT.split(normalized) if word)
+    return tokens
+
+
+class PrefixIndex:
+    """Sorted-array prefix index mapping normalized tokens to entity payloads.
+
+    Lookups are a binary search plus a short forward scan. Writes keep the
+    array sorted, so the index can be maintained incrementally.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.ready = False
+        self._keys: List[Tuple[str, int]] = []
+        self._tokens: Dict[int, Set[str]] = {}
+        self._payloads: Dict[int, dict] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def rebuild(self, entries: Iterable[Tuple[int, Iterable[Optional[str]], dict]]) -> None:
+        """Replace the whole index with ``(entity_id, values, payload)`` entries"""
+        keys, tokens_by_id, payloads = [], {}, {}
+        for entity_id, values, payload in entries:
+            tokens = _tokenize(values)
+            keys.extend((token, entity_id) for token in tokens)
+            tokens_by_id[entity_id] = tokens
+            payloads[entity_id] = payload
+        keys.sort()
+
+        with self._lock:
+            self._keys, self._tokens, self._payloads = keys, tokens_by_id, payloads
+            self.ready = True
+
+    def upsert(self, entity_id: int, values: Iterable[Optional[str]], payload: dict) -> None:
+        tokens = _tokenize(values)
+        with self._lock:
+            self._discard(entity_id)
+            for token in tokens:
+                insort(self._keys, (token, entity_id))
+            self._tokens[entity_id] = tokens
+            self._payloads[entity_id] = payload
+
+    def remove(self, entity_id: int) -> None:
+        with self._lock:
+            self._discard(entity_id)
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """Return up to ``limit`` payloads with a token starting with ``query``"""
+        prefix = _normalize(query)
+        matches: List[int] = []
+
+        with self._lock:
+            position = bisect_left(self._keys, (prefix,))
+            while position < len(self._keys) and len(matches) < limit:
+                token, entity_id = self._keys[position]
+                if not token.startswith(prefix):
+                    break
+                if entity_id not in matches:
+                    matches.append(entity_id)
+                position += 1
+            results = [self._payloads[entity_id] for entity_id in matches]
+
+        return sorted(results, key=lambda payload: payload["name"])
+
+    def _discard(self, entity_id: int) -> None:
+        for token in self._tokens.pop(entity_id, ()):
+            position = bisect_left(self._keys, (token, entity_id))
+            if position < len(self._keys) and self._keys[position] == (token, entity_id):
+                del self._keys[position]
+        self._payloads.pop(entity_id, None)
+
+
+# Per-worker indexes
+product_index = PrefixIndex("products")
+pharmacy_index = PrefixIndex("pharmacies")
+
+
+def _product_entry(product: Product) -> Optional[Tuple[int, Tuple, dict]]:
+    """Index entry for a product, or None if it should not be suggested"""
+    if not (product.is_active and product.is_available):
+        return None
+    return (
+        product.id,
+        (product.name, product.code, product.brand),
+        {
+            "id": product.id,
+            "code": product.code,
+            "name": product.name,
+            "brand": product.brand,
+            "full_description": product.full_description,
+            "unit_price": product.unit_price
+        }
+    )
+
+
+def _pharmacy_entry(pharmacy: Pharmacy) -> Optional[Tuple[int, Tuple, dict]]:
+    """Index entry for a pharmacy, or None if it should not be suggested"""
+    if not pharmacy.is_active:
+        return None
+    return (
+        pharmacy.id,
+        (pharmacy.name, pharmacy.code, pharmacy.city),
+        {
+            "id": pharmacy.id,
+            "code": pharmacy.code,
+            "name": pharmacy.name,
+            "location": pharmacy.location,
+            "pharmacy_type": pharmacy.pharmacy_type,
+            "customer_type": pharmacy.customer_type
+        }
+    )
+
+
+_ENTRY_BUILDERS = {
+    Product: (product_index, _product_entry),
+    Pharmacy: (pharmacy_index, _pharmacy_entry),
+}
+
+
+def refresh_product_index(db: Session) -> None:
+    """Rebuild the product index from the database (e.g. after bulk writes)"""
+    products = db.query(Product)\
+        .filter(Product.is_active == True, Product.is_available == True)\
+        .yield_per(1000)
+    product_index.rebuild(filter(None, (_product_entry(product) for product in products)))
+
+
+def refresh_pharmacy_index(db: Session) -> None:
+    """Rebuild the pharmacy index from the database (e.g. after bulk writes)"""
+    pharmacies = db.query(Pharmacy)\
+        .filter(Pharmacy.is_active == True)\
+        .yield_per(1000)
+    pharmacy_index.rebuild(filter(None, (_pharmacy_entry(pharmacy) for pharmacy in pharmacies)))
+
+
+def build_autocomplete_indexes(db: Session) -> None:
+    """(Re)build both indexes from the database"""
+    refresh_product_index(db)
+    refresh_pharmacy_index(db)
+    logger.info(f"🔤 Autocomplete indexes built: {len(product_index)} products, {len(pharmacy_index)} pharmacies")
+
+
+# Incremental maintenance: capture entries at flush time (attributes are
+# still loaded), apply them once the transaction has committed.
+_PENDING_KEY = "autocomplete_pending"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_autocomplete_changes(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, [])
+
+    for instance in list(session.new) + list(session.dirty):
+        builder = _ENTRY_BUILDERS.get(type(instance))
+        if builder:
+            index, make_entry = builder
+            pending.append((index, instance.id, make_entry(instance)))
+
+    for instance in session.deleted:
+        builder = _ENTRY_BUILDERS.get(type(instance))
+        if builder:
+            pending.append((builder[0], instance.id, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_autocomplete_changes(session):
+    for index, entity_id, entry in session.info.pop(_PENDING_KEY, []):
+        if not index.ready:
+            continue
+        if entry is None:
+            index.remove(entity_id)
+        else:
+            index.upsert(*entry)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_autocomplete_changes(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,248 @@
+from typing import Dict, Iterator, List, Optional, Set, Type
+from io import BytesIO, StringIO
+import csv
+import json
+import logging
+import math
+import zipfile
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.models.products import Product, ProductCategory
+from backend.models.pharmacies import Pharmacy
+from backend.schemas.products import ProductCreate
+from backend.schemas.pharmacies import PharmacyCreate
+
+logger = logging.getLogger(__name__)
+
+# Formats the importer can parse; the upload must also be in ALLOWED_FILE_TYPES.
+# Legacy .xls would need xlrd, which is not a dependency
+IMPORT_FORMATS = {"csv", "xlsx", "ndjson"}
+
+
+class ImportFileError(ValueError):
+    """Raised when an uploaded catalog file cannot be accepted or parsed"""
+    status_code = 400
+
+
+class ImportFileTooLarge(ImportFileError):
+    status_code = 413
+
+
+def import_file_format(filename: Optional[str]) -> str:
+    """Resolve the import format from the file extension"""
+    extension = (filename or "").rsplit(".", 1)[-1].lower() if "." in (filename or "") else ""
+    if extension == "jsonl":
+        extension = "ndjson"
+    if extension not in IMPORT_FORMATS or extension not in settings.ALLOWED_FILE_TYPES:
+        allowed = sorted(IMPORT_FORMATS & set(settings.ALLOWED_FILE_TYPES))
+        raise ImportFileError(f"Unsupported file type '{extension}'. Allowed: {', '.join(allowed)}")
+    return extension
+
+
+async def read_import_upload(file) -> tuple:
+    """Read an ``UploadFile`` within MAX_FILE_SIZE and parse it; returns (format, rows)"""
+    file_format = import_file_format(file.filename)
+    contents = await file.read(settings.MAX_FILE_SIZE + 1)
+    if len(contents) > settings.MAX_FILE_SIZE:
+        raise ImportFileTooLarge(f"File exceeds the maximum size of {settings.MAX_FILE_SIZE} bytes")
+    return file_format, parse_import_file(contents, file_format)
+
+
+def parse_import_file(contents: bytes, file_format: str) -> List[dict]:
+    """Parse an uploaded file into raw row dicts (blank cells become None)"""
+    try:
+        if file_format == "csv":
+            rows = list(csv.DictReader(StringIO(contents.decode("utf-8-sig"))))
+        elif file_format == "ndjson":
+            rows = [json.loads(line) for line in contents.decode("utf-8-sig").splitlines() if line.strip()]
+        else:
+            import pandas as pd
+            rows = pd.read_excel(BytesIO(contents), dtype=object).to_dict(orient="records")
+    except (UnicodeDecodeError, ValueError, csv.Error, zipfile.BadZipFile, KeyError) as e:
+        # KeyError: an .xlsx archive missing one of its parts
+        raise ImportFileError(f"Could not parse {file_format} file: {e}")
+
+    return [_clean_row(row) for row in rows]
+
+
+def _clean_row(row) -> dict:
+    if not isinstance(row, dict):
+        return {}
+    cleaned = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip() or None
+        elif isinstance(value, float) and math.isnan(value):
+            value = None
+        cleaned[str(key).strip()] = value
+    return cleaned
+
+
+def _batches(rows: List[dict], size: int) -> Iterator[List[tuple]]:
+    numbered = list(enumerate(rows, start=1))
+    for start in range(0, len(numbered), size):
+        yield numbered[start:start + size]
+
+
+def _validate(schema: Type[BaseModel], row: dict) -> tuple:
+    """Validate one row; returns (record, errors)"""
+    try:
+        return schema(**row).dict(), []
+    except ValidationError as e:
+        return None, [
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            for error in e.errors()
+        ]
+
+
+def _upsert(db: Session, model, records: List[dict], update_columns: Set[str]) -> None:
+    """Insert-or-update ``records`` on ``code`` in a single set-based statement"""
+    if not records:
+        return
+
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        statement = dialect_insert(table)
+        assignments = {column: statement.excluded[column] for column in update_columns}
+        assignments["is_active"] = True  # re-importing revives soft-deleted rows
+        assignments["updated_at"] = func.now()
+        db.execute(
+            statement.on_conflict_do_update(index_elements=[table.c.code], set_=assignments),
+            records
+        )
+        return
+
+    # Generic fallback: one multi-row INSERT plus one executemany UPDATE
+    codes = [record["code"] for record in records]
+    existing = set(db.execute(select(table.c.code).where(table.c.code.in_(codes))).scalars())
+    new_records = [record for record in records if record["code"] not in existing]
+    if new_records:
+        db.execute(insert(table), new_records)
+
+    changed = [
+        {"match_code": record["code"], **{f"new_{column}": record[column] for column in update_columns}}
+        for record in records if record["code"] in existing
+    ]
+    if changed:
+        db.execute(
+            update(table)
+            .where(table.c.code == bindparam("match_code"))
+            .values(is_active=True, updated_at=func.now(),
+                    **{column: bindparam(f"new_{column}") for column in update_columns}),
+            changed
+        )
+
+
+def _import_rows(
+    db: Session,
+    model,
+    schema: Type[BaseModel],
+    rows: List[dict],
+    check_batch=None
+) -> Dict:
+    """Validate and upsert ``rows`` batch by batch, collecting row-level errors"""
+    fields = set(schema.model_fields)
+    report = {"total_rows": len(rows), "inserted": 0, "updated": 0, "failed": 0, "errors": []}
+
+    for batch in _batches(rows, settings.IMPORT_BATCH_SIZE):
+        # code -> (row number, record, columns the row supplied)
+        valid: Dict[str, tuple] = {}
+        # (row number, record) of rows inserted without a code
+        without_code: List[tuple] = []
+
+        for row_number, row in batch:
+            record, errors = _validate(schema, row)
+            if errors:
+                report["errors"].append({"row": row_number, "code": row.get("code"), "errors": errors})
+                continue
+
+            # Only columns present in this row are updated on an existing record
+            provided = frozenset(key for key in row if key in fields) - {"code"}
+            code = record.get("code")
+            if not code:
+                without_code.append((row_number, record))
+            elif code in valid:
+                # Last occurrence of a code in the file wins
+                previous_row = valid[code][0]
+                report["errors"].append({
+                    "row": previous_row, "code": code,
+                    "errors": [f"Duplicate code, superseded by row {row_number}"]
+                })
+                valid[code] = (row_number, record, provided)
+            else:
+                valid[code] = (row_number, record, provided)
+
+        # Cross-row checks against the database, one query per batch
+        if check_batch and valid:
+            for code, errors in check_batch(db, {code: record for code, (_, record, _) in valid.items()}).items():
+                row_number = valid.pop(code)[0]
+                report["errors"].append({"row": row_number, "code": code, "errors": errors})
+
+        # One upsert per distinct set of supplied columns
+        by_columns: Dict[frozenset, List[dict]] = {}
+        for _, record, provided in valid.values():
+            by_columns.setdefault(provided, []).append(record)
+        existing = set(
+            db.execute(select(model.code).where(model.code.in_(list(valid)))).scalars()
+        ) if valid else set()
+
+        try:
+            for provided, records in by_columns.items():
+                _upsert(db, model, records, provided)
+            if without_code:
+                db.execute(insert(model.__table__), [record for _, record in without_code])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"{model.__tablename__} import batch failed: {e}")
+            for row_number, record, _ in valid.values():
+                report["errors"].append({"row": row_number, "code": record.get("code"), "errors": [str(e)]})
+            for row_number, _ in without_code:
+                report["errors"].append({"row": row_number, "code": None, "errors": [str(e)]})
+            continue
+
+        report["updated"] += len(existing)
+        report["inserted"] += len(valid) - len(existing) + len(without_code)
+
+    report["errors"].sort(key=lambda error: error["row"])
+    report["failed"] = len({error["row"] for error in report["errors"]})
+    return report
+
+
+def _check_product_categories(db: Session, records: Dict[str, dict]) -> Dict[str, List[str]]:
+    category_ids = {record["category_id"] for record in records.values()}
+    known = set(db.execute(
+        select(ProductCategory.id).where(ProductCategory.id.in_(category_ids))
+    ).scalars())
+    return {
+        code: [f"category_id: Product category {record['category_id']} not found"]
+        for code, record in records.items()
+        if record["category_id"] not in known
+    }
+
+
+def import_products(db: Session, rows: List[dict]) -> Dict:
+    """Bulk upsert products on ``code``"""
+    report = _import_rows(db, Product, ProductCreate, rows, check_batch=_check_product_categories)
+    logger.info(f"💊 Product import: {report['inserted']} inserted, {report['updated']} updated, {report['failed']} failed")
+    return report
+
+
+def import_pharmacies(db: Session, rows: List[dict]) -> Dict:
+    """Bulk upsert pharmacies on ``code`` (rows without a code are inserted)"""
+    report = _import_rows(db, Pharmacy, PharmacyCreate, rows)
+    logger.info(f"🏪 Pharmacy import: {report['inserted']} inserted, {report['updated']} updated, {report['failed']} failed")
+    return report
@@ -0,0 +1,92 @@
+from typing import Optional
+import logging
+
+from sqlalchemy import and_, or_, select, text
+from sqlalchemy.orm import Session, aliased
+
+from backend.models.products import Product, ProductCategory, ProductCategoryClosure
+from backend.models.sales import Sale
+
+logger = logging.getLogger(__name__)
+
+
+def rebuild_category_closure(db: Session) -> int:
+    """Recompute the closure table from ``parent_id`` links (repair / backfill)"""
+    db.execute(text("DELETE FROM product_category_closure"))
+    db.execute(text("""
+        WITH RECURSIVE paths(ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM product_categories
+            UNION ALL
+            SELECT paths.ancestor_id, child.id, paths.depth + 1
+            FROM paths
+            JOIN product_categories child ON child.parent_id = paths.descendant_id
+        )
+        INSERT INTO product_category_closure (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, descendant_id, depth FROM paths
+    """))
+    db.commit()
+
+    total = db.query(ProductCategoryClosure).count()
+    logger.info(f"🌳 Category closure rebuilt: {total} paths")
+    return total
+
+
+def ensure_category_closure(db: Session) -> None:
+    """Backfill the closure table when categories predate it"""
+    categories = db.query(ProductCategory).count()
+    self_paths = db.query(ProductCategoryClosure)\
+        .filter(ProductCategoryClosure.depth == 0)\
+        .count()
+    if categories != self_paths:
+        rebuild_category_closure(db)
+
+
+def category_subtree(category_id: int):
+    """Select the ids of a category and all of its descendants"""
+    return select(ProductCategoryClosure.descendant_id)\
+        .where(ProductCategoryClosure.ancestor_id == category_id)
+
+
+def sale_in_category(category_id: int):
+    """Filter clause restricting sales to products anywhere under a category"""
+    return Sale.product_id.in_(
+        select(Product.id).where(Product.category_id.in_(category_subtree(category_id)))
+    )
+
+
+def is_in_subtree(db: Session, category_id: int, root_id: int) -> bool:
+    """True if ``category_id`` is ``root_id`` or one of its descendants"""
+    return db.query(ProductCategoryClosure)\
+        .filter(
+            ProductCategoryClosure.ancestor_id == root_id,
+            ProductCategoryClosure.descendant_id == category_id
+        )\
+        .first() is not None
+
+
+def rollup_categories(query, parent_id: Optional[int] = None):
+    """Join a query that already joins ``Product`` to the rollup level below ``parent_id``.
+
+    Every product is attributed to exactly one rollup category: the child of
+    ``parent_id`` (or the root category when ``parent_id`` is None) whose
+    subtree contains it. Products sitting directly in ``parent_id`` are
+    attributed to ``parent_id`` itself. Returns ``(query, rollup_category)``
+    so callers can select and group by the aliased category.
+    """
+    path = aliased(ProductCategoryClosure)
+    rollup_category = aliased(ProductCategory)
+
+    query = query.join(path, path.descendant_id == Product.category_id)\
+        .join(rollup_category, rollup_category.id == path.ancestor_id)
+
+    if parent_id is None:
+        query = query.filter(rollup_category.parent_id.is_(None))
+    else:
+        query = query.filter(
+            or_(
+                rollup_category.parent_id == parent_id,
+                and_(rollup_category.id == parent_id, path.depth == 0)
+            )
+        )
+
+    return query, rollup_category
@@ -0,0 +1,88 @@
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, Optional, Tuple
+import logging
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.models.pharmacies import Pharmacy
+from backend.models.products import Product
+from backend.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class DimensionCache:
+    """Per-process TTL cache of the few dimension columns the write path needs.
+
+    Entries are evicted on ORM updates/deletes in this process; other
+    workers' changes (and Core bulk writes) are picked up within the TTL.
+    Missing rows are not cached.
+    """
+
+    def __init__(self, loader: Callable[[Session, int], Optional[dict]], ttl_seconds: int):
+        self.loader = loader
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, Tuple[float, dict]] = {}
+        self._lock = Lock()
+
+    def get(self, db: Session, key: int) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > monotonic():
+            return entry[1]
+
+        value = self.loader(db, key)
+        if value is not None:
+            with self._lock:
+                self._entries[key] = (monotonic() + self.ttl_seconds, value)
+        return value
+
+    def __contains__(self, key: int) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > monotonic()
+
+    def put(self, key: int, value: dict) -> None:
+        with self._lock:
+            self._entries[key] = (monotonic() + self.ttl_seconds, value)
+
+    def invalidate(self, key: Optional[int] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+def _load_row(*columns):
+    def load(db: Session, key: int) -> Optional[dict]:
+        row = db.execute(select(*columns).where(columns[0] == key)).first()
+        return dict(row._mapping) if row is not None else None
+    return load
+
+
+product_cache = DimensionCache(
+    _load_row(Product.id, Product.name, Product.code, Product.cost_price),
+    settings.DIMENSION_CACHE_TTL_SECONDS
+)
+pharmacy_cache = DimensionCache(
+    _load_row(Pharmacy.id, Pharmacy.name, Pharmacy.city, Pharmacy.state),
+    settings.DIMENSION_CACHE_TTL_SECONDS
+)
+user_cache = DimensionCache(
+    _load_row(User.id, User.first_name, User.last_name),
+    settings.DIMENSION_CACHE_TTL_SECONDS
+)
+
+
+def _evict_on_change(model, cache: DimensionCache) -> None:
+    @event.listens_for(model, "after_update")
+    @event.listens_for(model, "after_delete")
+    def evict(mapper, connection, target):
+        cache.invalidate(target.id)
+
+
+_evict_on_change(Product, product_cache)
+_evict_on_change(Pharmacy, pharmacy_cache)
+_evict_on_change(User, user_cache)
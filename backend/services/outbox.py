@@ -0,0 +1,253 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Callable, Dict, Iterable, List, Optional
+import logging
+
+from sqlalchemy import delete, event, func, insert, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.models.outbox import OutboxEvent, OutboxCheckpoint
+from backend.models.sales import Sale
+
+logger = logging.getLogger(__name__)
+
+SALE_CREATED = "sale.created"
+SALE_UPDATED = "sale.updated"
+SALE_DELETED = "sale.deleted"
+SALE_EVENT_TYPES = (SALE_CREATED, SALE_UPDATED, SALE_DELETED)
+
+# Sale attributes carried in event snapshots
+SALE_SNAPSHOT_FIELDS = (
+    "product_id", "pharmacy_id", "sales_rep_id", "quantity", "final_amount",
+    "status", "sale_date", "is_active",
+)
+
+# A gap in event ids younger than this may be a transaction that has not
+# committed yet; consumers wait for it instead of skipping past it
+SETTLE_SECONDS = 30
+
+
+def _json_value(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def record_event(connection, aggregate_type: str, aggregate_id: int, event_type: str, payload: dict) -> None:
+    """Append an event on the caller's connection, i.e. inside the writing transaction"""
+    connection.execute(
+        insert(OutboxEvent.__table__).values(
+            aggregate_type=aggregate_type,
+            aggregate_id=aggregate_id,
+            event_type=event_type,
+            payload={key: _json_value(value) for key, value in payload.items()}
+        )
+    )
+
+
+def record_events(connection, events: List[dict]) -> None:
+    """Append several events in one executemany (bulk writes that bypass the mapper)"""
+    if not events:
+        return
+    connection.execute(insert(OutboxEvent.__table__), [
+        {**outbox_event, "payload": {key: _json_value(value) for key, value in outbox_event["payload"].items()}}
+        for outbox_event in events
+    ])
+
+
+def sale_snapshot(values) -> dict:
+    """Snapshot of the rollup-relevant sale fields from a Sale or a mapping"""
+    get = values.get if isinstance(values, dict) else lambda field: getattr(values, field)
+    return {field: _json_value(get(field)) for field in SALE_SNAPSHOT_FIELDS}
+
+
+def record_sale_created(connection, sale_id: int, values) -> None:
+    record_event(connection, "sale", sale_id, SALE_CREATED, {"before": None, "after": sale_snapshot(values), "changed": []})
+
+
+@event.listens_for(Sale, "after_insert")
+def _sale_created(mapper, connection, target):
+    # sale_date may come from the server default and is not loaded yet
+    record_sale_created(connection, target.id, {field: target.__dict__.get(field) for field in SALE_SNAPSHOT_FIELDS})
+
+
+@event.listens_for(Sale, "after_update")
+def _sale_updated(mapper, connection, target):
+    state = inspect(target)
+    changed = [attr.key for attr in mapper.column_attrs if state.attrs[attr.key].history.has_changes()]
+    if not changed:
+        return
+
+    before = {}
+    for field in SALE_SNAPSHOT_FIELDS:
+        history = state.attrs[field].history
+        before[field] = history.deleted[0] if history.deleted else getattr(target, field)
+
+    event_type = SALE_DELETED if before["is_active"] and not target.is_active else SALE_UPDATED
+    record_event(connection, "sale", target.id, event_type, {
+        "before": sale_snapshot(before),
+        "after": sale_snapshot(target),
+        "changed": changed,
+    })
+
+
+class OutboxConsumer:
+    """A named, checkpointed reader of the outbox.
+
+    ``handler(db, events)`` runs inside the transaction that advances the
+    checkpoint, so derived data it writes to the database is updated
+    exactly once. It must not commit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Session, List[OutboxEvent]], None],
+        event_types: Optional[Iterable[str]] = None,
+        bootstrap: Optional[Callable[[Session], None]] = None
+    ):
+        self.name = name
+        self.handler = handler
+        self.event_types = set(event_types) if event_types else None
+        self.bootstrap = bootstrap
+
+    def accepts(self, outbox_event: OutboxEvent) -> bool:
+        return self.event_types is None or outbox_event.event_type in self.event_types
+
+
+consumers: Dict[str, OutboxConsumer] = {}
+
+
+def outbox_consumer(name: str, event_types: Optional[Iterable[str]] = None, bootstrap=None):
+    """Register ``handler(db, events)`` as an outbox consumer"""
+    def register(handler):
+        consumers[name] = OutboxConsumer(name, handler, event_types, bootstrap)
+        return handler
+    return register
+
+
+def _lock_checkpoint(db: Session, consumer: OutboxConsumer) -> Optional[OutboxCheckpoint]:
+    """This consumer's checkpoint row, locked; None while another worker holds it"""
+    query = db.query(OutboxCheckpoint).filter(OutboxCheckpoint.consumer == consumer.name)
+    if db.get_bind().dialect.name == "postgresql":
+        query = query.with_for_update(skip_locked=True)
+
+    checkpoint = query.first()
+    if checkpoint is not None or db.get(OutboxCheckpoint, consumer.name) is not None:
+        return checkpoint
+
+    # First run: derive the current state, then follow events from here on.
+    # The max event id and the bootstrap must see the same committed sales,
+    # so no sale write may commit in between, and no event below the max may
+    # still be in flight (it would be skipped). Claiming the checkpoint first
+    # takes SQLite's single write lock; on PostgreSQL a SHARE lock on the
+    # outbox waits for in-flight event writers and holds back new ones (every
+    # sale write appends an event before it commits) until this commits.
+    try:
+        checkpoint = OutboxCheckpoint(consumer=consumer.name, last_event_id=0)
+        db.add(checkpoint)
+        db.flush()
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text(f"LOCK TABLE {OutboxEvent.__tablename__} IN SHARE MODE"))
+
+        last_event_id = db.query(func.coalesce(func.max(OutboxEvent.id), 0)).scalar()
+        if consumer.bootstrap:
+            consumer.bootstrap(db)
+        checkpoint.last_event_id = last_event_id
+        db.commit()
+        logger.info(f"📬 Outbox consumer {consumer.name} starts after event {last_event_id}")
+    except IntegrityError:
+        db.rollback()
+    return query.first()
+
+
+def _ready_events(events: List[OutboxEvent], after_id: int) -> List[OutboxEvent]:
+    """Leading run of events without unsettled gaps"""
+    settled = datetime.now(timezone.utc) - timedelta(seconds=SETTLE_SECONDS)
+    ready, expected = [], after_id + 1
+    for outbox_event in events:
+        if outbox_event.id != expected and _as_utc(outbox_event.created_at) > settled:
+            break
+        ready.append(outbox_event)
+        expected = outbox_event.id + 1
+    return ready
+
+
+def run_consumer(db: Session, consumer: OutboxConsumer, batch_size: int = 500) -> int:
+    """Process one batch for ``consumer`` in order; returns the events consumed"""
+    try:
+        checkpoint = _lock_checkpoint(db, consumer)
+        if checkpoint is None:
+            return 0
+
+        events = db.query(OutboxEvent)\
+            .filter(OutboxEvent.id > checkpoint.last_event_id)\
+            .order_by(OutboxEvent.id)\
+            .limit(batch_size)\
+            .all()
+        ready = _ready_events(events, checkpoint.last_event_id)
+        if not ready:
+            db.rollback()
+            return 0
+
+        relevant = [outbox_event for outbox_event in ready if consumer.accepts(outbox_event)]
+        if relevant:
+            consumer.handler(db, relevant)
+        checkpoint.last_event_id = ready[-1].id
+        db.commit()
+        return len(ready)
+    except Exception as e:
+        # The checkpoint does not move; the batch is retried on the next poll
+        db.rollback()
+        logger.error(f"Outbox consumer {consumer.name} failed: {e}")
+        return 0
+
+
+def dispatch_outbox(db: Session, batch_size: int = 500) -> Dict[str, int]:
+    """Drain the outbox for every registered consumer"""
+    processed = {}
+    for consumer in list(consumers.values()):
+        total = 0
+        while True:
+            count = run_consumer(db, consumer, batch_size)
+            total += count
+            if count < batch_size:
+                break
+        processed[consumer.name] = total
+    return processed
+
+
+def prune_outbox(db: Session, retention_days: int = 7) -> int:
+    """Delete events every registered consumer has processed and that are older than ``retention_days``"""
+    names = list(consumers)
+    if not names:
+        return 0
+
+    checkpoints = db.query(OutboxCheckpoint.last_event_id)\
+        .filter(OutboxCheckpoint.consumer.in_(names))\
+        .all()
+    if len(checkpoints) < len(names):
+        return 0
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    result = db.execute(
+        delete(OutboxEvent.__table__).where(
+            OutboxEvent.id <= min(row.last_event_id for row in checkpoints),
+            OutboxEvent.created_at < cutoff
+        )
+    )
+    db.commit()
+
+    if result.rowcount:
+        logger.info(f"📭 Pruned {result.rowcount} processed outbox events")
+    return result.rowcount
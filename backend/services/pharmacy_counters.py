@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+import logging
+
+from sqlalchemy import and_, case, event, func, inspect, select, update
+from sqlalchemy.orm import Session
+
+from backend.models.pharmacies import Pharmacy
+from backend.models.sales import Sale, SaleStatus
+
+logger = logging.getLogger(__name__)
+
+# Trailing window behind Pharmacy.annual_volume / annual_order_count
+VOLUME_WINDOW_DAYS = 365
+
+# Sales in these states do not count towards pharmacy volume
+EXCLUDED_STATUSES = (SaleStatus.CANCELLED, SaleStatus.RETURNED)
+
+
+def _as_utc(value: Optional[datetime]) -> datetime:
+    if value is None:
+        return datetime.now(timezone.utc)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _window_start() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(days=VOLUME_WINDOW_DAYS)
+
+
+def _contribution(is_active, status, sale_date, final_amount) -> Tuple[Decimal, int]:
+    """(amount, orders) a sale adds to its pharmacy's counters"""
+    if not is_active or status in EXCLUDED_STATUSES or final_amount is None:
+        return Decimal(0), 0
+    if _as_utc(sale_date) < _window_start():
+        return Decimal(0), 0
+    return Decimal(final_amount), 1
+
+
+def apply_pharmacy_delta(
+    connection,
+    pharmacy_id: int,
+    amount: Decimal,
+    orders: int,
+    sale_date: Optional[datetime] = None
+) -> None:
+    """Adjust one pharmacy's counters in a single UPDATE on the caller's transaction"""
+    if not amount and not orders and sale_date is None:
+        return
+
+    table = Pharmacy.__table__
+    volume = func.coalesce(table.c.annual_volume, 0) + amount
+    count = func.coalesce(table.c.annual_order_count, 0) + orders
+    values = {
+        "annual_volume": volume,
+        "annual_order_count": count,
+        "average_order_value": case((count > 0, volume * 1.0 / count), else_=0),
+    }
+    if sale_date is not None:
+        values["last_order_date"] = case(
+            (
+                (table.c.last_order_date == None) | (table.c.last_order_date < sale_date),
+                sale_date
+            ),
+            else_=table.c.last_order_date
+        )
+
+    connection.execute(update(table).where(table.c.id == pharmacy_id).values(**values))
+
+
+def status_change_deltas(rows, new_status: SaleStatus) -> Dict[int, Tuple[Decimal, int]]:
+    """Per-pharmacy (amount, orders) deltas for moving ``rows`` to ``new_status``.
+
+    For writes that bypass the mapper listeners; ``rows`` need pharmacy_id,
+    is_active, status, sale_date and final_amount.
+    """
+    deltas = {}
+    for row in rows:
+        old_amount, old_orders = _contribution(row.is_active, row.status, row.sale_date, row.final_amount)
+        new_amount, new_orders = _contribution(row.is_active, new_status, row.sale_date, row.final_amount)
+        if (old_amount, old_orders) == (new_amount, new_orders):
+            continue
+        amount, orders = deltas.get(row.pharmacy_id, (Decimal(0), 0))
+        deltas[row.pharmacy_id] = (amount + new_amount - old_amount, orders + new_orders - old_orders)
+    return deltas
+
+
+def _previous(state, attribute: str):
+    """Committed value of ``attribute`` before the pending change"""
+    history = state.attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(state.object, attribute)
+
+
+def count_new_sale(connection, pharmacy_id: int, is_active, status, sale_date, final_amount) -> None:
+    """Add a newly inserted sale to its pharmacy's counters (a missing sale_date counts as now)"""
+    amount, orders = _contribution(is_active, status, sale_date, final_amount)
+    apply_pharmacy_delta(
+        connection, pharmacy_id, amount, orders,
+        sale_date=_as_utc(sale_date) if orders else None
+    )
+
+
+@event.listens_for(Sale, "after_insert")
+def _count_new_sale(mapper, connection, target):
+    # sale_date may come from the server default and is not loaded yet
+    count_new_sale(
+        connection, target.pharmacy_id, target.is_active, target.status,
+        target.__dict__.get("sale_date"), target.final_amount
+    )
+
+
+@event.listens_for(Sale, "after_update")
+def _count_changed_sale(mapper, connection, target):
+    state = inspect(target)
+    tracked = ("pharmacy_id", "is_active", "status", "sale_date", "final_amount")
+    if not any(state.attrs[attribute].history.has_changes() for attribute in tracked):
+        return
+
+    old_pharmacy_id = _previous(state, "pharmacy_id")
+    old_amount, old_orders = _contribution(
+        _previous(state, "is_active"), _previous(state, "status"),
+        _previous(state, "sale_date"), _previous(state, "final_amount")
+    )
+    new_amount, new_orders = _contribution(target.is_active, target.status, target.sale_date, target.final_amount)
+
+    if old_pharmacy_id == target.pharmacy_id:
+        apply_pharmacy_delta(
+            connection, target.pharmacy_id, new_amount - old_amount, new_orders - old_orders,
+            sale_date=_as_utc(target.sale_date) if new_orders else None
+        )
+    else:
+        apply_pharmacy_delta(connection, old_pharmacy_id, -old_amount, -old_orders)
+        apply_pharmacy_delta(
+            connection, target.pharmacy_id, new_amount, new_orders,
+            sale_date=_as_utc(target.sale_date) if new_orders else None
+        )
+
+
+def reconcile_pharmacy_counters(db: Session) -> int:
+    """Recompute every pharmacy's counters from sales in one set-based UPDATE.
+
+    Repairs drift (bulk writes that bypass the ORM, failed transactions)
+    and ages sales out of the trailing window. Returns the rows updated.
+    """
+    window_start = _window_start()
+    counted = and_(
+        Sale.pharmacy_id == Pharmacy.id,
+        Sale.is_active == True,
+        Sale.status.notin_(EXCLUDED_STATUSES),
+        Sale.sale_date >= window_start
+    )
+
+    volume = select(func.coalesce(func.sum(Sale.final_amount), 0)).where(counted).scalar_subquery()
+    orders = select(func.count(Sale.id)).where(counted).scalar_subquery()
+    last_order = select(func.max(Sale.sale_date)).where(
+        Sale.pharmacy_id == Pharmacy.id,
+        Sale.is_active == True,
+        Sale.status.notin_(EXCLUDED_STATUSES)
+    ).scalar_subquery()
+
+    result = db.execute(
+        update(Pharmacy.__table__).values(
+            annual_volume=volume,
+            annual_order_count=orders,
+            average_order_value=case((orders > 0, volume * 1.0 / orders), else_=0),
+            last_order_date=last_order
+        )
+    )
+    db.commit()
+
+    logger.info(f"🏪 Pharmacy counters reconciled for {result.rowcount} pharmacies")
+    return result.rowcount
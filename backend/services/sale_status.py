@@ -0,0 +1,82 @@
+from typing import Dict
+import logging
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from backend.models.sales import Sale, SaleStatus
+from backend.services.outbox import SALE_UPDATED, record_events, sale_snapshot
+from backend.services.pharmacy_counters import apply_pharmacy_delta, status_change_deltas
+
+logger = logging.getLogger(__name__)
+
+# Order lifecycle; cancelled and returned sales are final
+ALLOWED_TRANSITIONS = {
+    SaleStatus.PENDING: {SaleStatus.CONFIRMED, SaleStatus.SHIPPED, SaleStatus.CANCELLED},
+    SaleStatus.CONFIRMED: {SaleStatus.SHIPPED, SaleStatus.DELIVERED, SaleStatus.CANCELLED},
+    SaleStatus.SHIPPED: {SaleStatus.DELIVERED, SaleStatus.RETURNED},
+    SaleStatus.DELIVERED: {SaleStatus.RETURNED},
+    SaleStatus.CANCELLED: set(),
+    SaleStatus.RETURNED: set(),
+}
+
+# Columns the caller must select for transition_sales
+TRANSITION_COLUMNS = (
+    Sale.id, Sale.status, Sale.is_active, Sale.product_id, Sale.pharmacy_id,
+    Sale.sales_rep_id, Sale.quantity, Sale.final_amount, Sale.sale_date,
+)
+
+
+def transition_sales(db: Session, rows, target: SaleStatus) -> Dict[int, dict]:
+    """Move the selected sales to ``target`` with one UPDATE; returns outcomes by id.
+
+    ``rows`` are TRANSITION_COLUMNS tuples, ideally selected FOR UPDATE. The
+    UPDATE bypasses the mapper, so pharmacy counters and outbox events are
+    written here, in the same transaction. The caller commits.
+    """
+    outcomes, eligible = {}, []
+    for row in rows:
+        if row.status == target:
+            outcomes[row.id] = {"id": row.id, "outcome": "unchanged", "previous_status": row.status}
+        elif target in ALLOWED_TRANSITIONS.get(row.status, set()):
+            eligible.append(row)
+        else:
+            outcomes[row.id] = {"id": row.id, "outcome": "invalid_transition", "previous_status": row.status}
+
+    if not eligible:
+        return outcomes
+
+    sources = [status for status, targets in ALLOWED_TRANSITIONS.items() if target in targets]
+    statement = update(Sale.__table__)\
+        .where(Sale.id.in_([row.id for row in eligible]), Sale.status.in_(sources))\
+        .values(status=target)
+
+    connection = db.connection()
+    if connection.dialect.update_returning:
+        updated_ids = set(connection.execute(statement.returning(Sale.id)).scalars())
+    else:
+        connection.execute(statement)
+        updated_ids = {row.id for row in eligible}
+
+    updated = [row for row in eligible if row.id in updated_ids]
+    for row in eligible:
+        # Rows whose status changed underneath us are reported, not overwritten
+        outcome = "updated" if row.id in updated_ids else "conflict"
+        outcomes[row.id] = {"id": row.id, "outcome": outcome, "previous_status": row.status}
+
+    for pharmacy_id, (amount, orders) in status_change_deltas(updated, target).items():
+        apply_pharmacy_delta(connection, pharmacy_id, amount, orders)
+
+    events = []
+    for row in updated:
+        before = sale_snapshot(row)
+        events.append({
+            "aggregate_type": "sale",
+            "aggregate_id": row.id,
+            "event_type": SALE_UPDATED,
+            "payload": {"before": before, "after": {**before, "status": target.value}, "changed": ["status", "updated_at"]},
+        })
+    record_events(connection, events)
+
+    logger.info(f"🚚 {len(updated)} sales moved to {target.value}")
+    return outcomes
@@ -0,0 +1,115 @@
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Iterator
+import csv
+import io
+import json
+import logging
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import aliased
+
+from backend.database.base import ReplicaSessionLocal
+from backend.models.pharmacies import Pharmacy
+from backend.models.products import Product
+from backend.models.sales import Sale
+from backend.models.user import User
+
+logger = logging.getLogger(__name__)
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+SalesRep = aliased(User, name="sales_rep")
+
+# Exported columns, in output order
+EXPORT_COLUMNS = [
+    Sale.id,
+    Sale.order_number,
+    Sale.invoice_number,
+    Sale.po_number,
+    Sale.sale_date,
+    Sale.delivery_date,
+    Sale.status,
+    Sale.payment_method,
+    Sale.product_id,
+    Product.code.label("product_code"),
+    Product.name.label("product_name"),
+    Sale.pharmacy_id,
+    Pharmacy.name.label("pharmacy_name"),
+    Sale.sales_rep_id,
+    (SalesRep.first_name + " " + SalesRep.last_name).label("sales_rep_name"),
+    Sale.quantity,
+    Sale.unit_price,
+    Sale.total_price,
+    Sale.discount_amount,
+    Sale.tax_amount,
+    Sale.final_amount,
+    Sale.territory,
+    Sale.region,
+    Sale.campaign_id,
+    Sale.promotion_code,
+    Sale.created_at,
+    Sale.updated_at,
+]
+
+
+def sales_export_query() -> Select:
+    """Flat projection of live sales with their product, pharmacy and rep names"""
+    return select(*EXPORT_COLUMNS)\
+        .select_from(Sale)\
+        .outerjoin(Product, Sale.product_id == Product.id)\
+        .outerjoin(Pharmacy, Sale.pharmacy_id == Pharmacy.id)\
+        .outerjoin(SalesRep, Sale.sales_rep_id == SalesRep.id)\
+        .filter(Sale.is_active == True)
+
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _csv_chunk(rows, header=None) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(rows, keys) -> str:
+    return "".join(
+        json.dumps(dict(zip(keys, (_plain(value) for value in row))), separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+
+def stream_sales_export(statement: Select, export_format: str = "csv", chunk_size: int = 1000) -> Iterator[str]:
+    """Yield the export ``chunk_size`` rows at a time from a server-side cursor.
+
+    Owns its session so the cursor outlives the request handler; memory stays
+    flat regardless of how many rows match.
+    """
+    db = ReplicaSessionLocal()
+    exported = 0
+    try:
+        result = db.execute(statement.order_by(Sale.id).execution_options(yield_per=chunk_size))
+        keys = list(result.keys())
+
+        if export_format == "csv":
+            yield _csv_chunk([], header=keys)
+        for rows in result.partitions():
+            exported += len(rows)
+            yield _csv_chunk(rows) if export_format == "csv" else _ndjson_chunk(rows, keys)
+    finally:
+        db.close()
+        logger.info(f"📤 Sales export streamed {exported} rows as {export_format}")
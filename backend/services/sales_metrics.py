@@ -0,0 +1,126 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from typing import List
+import logging
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from backend.models.analytics import SalesMetric, MetricType
+from backend.models.outbox import OutboxEvent
+from backend.models.sales import Sale
+from backend.services.outbox import SALE_EVENT_TYPES, outbox_consumer
+from backend.services.pharmacy_counters import EXCLUDED_STATUSES
+
+logger = logging.getLogger(__name__)
+
+_EXCLUDED = {status.value for status in EXCLUDED_STATUSES}
+
+
+def _counts(snapshot) -> bool:
+    return bool(snapshot) and snapshot["is_active"] and snapshot["status"] not in _EXCLUDED \
+        and snapshot["final_amount"] is not None
+
+
+def _day(snapshot, outbox_event: OutboxEvent) -> date:
+    if snapshot["sale_date"]:
+        return datetime.fromisoformat(snapshot["sale_date"]).date()
+    return outbox_event.created_at.date()
+
+
+def _daily_metric(db: Session, day: date) -> SalesMetric:
+    """The overall (no dimensions) DAILY_SALES row for ``day``, created if missing"""
+    metric = db.query(SalesMetric)\
+        .filter(
+            SalesMetric.metric_type == MetricType.DAILY_SALES,
+            SalesMetric.metric_date == day,
+            SalesMetric.product_id == None,
+            SalesMetric.pharmacy_id == None,
+            SalesMetric.product_category_id == None,
+            SalesMetric.territory == None,
+            SalesMetric.region == None
+        )\
+        .first()
+    if metric is None:
+        metric = SalesMetric(**_new_daily_metric(day, Decimal(0), 0, 0))
+        db.add(metric)
+    return metric
+
+
+def _new_daily_metric(day: date, revenue: Decimal, quantity: int, orders: int) -> dict:
+    """Column values of an overall DAILY_SALES row"""
+    return {
+        "metric_type": MetricType.DAILY_SALES,
+        "metric_date": day,
+        "period_start": datetime.combine(day, time.min, tzinfo=timezone.utc),
+        "period_end": datetime.combine(day, time.max, tzinfo=timezone.utc),
+        "total_revenue": revenue,
+        "total_quantity": quantity,
+        "total_orders": orders,
+        "average_order_value": revenue / orders if orders > 0 else 0
+    }
+
+
+def _apply(metric: SalesMetric, revenue: Decimal, quantity: int, orders: int) -> None:
+    metric.total_revenue = Decimal(metric.total_revenue or 0) + revenue
+    metric.total_quantity = (metric.total_quantity or 0) + quantity
+    metric.total_orders = (metric.total_orders or 0) + orders
+    metric.average_order_value = metric.total_revenue / metric.total_orders if metric.total_orders > 0 else 0
+
+
+def rebuild_daily_sales_metrics(db: Session) -> int:
+    """Recompute every overall DAILY_SALES row from sales (used to bootstrap the consumer)"""
+    day = func.date(Sale.sale_date)
+    totals = db.query(
+        day.label("day"),
+        func.coalesce(func.sum(Sale.final_amount), 0).label("revenue"),
+        func.coalesce(func.sum(Sale.quantity), 0).label("quantity"),
+        func.count(Sale.id).label("orders")
+    )\
+        .filter(Sale.is_active == True, Sale.status.notin_(EXCLUDED_STATUSES), Sale.sale_date != None)\
+        .group_by(day)\
+        .all()
+
+    db.query(SalesMetric)\
+        .filter(
+            SalesMetric.metric_type == MetricType.DAILY_SALES,
+            SalesMetric.product_id == None,
+            SalesMetric.pharmacy_id == None,
+            SalesMetric.product_category_id == None,
+            SalesMetric.territory == None,
+            SalesMetric.region == None
+        )\
+        .delete(synchronize_session=False)
+
+    # The old rows are gone: one executemany INSERT, no per-day lookups
+    rows = []
+    for row in totals:
+        # SQLite returns date() as text
+        metric_day = date.fromisoformat(row.day) if isinstance(row.day, str) else row.day
+        rows.append(_new_daily_metric(metric_day, Decimal(row.revenue), int(row.quantity), row.orders))
+    if rows:
+        db.execute(insert(SalesMetric.__table__), rows)
+
+    logger.info(f"📈 Daily sales metrics rebuilt for {len(totals)} days")
+    return len(totals)
+
+
+@outbox_consumer("daily_sales_metrics", event_types=SALE_EVENT_TYPES, bootstrap=rebuild_daily_sales_metrics)
+def update_daily_sales_metrics(db: Session, events: List[OutboxEvent]) -> None:
+    """Keep the overall DAILY_SALES metrics current from sale change events"""
+    deltas = defaultdict(lambda: [Decimal(0), 0, 0])
+
+    for outbox_event in events:
+        for snapshot, sign in ((outbox_event.payload.get("before"), -1), (outbox_event.payload.get("after"), 1)):
+            if not _counts(snapshot):
+                continue
+            delta = deltas[_day(snapshot, outbox_event)]
+            delta[0] += sign * Decimal(snapshot["final_amount"])
+            delta[1] += sign * snapshot["quantity"]
+            delta[2] += sign
+
+    for day, (revenue, quantity, orders) in deltas.items():
+        if revenue or quantity or orders:
+            _apply(_daily_metric(db, day), revenue, quantity, orders)
+            db.flush()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Sale creation benchmark for QSDPharmalitics
+Compares the original ORM write path of POST /sales (lookups, count,
+insert, commit, refresh, reload) with the current single INSERT ...
+RETURNING path, reporting latency and statements sent per sale, split
+by whether the product and pharmacy were already in the dimension caches.
+
+Usage:
+    python scripts/benchmark_create_sale.py
+    python scripts/benchmark_create_sale.py --sales 50000 --iterations 500
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark POST /sales write paths")
+    parser.add_argument("--sales", type=int, default=20000, help="Number of existing sales to seed")
+    parser.add_argument("--iterations", type=int, default=200, help="Sales created per path")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    return parser.parse_args()
+
+
+def legacy_create(db, sale, current_user):
+    """POST /sales as it was before the single-round-trip path"""
+    from sqlalchemy.orm import joinedload
+    from backend.api.v1.sales import _enrich_sale_response
+    from backend.models import Sale, Product, Pharmacy
+
+    if not db.query(Product).filter(Product.id == sale.product_id).first():
+        raise LookupError("Product not found")
+    if not db.query(Pharmacy).filter(Pharmacy.id == sale.pharmacy_id).first():
+        raise LookupError("Pharmacy not found")
+
+    db_sale = Sale(**sale.dict())
+    if not db_sale.sales_rep_id:
+        db_sale.sales_rep_id = current_user.id
+    if not db_sale.sale_date:
+        db_sale.sale_date = datetime.now(timezone.utc)
+    db_sale.calculate_totals()
+    db_sale.order_number = f"LEGACY-{db.query(Sale).count() + 1:06d}-{random.random()}"
+
+    db.add(db_sale)
+    db.commit()
+    db.refresh(db_sale)
+    db_sale = db.query(Sale)\
+        .options(joinedload(Sale.product), joinedload(Sale.pharmacy), joinedload(Sale.sales_rep))\
+        .filter(Sale.id == db_sale.id)\
+        .first()
+    return _enrich_sale_response(db_sale)
+
+
+def current_create(db, sale, current_user):
+    from backend.api.v1.sales import create_sale
+    return asyncio.run(create_sale(sale=sale, db=db, current_user=current_user))
+
+
+def sales_to_create(iterations, rng):
+    return [
+        {"product_id": rng.randint(1, 500), "pharmacy_id": rng.randint(1, 500),
+         "quantity": rng.randint(1, 20), "unit_price": rng.randint(5, 500)}
+        for _ in range(iterations)
+    ]
+
+
+def run(engine, session_factory, create, user_id, sales):
+    from sqlalchemy import event
+    from backend.models import User
+    from backend.schemas.sales import SaleCreate
+    from backend.services.dimension_cache import product_cache, pharmacy_cache
+
+    statements = []
+    counter = lambda *args: statements.append(1)
+    event.listen(engine, "before_cursor_execute", counter)
+    event.listen(engine, "commit", counter)
+
+    timings, per_sale, hits, misses = [], [], [], []
+    try:
+        for values in sales:
+            db = session_factory()
+            try:
+                current_user = db.get(User, user_id)
+                sale = SaleCreate(**values)
+                cached = sale.product_id in product_cache and sale.pharmacy_id in pharmacy_cache
+                before = len(statements)
+                start = time.perf_counter()
+                create(db, sale, current_user)
+                timings.append(time.perf_counter() - start)
+                per_sale.append(len(statements) - before)
+                (hits if cached else misses).append(per_sale[-1])
+            finally:
+                db.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+        event.remove(engine, "commit", counter)
+
+    return {
+        "p50": statistics.median(timings),
+        "p95": statistics.quantiles(timings, n=100)[94],
+        "trips": statistics.median(per_sale),
+        "hits": len(hits),
+        "hit_trips": statistics.median(hits) if hits else None,
+        "misses": len(misses),
+        "miss_trips": statistics.median(misses) if misses else None,
+    }
+
+
+def trips(value) -> str:
+    return f"{value:.0f}" if value is not None else "-"
+
+
+def main():
+    args = parse_args()
+
+    scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{scratch.name}"
+    os.environ["DEBUG"] = "false"
+
+    from check_query_plans import seed
+    from backend.database.base import engine, SessionLocal
+
+    print(f"🌱 Seeding {args.sales} sales...")
+    seed(engine, args.sales, random.Random(args.seed))
+
+    # The same sales for both paths; the warm-up creates them once first, so every
+    # product and pharmacy the measured run uses is in the dimension caches
+    sales = sales_to_create(args.iterations, random.Random(args.seed))
+
+    print(f"\n{'path':<10}{'p50 ms':>10}{'p95 ms':>10}{'round trips':>14}"
+          f"{'cache hits':>12}{'trips':>7}{'misses':>8}{'trips':>7}")
+    for name, create in (("legacy", legacy_create), ("current", current_create)):
+        # Warm the dimension caches and connection pool first
+        run(engine, SessionLocal, create, 1, sales)
+        result = run(engine, SessionLocal, create, 1, sales)
+        if create is legacy_create:
+            # The legacy path does not use the caches
+            result.update(hits="-", hit_trips=None, misses="-", miss_trips=None)
+        print(f"{name:<10}{result['p50'] * 1000:>10.2f}{result['p95'] * 1000:>10.2f}{result['trips']:>14.0f}"
+              f"{result['hits']:>12}{trips(result['hit_trips']):>7}{result['misses']:>8}{trips(result['miss_trips']):>7}")
+
+    engine.dispose()
+    os.unlink(scratch.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Endpoint benchmark suite for QSDPharmalitics
+Drives the ASGI app in-process with httpx.AsyncClient against a seeded
+database (scripts/generate_dataset.py) and records p50/p95/p99 latency,
+throughput and SQL statements per request for every hot endpoint. The
+statement count covers everything a request sets off, including background
+tasks such as report generation, which run after the X-SQL-Queries header
+is written. Results are compared with a stored baseline; the run exits
+non-zero when any endpoint is slower or issues more SQL than the baseline
+allows, or when a request fails.
+
+Usage:
+    python scripts/benchmark_endpoints.py --save-baseline            # record baselines on this machine
+    python scripts/benchmark_endpoints.py                            # compare against them (same dataset end date)
+    python scripts/benchmark_endpoints.py --database-url postgresql://... --skip-seed --only sales-list,login
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextvars import ContextVar
+from datetime import date, timedelta
+from typing import Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "benchmark_baselines.json")
+
+PASSWORD = "benchmark"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the hot API endpoints against stored baselines")
+    parser.add_argument("--database-url", help="Database to seed and benchmark (default: temporary SQLite file)")
+    parser.add_argument("--skip-seed", action="store_true", help="Use the database as it is (already generated)")
+    parser.add_argument("--scale", default="small", help="generate_dataset.py scale preset (default: small)")
+    parser.add_argument("--seed", type=int, default=42, help="Dataset seed")
+    parser.add_argument("--end-date", type=date.fromisoformat,
+                        help="Last day of seeded sales (default: the baseline's, or today when recording one)")
+    parser.add_argument("--iterations", type=int, default=50, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per endpoint first")
+    parser.add_argument("--concurrency", type=int, default=1, help="Requests in flight per endpoint")
+    parser.add_argument("--only", help="Comma-separated endpoint names to run")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run's results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.20,
+                        help="Allowed relative latency/throughput regression (default: 0.20)")
+    parser.add_argument("--output", help="Also write this run's results to a JSON file")
+    return parser.parse_args()
+
+
+def endpoints(end_date: date):
+    """name -> (role, method, path, params, json body); the hot paths of the API"""
+    # Explicit windows where the API takes them, so the work per request does not
+    # drift with the calendar; dashboard-summary and trends always end today
+    quarter_start = (end_date - timedelta(days=90)).isoformat()
+    year_start = (end_date - timedelta(days=365)).isoformat()
+    return {
+        "login": (None, "POST", "/api/v1/auth/login", None,
+                  {"username_or_email": "rep0001", "password": PASSWORD}),
+        "dashboard-summary": ("analyst", "GET", "/api/v1/analytics/dashboard-summary", None, None),
+        "sales-performance-monthly": ("analyst", "GET", "/api/v1/analytics/sales-performance",
+                                      {"period": "monthly", "start_date": year_start,
+                                       "end_date": end_date.isoformat()}, None),
+        "sales-performance-quarterly": ("analyst", "GET", "/api/v1/analytics/sales-performance",
+                                        {"period": "quarterly", "start_date": "2024-01-01",
+                                         "end_date": end_date.isoformat()}, None),
+        "trends": ("analyst", "GET", "/api/v1/analytics/trends", {"metric": "revenue", "period": "monthly"}, None),
+        "sales-list": ("admin", "GET", "/api/v1/sales/", {"limit": 100}, None),
+        "sales-list-rep": ("rep", "GET", "/api/v1/sales/", {"limit": 100}, None),
+        "product-suggestions": ("rep", "GET", "/api/v1/products/search/suggestions", {"query": "Losa"}, None),
+        "pharmacy-suggestions": ("rep", "GET", "/api/v1/pharmacies/search/suggestions", {"query": "Farm"}, None),
+        # Includes the background generation: the in-process transport runs it before returning
+        "report-generation": ("analyst", "POST", "/api/v1/reports/generate", None, {
+            "report_name": "Benchmark quarter", "report_type": "sales_summary", "format_type": "csv",
+            "date_range_start": quarter_start, "date_range_end": end_date.isoformat(),
+        }),
+    }
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# Statement counter of the request being measured. Set before the request,
+# so the app, its threadpool work and the background tasks it spawns all see
+# it; the app's own periodic jobs (outbox dispatch...) started earlier do not
+_request_statements: ContextVar[Optional[list]] = ContextVar("request_statements", default=None)
+
+
+def count_statements() -> None:
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter = _request_statements.get()
+        if counter is not None:
+            counter[0] += 1
+
+
+async def login(client, username: str) -> dict:
+    response = await client.post("/api/v1/auth/login", json={"username_or_email": username, "password": PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def measure(client, headers, method, path, params, body, iterations, warmup, concurrency):
+    async def call():
+        counter = [0]
+        token = _request_statements.set(counter)
+        try:
+            start = time.perf_counter()
+            response = await client.request(method, path, params=params, json=body, headers=headers)
+            return time.perf_counter() - start, response, counter[0]
+        finally:
+            _request_statements.reset(token)
+
+    for _ in range(warmup):
+        await call()
+
+    latencies, statements, failures = [], [], []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with gate:
+            elapsed, response, executed = await call()
+        latencies.append(elapsed)
+        statements.append(executed)
+        if response.status_code >= 400:
+            failures.append(f"{response.status_code} {response.text[:200]}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(iterations)))
+    wall = time.perf_counter() - started
+
+    return {
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "throughput_rps": round(iterations / wall, 2),
+        "sql_statements": statistics.median(statements),
+        "failures": len(failures),
+    }, failures[:3]
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """Regressions of ``result`` against ``baseline`` beyond ``tolerance``"""
+    problems = []
+    for metric in ("p50_ms", "p95_ms", "p99_ms"):
+        allowed = baseline[metric] * (1 + tolerance)
+        if result[metric] > allowed:
+            problems.append(f"{metric} {result[metric]:.1f} > {allowed:.1f} (baseline {baseline[metric]:.1f})")
+    allowed = baseline["throughput_rps"] * (1 - tolerance)
+    if result["throughput_rps"] < allowed:
+        problems.append(f"throughput {result['throughput_rps']:.1f} < {allowed:.1f} rps")
+    # Statement counts are deterministic: any increase is a regression (e.g. a new N+1)
+    if result["sql_statements"] > baseline["sql_statements"]:
+        problems.append(f"sql_statements {result['sql_statements']} > {baseline['sql_statements']}")
+    return problems
+
+
+async def run(args, selected):
+    import httpx
+    from backend.main import app
+
+    count_statements()
+    results, failures = {}, {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            tokens = {
+                "admin": await login(client, "admin"),
+                "analyst": await login(client, "analyst1"),
+                "rep": await login(client, "rep0001"),
+            }
+            for name, (role, method, path, params, body) in selected.items():
+                results[name], failures[name] = await measure(
+                    client, tokens.get(role, {}), method, path, params, body,
+                    args.iterations, args.warmup, args.concurrency
+                )
+                result = results[name]
+                print(f"{name:<30}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+                      f"{result['throughput_rps']:>10.1f}{result['sql_statements']:>8.0f}{result['failures']:>7}")
+    return results, failures
+
+
+def main():
+    args = parse_args()
+
+    scratch = None
+    if not args.database_url:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        args.database_url = f"sqlite:///{scratch.name}"
+
+    # Settings are read at import time
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["DEBUG"] = "false"
+    os.environ["LOG_LEVEL"] = "WARNING"
+
+    # Comparisons only mean something on the dataset the baseline was recorded on
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+    baseline_end_date = baseline["run"].get("dataset_end_date") if baseline else None
+
+    end_date = args.end_date
+    if end_date is None:
+        end_date = date.fromisoformat(baseline_end_date) if baseline_end_date else date.today()
+    if baseline is not None:
+        if baseline_end_date is None:
+            print(f"⚠️ Baseline {args.baseline} does not record its dataset end date; re-record it with --save-baseline")
+        elif baseline_end_date != end_date.isoformat():
+            sys.exit(f"❌ Baseline was recorded on data ending {baseline_end_date}, this run uses {end_date}; "
+                     f"drop --end-date or re-record the baseline")
+        if baseline["run"].get("seed") not in (None, args.seed):
+            sys.exit(f"❌ Baseline was recorded with --seed {baseline['run']['seed']}, this run uses {args.seed}")
+
+    if not args.skip_seed:
+        import generate_dataset
+        generate_dataset.main([
+            "--database-url", args.database_url, "--scale", args.scale, "--seed", str(args.seed),
+            "--end-date", end_date.isoformat(), "--password", PASSWORD, "--truncate"
+        ])
+
+    selected = endpoints(end_date)
+    if args.only:
+        names = [name.strip() for name in args.only.split(",")]
+        unknown = set(names) - set(selected)
+        if unknown:
+            sys.exit(f"❌ Unknown endpoints: {', '.join(sorted(unknown))}; choose from {', '.join(selected)}")
+        selected = {name: selected[name] for name in names}
+
+    print(f"\n{'endpoint':<30}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>10}{'sql':>8}{'fail':>7}")
+    results, failures = asyncio.run(run(args, selected))
+
+    run_info = {
+        "database": args.database_url.split(":", 1)[0],
+        "scale": args.scale if not args.skip_seed else "existing",
+        "seed": args.seed,
+        "dataset_end_date": end_date.isoformat(),
+        "iterations": args.iterations,
+        "concurrency": args.concurrency,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({"run": run_info, "endpoints": results}, output, indent=2)
+
+    if scratch:
+        os.unlink(scratch.name)
+
+    problems = {name: [f"request failed: {failure}" for failure in failed] for name, failed in failures.items() if failed}
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump({"run": run_info, "endpoints": results}, baseline_file, indent=2)
+        print(f"\n💾 Baseline written to {args.baseline}")
+    elif baseline is not None:
+        if baseline["run"].get("database") != run_info["database"] or baseline["run"].get("scale") != run_info["scale"]:
+            print(f"\n⚠️ Baseline was recorded with {baseline['run']}, this run is {run_info}")
+        for name, result in results.items():
+            if name not in baseline["endpoints"]:
+                print(f"⚠️ {name}: no baseline yet")
+                continue
+            regressions = compare(result, baseline["endpoints"][name], args.tolerance)
+            if regressions:
+                problems.setdefault(name, []).extend(regressions)
+    else:
+        print(f"\n⚠️ No baseline at {args.baseline}; run with --save-baseline to record one")
+
+    if problems:
+        print(f"\n❌ {len(problems)} endpoint(s) regressed or failed:")
+        for name, messages in problems.items():
+            for message in messages:
+                print(f"   {name}: {message}")
+        sys.exit(1)
+    print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
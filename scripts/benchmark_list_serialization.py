@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+List serialization benchmark for QSDPharmalitics
+Compares the ORM + enrich + Pydantic + json.dumps path the list endpoints
+used to take with the column-tuple + orjson path they use now, and checks
+both produce the same bytes.
+
+Usage:
+    python scripts/benchmark_list_serialization.py
+    python scripts/benchmark_list_serialization.py --sales 50000 --limit 1000 --repeat 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark list endpoint serialization paths")
+    parser.add_argument("--sales", type=int, default=20000, help="Number of sales rows to seed")
+    parser.add_argument("--limit", type=int, default=1000, help="Page size")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per path")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    return parser.parse_args()
+
+
+def fastapi_encode(model, content) -> bytes:
+    """What FastAPI does with a response_model: validate, dump in JSON mode, json.dumps"""
+    from pydantic import TypeAdapter
+    adapter = TypeAdapter(model)
+    value = adapter.dump_python(adapter.validate_python(content), mode="json")
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def legacy_paths(limit):
+    """The list endpoints as they were before the column-tuple fast path"""
+    from typing import List
+    from sqlalchemy import desc
+    from sqlalchemy.orm import joinedload
+    from backend.api.v1.sales import _enrich_sale_response
+    from backend.api.v1.products import _enrich_product_response
+    from backend.api.v1.pharmacies import _enrich_pharmacy_response
+    from backend.models import Sale, Product, Pharmacy
+    from backend.schemas.sales import SaleListResponse
+    from backend.schemas.products import ProductResponse
+    from backend.schemas.pharmacies import PharmacyResponse
+
+    def sales(db):
+        query = db.query(Sale).options(
+            joinedload(Sale.product), joinedload(Sale.pharmacy), joinedload(Sale.sales_rep)
+        ).filter(Sale.is_active == True)
+        total = query.count()
+        items = [_enrich_sale_response(sale) for sale in query.order_by(desc(Sale.created_at)).limit(limit).all()]
+        return fastapi_encode(SaleListResponse, {
+            "items": items, "total": total, "page": 1, "size": limit, "pages": (total + limit - 1) // limit
+        })
+
+    def products(db):
+        rows = db.query(Product).options(joinedload(Product.category))\
+            .filter(Product.is_active == True, Product.is_available == True)\
+            .order_by(Product.name).limit(limit).all()
+        return fastapi_encode(List[ProductResponse], [_enrich_product_response(product) for product in rows])
+
+    def pharmacies(db):
+        rows = db.query(Pharmacy).filter(Pharmacy.is_active == True)\
+            .order_by(Pharmacy.name).limit(limit).all()
+        return fastapi_encode(List[PharmacyResponse], [_enrich_pharmacy_response(pharmacy) for pharmacy in rows])
+
+    return {"GET /sales": sales, "GET /products": products, "GET /pharmacies": pharmacies}
+
+
+def current_paths(limit, user):
+    """The list endpoints as they are now, called directly"""
+    from backend.api.v1.sales import get_sales
+    from backend.api.v1.products import get_products
+    from backend.api.v1.pharmacies import get_pharmacies
+
+    def call(coroutine):
+        return asyncio.run(coroutine).body
+
+    return {
+        "GET /sales": lambda db: call(get_sales(
+            skip=0, limit=limit, product_id=None, pharmacy_id=None, sales_rep_id=None, status=None,
+            start_date=None, end_date=None, fields=None, db=db, current_user=user
+        )),
+        "GET /products": lambda db: call(get_products(
+            skip=0, limit=limit, search=None, category_id=None, is_active=True, fields=None, db=db, current_user=user
+        )),
+        "GET /pharmacies": lambda db: call(get_pharmacies(
+            skip=0, limit=limit, search=None, pharmacy_type=None, customer_type=None, state=None,
+            is_active=True, min_annual_volume=None, sort_by="name", fields=None, db=db, current_user=user
+        )),
+    }
+
+
+def timed(session_factory, path, repeat):
+    timings, body = [], None
+    for _ in range(repeat):
+        db = session_factory()
+        try:
+            start = time.perf_counter()
+            body = path(db)
+            timings.append(time.perf_counter() - start)
+        finally:
+            db.close()
+    return statistics.median(timings), body
+
+
+def main():
+    args = parse_args()
+
+    scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{scratch.name}"
+    os.environ["DEBUG"] = "false"
+
+    from check_query_plans import seed
+    from backend.database.base import engine, SessionLocal
+    from backend.models.user import User, UserRole
+
+    print(f"🌱 Seeding {args.sales} sales...")
+    seed(engine, args.sales, random.Random(args.seed))
+    admin = User(id=0, email="admin@example.com", username="admin", first_name="Admin",
+                 last_name="User", role=UserRole.ADMIN, is_active=True)
+
+    legacy, current = legacy_paths(args.limit), current_paths(args.limit, admin)
+    mismatches = []
+
+    print(f"\n{'endpoint':<18}{'legacy ms':>12}{'fast ms':>12}{'speedup':>10}{'bytes':>10}")
+    for name in legacy:
+        legacy_time, legacy_body = timed(SessionLocal, legacy[name], args.repeat)
+        current_time, current_body = timed(SessionLocal, current[name], args.repeat)
+        print(f"{name:<18}{legacy_time * 1000:>12.1f}{current_time * 1000:>12.1f}"
+              f"{legacy_time / current_time:>9.1f}x{len(current_body):>10}")
+        if legacy_body != current_body:
+            mismatches.append(name)
+
+    engine.dispose()
+    os.unlink(scratch.name)
+
+    if mismatches:
+        print(f"\n❌ Output differs from the response_model path: {', '.join(mismatches)}")
+        sys.exit(1)
+
+    print("\n✅ Fast path output is byte-identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Query plan regression check for QSDPharmalitics
+Seeds a scratch database, runs EXPLAIN on the hot listing/analytics
+queries and exits non-zero if any of them regresses to a sequential scan
+of sales, products or pharmacies.
+
+Usage:
+    python scripts/check_query_plans.py                      # temporary SQLite
+    python scripts/check_query_plans.py --database-url postgresql://...
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# Tables whose full scans are considered regressions
+CHECKED_TABLES = {"sales", "products", "pharmacies"}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="EXPLAIN the hot queries and fail on sequential scans")
+    parser.add_argument("--database-url", help="Database to seed and check (default: temporary SQLite file)")
+    parser.add_argument("--sales", type=int, default=20000, help="Number of sales rows to seed")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    return parser.parse_args()
+
+
+def seed(engine, sales_count: int, rng: random.Random):
+    """Insert a small but realistically distributed dataset with Core bulk inserts"""
+    from backend.database.base import Base
+    from backend.models import User, ProductCategory, Product, Pharmacy, Sale
+    from backend.models.user import UserRole
+
+    Base.metadata.create_all(bind=engine)
+    now = datetime.now(timezone.utc)
+
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"id": rep_id, "email": f"rep{rep_id}@example.com", "username": f"rep{rep_id}",
+             "first_name": "Rep", "last_name": str(rep_id), "hashed_password": "x",
+             "role": UserRole.SALES_REP, "is_active": True, "is_verified": True}
+            for rep_id in range(1, 21)
+        ])
+        conn.execute(ProductCategory.__table__.insert(), [
+            {"id": category_id, "name": f"Category {category_id}", "is_active": True}
+            for category_id in range(1, 11)
+        ])
+        conn.execute(Product.__table__.insert(), [
+            {"id": product_id, "code": f"P{product_id:05d}", "name": f"Product {product_id}",
+             "category_id": rng.randint(1, 10), "unit_price": 10, "is_active": True, "is_available": True}
+            for product_id in range(1, 501)
+        ])
+        conn.execute(Pharmacy.__table__.insert(), [
+            {"id": pharmacy_id, "code": f"F{pharmacy_id:05d}", "name": f"Pharmacy {pharmacy_id}",
+             "address_line1": "Street 1", "city": "City", "state": "ST", "country": "BR",
+             "annual_volume": rng.randint(0, 100000), "is_active": True, "is_verified": False}
+            for pharmacy_id in range(1, 501)
+        ])
+
+        batch = []
+        for sale_id in range(1, sales_count + 1):
+            sale_date = now - timedelta(days=rng.randint(0, 730), minutes=rng.randint(0, 1440))
+            amount = rng.randint(10, 5000)
+            batch.append({
+                "id": sale_id, "product_id": rng.randint(1, 500), "pharmacy_id": rng.randint(1, 500),
+                "sales_rep_id": rng.randint(1, 20), "quantity": 1, "unit_price": amount,
+                "total_price": amount, "final_amount": amount, "sale_date": sale_date,
+                "created_at": sale_date, "is_active": rng.random() > 0.1
+            })
+            if len(batch) == 5000:
+                conn.execute(Sale.__table__.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(Sale.__table__.insert(), batch)
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+
+def hot_queries():
+    """The access paths the API depends on, shaped like the endpoint queries"""
+    from sqlalchemy import desc, func, select
+    from backend.models import Product, Pharmacy, Sale
+
+    now = datetime.now(timezone.utc)
+    last_30_days = (Sale.sale_date >= now - timedelta(days=30), Sale.sale_date <= now)
+
+    return {
+        "sales listing (GET /sales)": select(Sale.id)
+            .where(Sale.is_active == True)
+            .order_by(desc(Sale.created_at)).limit(100),
+        "sales rep listing (GET /sales as sales_rep)": select(Sale.id)
+            .where(Sale.is_active == True, Sale.sales_rep_id == 1)
+            .order_by(desc(Sale.created_at)).limit(100),
+        "analytics date range (dashboard/sales-performance)": select(Sale.sale_date, Sale.final_amount)
+            .where(Sale.is_active == True, *last_30_days),
+        "top products in range": select(Product.name, func.sum(Sale.final_amount))
+            .join(Sale.product)
+            .where(Sale.is_active == True, *last_30_days)
+            .group_by(Product.id, Product.name),
+        "product sales range": select(Sale.final_amount)
+            .where(Sale.is_active == True, Sale.product_id == 1, *last_30_days),
+        "pharmacy sales range": select(Sale.final_amount)
+            .where(Sale.is_active == True, Sale.pharmacy_id == 1, *last_30_days),
+        "products by category": select(Product.id)
+            .where(Product.category_id == 1),
+        "pharmacies by volume": select(Pharmacy.id)
+            .order_by(desc(Pharmacy.annual_volume)).limit(100),
+    }
+
+
+def explain(conn, statement):
+    """Return (plan lines, sequentially scanned tables) for a statement"""
+    compiled = statement.compile(dialect=conn.dialect)
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + compiled.string, params).fetchall()
+        lines = [row[3] for row in rows]
+        scanned = {
+            match.group(1) for match in (re.match(r"^SCAN (\w+)$", line) for line in lines) if match
+        }
+        return lines, scanned & CHECKED_TABLES
+
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + compiled.string, params).scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    lines, scanned = [], set()
+
+    def walk(node, depth=0):
+        relation = node.get("Relation Name")
+        lines.append("  " * depth + node["Node Type"] + (f" on {relation}" if relation else "")
+                     + (f" using {node['Index Name']}" if node.get("Index Name") else ""))
+        if node["Node Type"] == "Seq Scan" and relation in CHECKED_TABLES:
+            scanned.add(relation)
+        for child in node.get("Plans", []):
+            walk(child, depth + 1)
+
+    walk(plan[0]["Plan"])
+    return lines, scanned
+
+
+def main():
+    args = parse_args()
+
+    scratch = None
+    if not args.database_url:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        args.database_url = f"sqlite:///{scratch.name}"
+
+    # Settings are read at import time
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["DEBUG"] = "false"
+
+    from backend.database.base import engine
+
+    print(f"🌱 Seeding {args.sales} sales into {engine.url.render_as_string(hide_password=True)}...")
+    seed(engine, args.sales, random.Random(args.seed))
+
+    failures = []
+    with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            # Small seeded tables would otherwise be scanned regardless of indexes
+            conn.exec_driver_sql("SET enable_seqscan = off")
+
+        for name, statement in hot_queries().items():
+            lines, scanned = explain(conn, statement)
+            status = "❌" if scanned else "✅"
+            print(f"{status} {name}")
+            for line in lines:
+                print(f"      {line}")
+            if scanned:
+                failures.append((name, scanned))
+
+    if scratch:
+        engine.dispose()
+        os.unlink(scratch.name)
+
+    if failures:
+        print("\n❌ Sequential scans detected:")
+        for name, tables in failures:
+            print(f"   {name}: {', '.join(sorted(tables))}")
+        sys.exit(1)
+
+    print("\n✅ All hot queries use indexes")
+
+
+if __name__ == "__main__":
+    main()
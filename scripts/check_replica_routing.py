@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Read-replica routing check for QSDPharmalitics
+Uses two databases as primary and replica stand-ins, each holding a marker
+row naming itself, and checks which one every kind of session reads from:
+read-only sessions go to the in-sync replica, and fall back to the primary
+while it lags or is unreachable; transactional and report-write sessions
+always stay on the primary. Exits non-zero on the first misrouted read.
+
+Usage:
+    python scripts/check_replica_routing.py                  # two temporary SQLite files
+    python scripts/check_replica_routing.py --primary-url postgresql://... --replica-url postgresql://...
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+MARKER_TABLE = "replica_routing_marker"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check which database each session type reads from")
+    parser.add_argument("--primary-url", help="Primary stand-in (default: temporary SQLite file)")
+    parser.add_argument("--replica-url", help="Replica stand-in (default: temporary SQLite file)")
+    return parser.parse_args()
+
+
+def mark(url: str, name: str) -> None:
+    from sqlalchemy import create_engine, text
+
+    marked = create_engine(url)
+    with marked.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {MARKER_TABLE}"))
+        conn.execute(text(f"CREATE TABLE {MARKER_TABLE} (name VARCHAR(20))"))
+        conn.execute(text(f"INSERT INTO {MARKER_TABLE} (name) VALUES (:name)"), {"name": name})
+    marked.dispose()
+
+
+def reads_from(session_factory) -> str:
+    from sqlalchemy import text
+
+    db = session_factory()
+    try:
+        return db.execute(text(f"SELECT name FROM {MARKER_TABLE}")).scalar()
+    finally:
+        db.close()
+
+
+def main():
+    args = parse_args()
+
+    scratch = []
+    for option in ("primary_url", "replica_url"):
+        if not getattr(args, option):
+            scratch.append(tempfile.NamedTemporaryFile(suffix=".db", delete=False))
+            setattr(args, option, f"sqlite:///{scratch[-1].name}")
+
+    # Settings are read at import time
+    os.environ["DATABASE_URL"] = args.primary_url
+    os.environ["READ_REPLICA_URLS"] = args.replica_url
+    os.environ["DEBUG"] = "false"
+
+    mark(args.primary_url, "primary")
+    mark(args.replica_url, "replica")
+
+    from backend.database.base import session_factories, SessionLocal, AnalyticsSessionLocal, ReplicaSessionLocal
+    from backend.database.replicas import ReplicaRouter
+
+    router = ReplicaSessionLocal
+    checks = []
+
+    def check(name, session_factory, expected):
+        actual = reads_from(session_factory)
+        checks.append((name, actual == expected))
+        print(f"{'✅' if actual == expected else '❌'} {name}: read from {actual} (expected {expected})")
+
+    # Replicas are not used before their first lag check
+    check("read-only session before the first lag check", router, "primary")
+
+    router.refresh_lag()
+    check("read-only session, replica in sync", router, "replica")
+    check("transactional session", SessionLocal, "primary")
+    check("transactional get_db pool", session_factories["transactional"], "primary")
+    check("report/export write session", AnalyticsSessionLocal, "primary")
+
+    # Replication lag beyond the threshold, as the lag check would record it
+    router.lag[args.replica_url] = router.max_lag_seconds + 1
+    check("read-only session, replica lagging", router, "primary")
+
+    router.refresh_lag()
+    check("read-only session, replica caught up again", router, "replica")
+
+    # A replica that cannot be reached drops out at the next check
+    unreachable = ReplicaRouter(
+        router.primary, ["sqlite:////nonexistent/qsd-replica/replica.db"], router.max_lag_seconds
+    )
+    unreachable.refresh_lag()
+    check("read-only session, replica unreachable", unreachable, "primary")
+
+    # Round-robin across two in-sync replicas
+    pair = ReplicaRouter(router.primary, [args.replica_url, args.primary_url], router.max_lag_seconds)
+    pair.refresh_lag()
+    seen = {reads_from(pair) for _ in range(4)}
+    checks.append(("round-robin over replicas", seen == {"primary", "replica"}))
+    print(f"{'✅' if seen == {'primary', 'replica'} else '❌'} round-robin over replicas: read from {sorted(seen)}")
+
+    for replica_router in (router, unreachable, pair):
+        for replica in replica_router.replicas.values():
+            replica.dispose()
+    for file in scratch:
+        os.unlink(file.name)
+
+    failed = [name for name, ok in checks if not ok]
+    if failed:
+        print(f"\n❌ {len(failed)} of {len(checks)} routing checks failed")
+        sys.exit(1)
+    print(f"\n✅ All {len(checks)} routing checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for QSDPharmalitics benchmarks
+Fills a database with correlated users, categories, products, pharmacies
+and years of sales at production scale. Sales follow a growth trend,
+monthly seasonality and weekday patterns; every pharmacy belongs to a
+territory served by one sales rep, and order sizes, discounts and
+statuses depend on the pharmacy type and the sale's age.
+
+Rows are written with COPY on PostgreSQL and batched Core inserts
+elsewhere. Output is a pure function of --seed, the scale options and
+--end-date, so benchmark databases can be rebuilt identically.
+
+All generated users share one password (--password, default "benchmark"):
+admin, analyst1..3 and rep0001..repNNNN.
+
+Usage:
+    python scripts/generate_dataset.py --scale small                     # configured DATABASE_URL
+    python scripts/generate_dataset.py --scale large --database-url postgresql://... --truncate
+    python scripts/generate_dataset.py --sales 2000000 --end-date 2024-12-31 --seed 7
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+SCALES = {
+    "small": {"products": 500, "pharmacies": 500, "reps": 20, "sales": 100_000},
+    "medium": {"products": 5_000, "pharmacies": 2_000, "reps": 60, "sales": 1_000_000},
+    "large": {"products": 50_000, "pharmacies": 20_000, "reps": 200, "sales": 10_000_000},
+}
+
+# Sales are generated in fixed-size chunks, each from its own seeded stream,
+# so the data does not depend on --batch-size
+SALES_CHUNK = 100_000
+
+# Independent random streams per entity: changing the sales count leaves
+# products and pharmacies untouched
+USERS_STREAM, CATALOG_STREAM, PHARMACY_STREAM, SALES_STREAM = range(4)
+
+# Region -> (share of demand, states)
+REGIONS = {
+    "Southeast": (0.42, ["SP", "RJ", "MG", "ES"]),
+    "Northeast": (0.27, ["BA", "PE", "CE", "MA", "PB", "RN", "AL", "SE", "PI"]),
+    "South": (0.14, ["PR", "SC", "RS"]),
+    "North": (0.09, ["AM", "PA", "RO", "TO", "AC", "AP", "RR"]),
+    "Central-West": (0.08, ["DF", "GO", "MT", "MS"]),
+}
+
+CAPITALS = {
+    "SP": "São Paulo", "RJ": "Rio de Janeiro", "MG": "Belo Horizonte", "ES": "Vitória",
+    "BA": "Salvador", "PE": "Recife", "CE": "Fortaleza", "MA": "São Luís", "PB": "João Pessoa",
+    "RN": "Natal", "AL": "Maceió", "SE": "Aracaju", "PI": "Teresina", "PR": "Curitiba",
+    "SC": "Florianópolis", "RS": "Porto Alegre", "AM": "Manaus", "PA": "Belém", "RO": "Porto Velho",
+    "TO": "Palmas", "AC": "Rio Branco", "AP": "Macapá", "RR": "Boa Vista", "DF": "Brasília",
+    "GO": "Goiânia", "MT": "Cuiabá", "MS": "Campo Grande",
+}
+
+# Therapeutic area -> (typical unit price, active ingredients)
+THERAPEUTIC_AREAS = {
+    "Cardiovascular": (45.0, ["Losartan", "Amlodipine", "Atenolol", "Enalapril", "Atorvastatin", "Simvastatin"]),
+    "Anti-infectives": (38.0, ["Amoxicillin", "Azithromycin", "Cephalexin", "Ciprofloxacin", "Fluconazole"]),
+    "Analgesics": (18.0, ["Paracetamol", "Dipyrone", "Ibuprofen", "Diclofenac", "Tramadol"]),
+    "Respiratory": (32.0, ["Salbutamol", "Budesonide", "Loratadine", "Montelukast", "Ambroxol"]),
+    "Gastrointestinal": (28.0, ["Omeprazole", "Pantoprazole", "Domperidone", "Ondansetron", "Simethicone"]),
+    "Endocrine": (60.0, ["Metformin", "Gliclazide", "Levothyroxine", "Insulin Glargine", "Sitagliptin"]),
+    "Central Nervous System": (55.0, ["Sertraline", "Fluoxetine", "Clonazepam", "Escitalopram", "Quetiapine"]),
+    "Dermatology": (35.0, ["Hydrocortisone", "Clotrimazole", "Mupirocin", "Adapalene", "Betamethasone"]),
+    "Oncology": (480.0, ["Tamoxifen", "Anastrozole", "Capecitabine", "Imatinib", "Letrozole"]),
+    "Vitamins & Supplements": (22.0, ["Vitamin D3", "Ferrous Sulfate", "Folic Acid", "Vitamin C", "Zinc"]),
+}
+CATEGORY_KINDS = ["Generic", "Branded", "OTC", "Hospital"]
+BRANDS = ["EMS", "Eurofarma", "Aché", "Medley", "Neo Química", "Sanofi", "Pfizer", "Novartis", "Germed", "Prati-Donaduzzi"]
+DOSAGES = ["5 mg", "10 mg", "20 mg", "25 mg", "50 mg", "100 mg", "250 mg", "500 mg", "1 g"]
+PACKAGE_SIZES = ["10 tablets", "20 tablets", "30 tablets", "60 tablets", "100 ml", "1 vial"]
+
+# Pharmacy type -> (share, order size multiplier, mean units per order, customer type, discount range)
+PHARMACY_TYPES = {
+    "INDEPENDENT": (0.55, 1.0, 4, "RETAIL", (0.00, 0.05)),
+    "CHAIN": (0.30, 3.0, 18, "WHOLESALE", (0.05, 0.15)),
+    "HOSPITAL": (0.07, 4.0, 30, "INSTITUTIONAL", (0.08, 0.18)),
+    "CLINIC": (0.05, 0.7, 3, "INSTITUTIONAL", (0.00, 0.05)),
+    "ONLINE": (0.03, 5.0, 12, "RETAIL", (0.03, 0.10)),
+}
+CHAINS = ["Drogasil", "Droga Raia", "Pague Menos", "Panvel", "Drogaria São Paulo", "Pacheco"]
+SEGMENTS = ["Urban", "Suburban", "Rural"]
+
+# Relative demand by calendar month (flu season, year-end stocking)
+MONTHLY_SEASONALITY = [0.92, 0.90, 0.98, 1.02, 1.10, 1.15, 1.12, 1.05, 0.98, 0.97, 1.00, 0.85]
+# Relative demand Monday..Sunday
+WEEKDAY_PATTERN = [1.10, 1.08, 1.05, 1.05, 1.00, 0.45, 0.15]
+ANNUAL_GROWTH = 0.12
+
+PAYMENT_METHODS = ["NET_TERMS", "WIRE_TRANSFER", "CREDIT_CARD", "DEBIT_CARD", "CASH", "CHECK"]
+PAYMENT_WEIGHTS = [0.45, 0.20, 0.15, 0.10, 0.07, 0.03]
+
+EPOCH = np.datetime64("1970-01-01T00:00:00", "us")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic dataset for benchmarks")
+    parser.add_argument("--database-url", help="Target database (default: the configured DATABASE_URL)")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Preset sizes (default: small)")
+    parser.add_argument("--products", type=int, help="Override the preset product count")
+    parser.add_argument("--pharmacies", type=int, help="Override the preset pharmacy count")
+    parser.add_argument("--reps", type=int, help="Override the preset sales rep count")
+    parser.add_argument("--sales", type=int, help="Override the preset sales count")
+    parser.add_argument("--years", type=int, default=3, help="Years of sales history (default: 3)")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(),
+                        help="Last day with sales, YYYY-MM-DD (default: today)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="Rows per COPY / insert batch")
+    parser.add_argument("--password", default="benchmark", help="Password of every generated user")
+    parser.add_argument("--truncate", action="store_true", help="Empty the existing tables first")
+    args = parser.parse_args(argv)
+
+    for name, value in SCALES[args.scale].items():
+        if getattr(args, name) is None:
+            setattr(args, name, value)
+    return args
+
+
+def stream(seed: int, *keys: int) -> np.random.Generator:
+    return np.random.default_rng([seed, *keys])
+
+
+def pick(rng: np.random.Generator, choices, weights=None, size=None):
+    weights = None if weights is None else np.asarray(weights, dtype=float) / np.sum(weights)
+    return np.asarray(choices, dtype=object)[rng.choice(len(choices), size=size, p=weights)]
+
+
+def as_timestamps(days: np.ndarray, seconds: np.ndarray) -> np.ndarray:
+    """datetime64[us] from day ordinals (days since 1970-01-01) and seconds of day"""
+    return EPOCH + days.astype("timedelta64[D]") + seconds.astype("timedelta64[s]")
+
+
+# ---------------------------------------------------------------------------
+# Generators: each returns {column: numpy array}
+# ---------------------------------------------------------------------------
+
+def generate_territories(reps: int):
+    """One territory per rep, spread over states in proportion to regional demand"""
+    states, shares, regions = [], [], []
+    for region, (share, region_states) in REGIONS.items():
+        for state in region_states:
+            states.append(state)
+            shares.append(share / len(region_states))
+            regions.append(region)
+
+    # Largest-remainder allocation, at least one territory per state when possible
+    quota = np.asarray(shares) * reps
+    counts = np.maximum(np.floor(quota).astype(int), 1 if reps >= len(states) else 0)
+    while counts.sum() > reps:
+        counts[np.argmax(counts)] -= 1
+    for index in np.argsort(counts - quota)[: reps - counts.sum()]:
+        counts[index] += 1
+
+    territories = []
+    for state, region, count, share in zip(states, regions, counts, shares):
+        for number in range(1, count + 1):
+            territories.append({"state": state, "region": region, "code": f"{state}-{number:02d}", "weight": share / count})
+    return territories
+
+
+def generate_users(args, territories, hashed_password: str):
+    joined = datetime.combine(args.end_date, datetime.min.time()) - timedelta(days=365 * args.years)
+    rows = [
+        {"username": "admin", "first_name": "Benchmark", "last_name": "Admin", "role": "ADMIN", "department": "IT"},
+    ] + [
+        {"username": f"analyst{number}", "first_name": "Analyst", "last_name": str(number),
+         "role": "ANALYST", "department": "Analytics"}
+        for number in range(1, 4)
+    ] + [
+        {"username": f"rep{number:04d}", "first_name": "Rep", "last_name": territory["code"],
+         "role": "SALES_REP", "department": f"Sales {territory['region']}"}
+        for number, territory in enumerate(territories, start=1)
+    ]
+
+    ids = np.arange(1, len(rows) + 1)
+    return {
+        "id": ids,
+        "email": np.array([f"{row['username']}@benchmark.example.com" for row in rows], dtype=object),
+        "username": np.array([row["username"] for row in rows], dtype=object),
+        "first_name": np.array([row["first_name"] for row in rows], dtype=object),
+        "last_name": np.array([row["last_name"] for row in rows], dtype=object),
+        "hashed_password": np.full(len(rows), hashed_password, dtype=object),
+        "role": np.array([row["role"] for row in rows], dtype=object),
+        "department": np.array([row["department"] for row in rows], dtype=object),
+        "is_active": np.ones(len(rows), dtype=bool),
+        "is_verified": np.ones(len(rows), dtype=bool),
+        "created_at": np.full(len(rows), np.datetime64(joined, "us")),
+    }
+
+
+def generate_categories():
+    """Ten therapeutic areas, each with Generic/Branded/OTC/Hospital subcategories"""
+    areas = list(THERAPEUTIC_AREAS)
+    names = list(areas)
+    parents = [None] * len(areas)
+    for area_index, area in enumerate(areas):
+        for kind in CATEGORY_KINDS:
+            names.append(f"{area} - {kind}")
+            parents.append(area_index + 1)
+    return {
+        "id": np.arange(1, len(names) + 1),
+        "name": np.array(names, dtype=object),
+        "parent_id": np.array(parents, dtype=object),
+        "is_active": np.ones(len(names), dtype=bool),
+    }
+
+
+def generate_products(args, categories):
+    rng = stream(args.seed, CATALOG_STREAM)
+    n = args.products
+    areas = list(THERAPEUTIC_AREAS)
+    leaf_ids = np.arange(len(areas) + 1, len(categories["id"]) + 1)
+
+    category_id = rng.choice(leaf_ids, size=n)
+    area_index = (category_id - len(areas) - 1) // len(CATEGORY_KINDS)
+    kind_index = (category_id - len(areas) - 1) % len(CATEGORY_KINDS)
+
+    ingredient = np.array([
+        THERAPEUTIC_AREAS[areas[area]][1][rng.integers(len(THERAPEUTIC_AREAS[areas[area]][1]))]
+        for area in area_index
+    ], dtype=object)
+    dosage = pick(rng, DOSAGES, size=n)
+    brand = pick(rng, BRANDS, size=n)
+    # Branded products cost more than generics, OTC less
+    kind_factor = np.array([0.7, 1.6, 0.6, 1.3])[kind_index]
+    base_price = np.array([THERAPEUTIC_AREAS[areas[area]][0] for area in area_index])
+    unit_price = np.round(base_price * kind_factor * rng.lognormal(0, 0.35, n), 2)
+
+    ids = np.arange(1, n + 1)
+    return {
+        "id": ids,
+        "code": np.array([f"P{product_id:06d}" for product_id in ids], dtype=object),
+        "name": np.array([f"{i} {d} {b}" for i, d, b in zip(ingredient, dosage, brand)], dtype=object),
+        "brand": brand,
+        "manufacturer": brand,
+        "active_ingredient": ingredient,
+        "dosage": dosage,
+        "package_size": pick(rng, PACKAGE_SIZES, size=n),
+        "unit_price": unit_price,
+        "suggested_retail_price": np.round(unit_price * 1.35, 2),
+        "cost_price": np.round(unit_price * rng.uniform(0.40, 0.70, n), 2),
+        "category_id": category_id,
+        "therapeutic_class": np.array(areas, dtype=object)[area_index],
+        "controlled_substance": rng.random(n) < np.where(np.array(areas)[area_index] == "Central Nervous System", 0.4, 0.02),
+        "prescription_required": kind_index != 2,
+        "is_active": rng.random(n) > 0.02,
+        "is_available": rng.random(n) > 0.05,
+    }
+
+
+def product_popularity(args, n: int) -> np.ndarray:
+    """Zipf-like demand: a few blockbusters, a long tail"""
+    rng = stream(args.seed, CATALOG_STREAM, 1)
+    weights = 1.0 / np.arange(1, n + 1) ** 1.07
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def generate_pharmacies(args, territories, rep_ids):
+    rng = stream(args.seed, PHARMACY_STREAM)
+    n = args.pharmacies
+    types = list(PHARMACY_TYPES)
+
+    territory_weights = np.array([territory["weight"] for territory in territories])
+    territory_index = rng.choice(len(territories), size=n, p=territory_weights / territory_weights.sum())
+    pharmacy_type = pick(rng, types, [PHARMACY_TYPES[kind][0] for kind in types], size=n)
+    state = np.array([territories[index]["state"] for index in territory_index], dtype=object)
+    segment = pick(rng, SEGMENTS, [0.55, 0.30, 0.15], size=n)
+    chain_name = np.array([
+        CHAINS[rng.integers(len(CHAINS))] if kind == "CHAIN" else None for kind in pharmacy_type
+    ], dtype=object)
+
+    ids = np.arange(1, n + 1)
+    return {
+        "id": ids,
+        "code": np.array([f"F{pharmacy_id:06d}" for pharmacy_id in ids], dtype=object),
+        "name": np.array([
+            f"{chain or 'Farmácia'} {CAPITALS[uf]} {pharmacy_id}"
+            for chain, uf, pharmacy_id in zip(chain_name, state, ids)
+        ], dtype=object),
+        "address_line1": np.array([f"Rua {number}, {rng.integers(1, 3000)}" for number in rng.integers(1, 500, n)], dtype=object),
+        "city": np.array([CAPITALS[uf] for uf in state], dtype=object),
+        "state": state,
+        "zip_code": np.array([f"{code:05d}-{suffix:03d}" for code, suffix in zip(rng.integers(1000, 99999, n), rng.integers(0, 999, n))], dtype=object),
+        "country": np.full(n, "BR", dtype=object),
+        "pharmacy_type": pharmacy_type,
+        "customer_type": np.array([PHARMACY_TYPES[kind][3] for kind in pharmacy_type], dtype=object),
+        "chain_name": chain_name,
+        "credit_limit": np.round(rng.lognormal(9.5, 0.8, n), 2),
+        "payment_terms": pick(rng, ["Net 30", "Net 45", "Net 60"], [0.6, 0.3, 0.1], size=n),
+        "market_segment": segment,
+        "territory": np.array([territories[index]["code"] for index in territory_index], dtype=object),
+        "population_density": segment,
+        "annual_volume": np.zeros(n),
+        "annual_order_count": np.zeros(n, dtype=int),
+        "average_order_value": np.zeros(n),
+        "is_active": rng.random(n) > 0.01,
+        "is_verified": rng.random(n) > 0.2,
+        # Not columns: inputs to the sales generator
+        "_territory_index": territory_index,
+        "_rep_id": rep_ids[territory_index],
+        "_region": np.array([territories[index]["region"] for index in territory_index], dtype=object),
+        "_size": rng.lognormal(0, 0.9, n) * np.array([PHARMACY_TYPES[kind][1] for kind in pharmacy_type]),
+    }
+
+
+def day_weights(args):
+    """Ordinals (days since 1970-01-01) of the sales window and their relative demand"""
+    start = args.end_date - timedelta(days=365 * args.years - 1)
+    days = np.arange(
+        np.datetime64(start, "D").astype(int),
+        np.datetime64(args.end_date, "D").astype(int) + 1
+    )
+    calendar = days.astype("datetime64[D]")
+    months = calendar.astype("datetime64[M]").astype(int) % 12
+    weekdays = (days + 3) % 7  # 1970-01-01 was a Thursday
+    trend = (1 + ANNUAL_GROWTH) ** ((days - days[0]) / 365.0)
+    weights = trend * np.array(MONTHLY_SEASONALITY)[months] * np.array(WEEKDAY_PATTERN)[weekdays]
+    return days, weights / weights.sum()
+
+
+def generate_sales_chunk(args, chunk: int, size: int, first_id: int, products, pharmacies, popularity, days, weights, rep_ids):
+    rng = stream(args.seed, SALES_STREAM, chunk)
+    end_ordinal = days[-1]
+
+    day = rng.choice(days, size=size, p=weights)
+    seconds = np.clip(rng.normal(13.5 * 3600, 3 * 3600, size), 7 * 3600, 21 * 3600).astype(np.int64)
+    sale_date = as_timestamps(day, seconds)
+
+    pharmacy_weights = pharmacies["_size"] / pharmacies["_size"].sum()
+    pharmacy_index = rng.choice(len(pharmacy_weights), size=size, p=pharmacy_weights)
+    product_index = rng.choice(len(popularity), size=size, p=popularity)
+    pharmacy_type = pharmacies["pharmacy_type"][pharmacy_index]
+
+    # The territory's rep, with occasional cover by a colleague
+    sales_rep_id = pharmacies["_rep_id"][pharmacy_index]
+    covered = rng.random(size) < 0.05
+    sales_rep_id = np.where(covered, rng.choice(rep_ids, size=size), sales_rep_id)
+
+    mean_units = np.array([PHARMACY_TYPES[kind][2] for kind in pharmacy_type])
+    quantity = rng.poisson(mean_units) + 1
+    unit_price = np.round(products["unit_price"][product_index] * rng.normal(1.0, 0.03, size), 2)
+    total_price = np.round(quantity * unit_price, 2)
+    discount_low = np.array([PHARMACY_TYPES[kind][4][0] for kind in pharmacy_type])
+    discount_high = np.array([PHARMACY_TYPES[kind][4][1] for kind in pharmacy_type])
+    discount_amount = np.round(total_price * rng.uniform(discount_low, discount_high), 2)
+    final_amount = np.round(total_price - discount_amount, 2)
+
+    # Old orders are settled; recent ones are still moving through the pipeline
+    age = end_ordinal - day
+    roll = rng.random(size)
+    status = np.select(
+        [roll < 0.035, roll < 0.05, age > 14, age > 7, age > 2],
+        ["CANCELLED", "RETURNED", "DELIVERED", "SHIPPED", "CONFIRMED"],
+        default="PENDING"
+    ).astype(object)
+    delivered = status == "DELIVERED"
+    delivery_date = np.where(
+        delivered,
+        sale_date + rng.integers(1, 8, size).astype("timedelta64[D]"),
+        np.datetime64("NaT", "us")
+    )
+
+    is_active = rng.random(size) > 0.005
+    deleted_at = np.where(
+        is_active,
+        np.datetime64("NaT", "us"),
+        sale_date + rng.integers(1, 30, size).astype("timedelta64[D]")
+    )
+
+    ids = np.arange(first_id, first_id + size)
+    promoted = rng.random(size) < 0.08
+    return {
+        "id": ids,
+        "product_id": products["id"][product_index],
+        "pharmacy_id": pharmacies["id"][pharmacy_index],
+        "sales_rep_id": sales_rep_id,
+        "quantity": quantity,
+        "unit_price": unit_price,
+        "total_price": total_price,
+        "discount_amount": discount_amount,
+        "tax_amount": np.zeros(size),
+        "final_amount": final_amount,
+        "payment_method": pick(rng, PAYMENT_METHODS, PAYMENT_WEIGHTS, size=size),
+        "status": status,
+        "sale_date": sale_date,
+        "delivery_date": delivery_date,
+        "order_number": np.array([f"SO{sale_id:010d}" for sale_id in ids], dtype=object),
+        "promotion_code": np.where(promoted, pick(rng, ["FLU10", "WINTER5", "LOYALTY", "LAUNCH15"], size=size), None),
+        "territory": pharmacies["territory"][pharmacy_index],
+        "region": pharmacies["_region"][pharmacy_index],
+        "market_segment": pharmacies["market_segment"][pharmacy_index],
+        "created_at": sale_date,
+        "is_active": is_active,
+        "deleted_at": deleted_at,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Writers
+# ---------------------------------------------------------------------------
+
+def _python_column(values: np.ndarray) -> list:
+    if values.dtype.kind == "M":
+        return values.astype("datetime64[us]").tolist()  # NaT -> None
+    if values.dtype.kind == "f":
+        return np.round(values, 2).tolist()
+    return values.tolist()
+
+
+def _csv_column(values: np.ndarray) -> list:
+    if values.dtype.kind == "M":
+        text = np.char.add(np.datetime_as_string(values, unit="us"), "+00:00")
+        return np.where(np.isnat(values), "", text).tolist()
+    if values.dtype.kind == "b":
+        return np.where(values, "t", "f").tolist()
+    if values.dtype.kind == "f":
+        return np.char.mod("%.2f", values).tolist()
+    if values.dtype.kind in "iu":
+        return values.astype(str).tolist()
+    return ["" if value is None else value for value in values.tolist()]
+
+
+def write_rows(engine, table, columns: dict, batch_size: int) -> int:
+    """Write ``columns`` into ``table``: COPY on PostgreSQL, executemany elsewhere"""
+    names = [name for name in columns if not name.startswith("_")]
+    total = len(columns[names[0]])
+
+    with engine.begin() as conn:
+        for start in range(0, total, batch_size):
+            batch = {name: columns[name][start:start + batch_size] for name in names}
+            if conn.dialect.name == "postgresql":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(zip(*(_csv_column(batch[name]) for name in names)))
+                buffer.seek(0)
+                with conn.connection.cursor() as cursor:
+                    cursor.copy_expert(
+                        f"COPY {table.name} ({', '.join(names)}) FROM STDIN WITH (FORMAT csv, NULL '')",
+                        buffer
+                    )
+            else:
+                rows = zip(*(_python_column(batch[name]) for name in names))
+                conn.execute(table.insert(), [dict(zip(names, row)) for row in rows])
+    return total
+
+
+def truncate(engine) -> None:
+    from backend.database.base import Base
+
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+            conn.exec_driver_sql(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+        else:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+
+
+def finish(engine) -> None:
+    """Derived state the bulk load bypassed: search, closure, counters, metrics, sequences, statistics"""
+    from backend.database.base import SessionLocal
+    from backend.database.search import install_product_search
+    from backend.services.categories import rebuild_category_closure
+    from backend.services.pharmacy_counters import reconcile_pharmacy_counters
+    from backend.services.sales_metrics import rebuild_daily_sales_metrics
+
+    install_product_search(engine)
+
+    db = SessionLocal()
+    try:
+        rebuild_category_closure(db)
+        reconcile_pharmacy_counters(db)
+        rebuild_daily_sales_metrics(db)
+        db.commit()
+    finally:
+        db.close()
+
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Explicit ids were loaded; move the serial sequences past them
+            for table in ("users", "product_categories", "products", "pharmacies", "sales"):
+                conn.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1)) FROM {table}"
+                )
+        conn.exec_driver_sql("ANALYZE")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.database_url:
+        # Settings are read at import time
+        os.environ["DATABASE_URL"] = args.database_url
+    os.environ["DEBUG"] = "false"
+
+    from sqlalchemy import func, select
+    from backend.core.security import get_password_hash
+    from backend.database.base import Base, engine
+    from backend.database.partitions import ensure_sales_partitions, month_start
+    from backend.models import User, ProductCategory, Product, Pharmacy, Sale
+
+    print(f"🎲 Generating {args.scale} dataset (seed {args.seed}) into {engine.url.render_as_string(hide_password=True)}")
+    print(f"   {args.products} products, {args.pharmacies} pharmacies, {args.reps} reps, "
+          f"{args.sales} sales over {args.years} years ending {args.end_date}")
+
+    Base.metadata.create_all(bind=engine)
+    if args.truncate:
+        truncate(engine)
+    with engine.connect() as conn:
+        for model in (User, Product, Pharmacy, Sale):
+            if conn.execute(select(func.count()).select_from(model.__table__)).scalar():
+                sys.exit(f"❌ {model.__tablename__} is not empty; pass --truncate to replace its contents")
+
+    started = time.perf_counter()
+
+    def done(label, count):
+        print(f"   ✅ {label}: {count} rows ({time.perf_counter() - started:.1f}s)")
+
+    # Partitioned sales (PostgreSQL) need every month of the window up front
+    start_month = month_start(args.end_date - timedelta(days=365 * args.years))
+    months = (date.today().year - start_month.year) * 12 + date.today().month - start_month.month
+    ensure_sales_partitions(engine, months_ahead=max(months, 0) + 3, today=start_month)
+
+    territories = generate_territories(args.reps)
+    users = generate_users(args, territories, get_password_hash(args.password))
+    rep_ids = users["id"][users["role"] == "SALES_REP"]
+    done("users", write_rows(engine, User.__table__, users, args.batch_size))
+
+    categories = generate_categories()
+    done("categories", write_rows(engine, ProductCategory.__table__, categories, args.batch_size))
+
+    products = generate_products(args, categories)
+    done("products", write_rows(engine, Product.__table__, products, args.batch_size))
+
+    pharmacies = generate_pharmacies(args, territories, rep_ids)
+    done("pharmacies", write_rows(engine, Pharmacy.__table__, pharmacies, args.batch_size))
+
+    popularity = product_popularity(args, args.products)
+    days, weights = day_weights(args)
+    written = 0
+    for chunk, first in enumerate(range(0, args.sales, SALES_CHUNK)):
+        size = min(SALES_CHUNK, args.sales - first)
+        sales = generate_sales_chunk(
+            args, chunk, size, first + 1, products, pharmacies, popularity, days, weights, rep_ids
+        )
+        written += write_rows(engine, Sale.__table__, sales, args.batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"   … sales: {written}/{args.sales} ({written / max(elapsed, 1e-9):,.0f} rows/s overall)", end="\r")
+    print()
+    done("sales", written)
+
+    finish(engine)
+    print(f"   ✅ derived data: search, category closure, counters, metrics, statistics ({time.perf_counter() - started:.1f}s)")
+    print(f"\n✅ Dataset ready in {time.perf_counter() - started:.1f}s; users log in with password '{args.password}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Load test harness for QSDPharmalitics
+Replays a weighted mix of realistic traffic against a running server:
+sales reps browsing and creating sales, analysts refreshing dashboards
+and admins generating reports and exports. Concurrency ramps through
+stages (e.g. 25 -> 50 -> 100 -> 200 virtual users); every stage reports
+throughput, error and rejection rates and latency percentiles per route,
+plus the server's connection pool wait per route and peak pool occupancy
+scraped from /metrics.
+
+Run it against a database filled by scripts/generate_dataset.py (same
+--scale and password). /metrics is per worker process: for pool numbers
+that cover all traffic, start the server with a single worker. The run
+exits non-zero when a stage completes no requests, a virtual user dies or
+a route's error rate exceeds --max-error-rate.
+
+Usage:
+    python scripts/load_test.py --base-url http://localhost:8001
+    python scripts/load_test.py --stages 50:60,100:60,200:120 --scale large --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+API = "/api/v1"
+
+# Persona -> (share of virtual users, {action: weight})
+PERSONAS = {
+    "rep": (0.70, {
+        "list-sales": 35, "create-sale": 30, "product-suggestions": 15,
+        "pharmacy-suggestions": 10, "list-products": 10,
+    }),
+    "analyst": (0.25, {
+        "dashboard-summary": 35, "sales-performance-monthly": 25, "sales-performance-quarterly": 10,
+        "trends": 15, "market-share": 15,
+    }),
+    "admin": (0.05, {
+        "generate-report": 35, "list-reports": 25, "export-sales": 10, "dashboard-summary": 30,
+    }),
+}
+
+SEARCH_TERMS = ["Losa", "Amox", "Para", "Omep", "Metf", "Sert", "Ibup", "Vita", "Farm", "Drog"]
+
+# Prometheus sample line: name{labels} value
+_SAMPLE = re.compile(r'^(\w+)(?:\{(.*)\})? ([-+\d.eE]+|NaN|[+-]Inf)$')
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Ramp a weighted traffic mix against a running API")
+    parser.add_argument("--base-url", default="http://localhost:8001", help="Server to load (default: %(default)s)")
+    parser.add_argument("--stages", default="25:30,50:30,100:60,200:90",
+                        help="Comma-separated users:seconds stages (default: %(default)s)")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean pause between a user's requests, seconds")
+    parser.add_argument("--scale", default="small", help="generate_dataset.py scale the database was built with")
+    parser.add_argument("--password", default="benchmark", help="Password of the generated users")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout, seconds")
+    parser.add_argument("--seed", type=int, default=1, help="Traffic randomness seed")
+    parser.add_argument("--max-error-rate", type=float, default=0.01,
+                        help="Highest per-route error rate that still passes (default: %(default)s)")
+    parser.add_argument("--output", help="Write per-stage results as JSON")
+    return parser.parse_args()
+
+
+def parse_stages(text: str):
+    stages = []
+    for stage in text.split(","):
+        users, seconds = stage.split(":")
+        stages.append((int(users), float(seconds)))
+    return stages
+
+
+def parse_metrics(text: str) -> dict:
+    """{(name, frozenset(labels)): value} from the Prometheus text format"""
+    samples = {}
+    for line in text.splitlines():
+        match = _SAMPLE.match(line)
+        if match:
+            labels = frozenset(_LABEL.findall(match.group(2) or ""))
+            samples[(match.group(1), labels)] = float(match.group(3))
+    return samples
+
+
+class Scale:
+    def __init__(self, scale: str):
+        from generate_dataset import SCALES
+        self.products = SCALES[scale]["products"]
+        self.pharmacies = SCALES[scale]["pharmacies"]
+        self.reps = SCALES[scale]["reps"]
+
+
+def request_for(action: str, rng: random.Random, scale: Scale):
+    """(method, path, params, json body) for one action"""
+    today = date.today()
+    if action == "list-sales":
+        return "GET", f"{API}/sales/", {"skip": rng.choice([0, 0, 0, 100, 200]), "limit": 100}, None
+    if action == "create-sale":
+        return "POST", f"{API}/sales/", None, {
+            "product_id": rng.randint(1, scale.products), "pharmacy_id": rng.randint(1, scale.pharmacies),
+            "quantity": rng.randint(1, 40), "unit_price": round(rng.uniform(5, 300), 2),
+        }
+    if action == "product-suggestions":
+        return "GET", f"{API}/products/search/suggestions", {"query": rng.choice(SEARCH_TERMS)}, None
+    if action == "pharmacy-suggestions":
+        return "GET", f"{API}/pharmacies/search/suggestions", {"query": rng.choice(SEARCH_TERMS)}, None
+    if action == "list-products":
+        return "GET", f"{API}/products/", {"limit": 50}, None
+    if action == "dashboard-summary":
+        return "GET", f"{API}/analytics/dashboard-summary", None, None
+    if action == "sales-performance-monthly":
+        return "GET", f"{API}/analytics/sales-performance", {"period": "monthly"}, None
+    if action == "sales-performance-quarterly":
+        return "GET", f"{API}/analytics/sales-performance", {
+            "period": "quarterly", "start_date": (today - timedelta(days=730)).isoformat(), "end_date": today.isoformat()
+        }, None
+    if action == "trends":
+        return "GET", f"{API}/analytics/trends", {"metric": rng.choice(["revenue", "orders"])}, None
+    if action == "market-share":
+        return "GET", f"{API}/analytics/market-share", None, None
+    if action == "generate-report":
+        return "POST", f"{API}/reports/generate", None, {
+            "report_name": "Load test", "report_type": rng.choice(["sales_summary", "product_analysis"]),
+            "format_type": "csv", "date_range_start": (today - timedelta(days=90)).isoformat(),
+            "date_range_end": today.isoformat(),
+        }
+    if action == "list-reports":
+        return "GET", f"{API}/reports/", None, None
+    if action == "export-sales":
+        return "GET", f"{API}/sales/export", {"start_date": (today - timedelta(days=30)).isoformat()}, None
+    raise ValueError(action)
+
+
+class StageStats:
+    def __init__(self, users: int):
+        self.users = users
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.started = time.perf_counter()
+        self.finished = None
+        self.peak_checked_out = defaultdict(float)
+        self.metrics_before = {}
+        self.metrics_after = {}
+        self.dead_users = []
+
+    def record(self, action: str, seconds: float, status) -> None:
+        self.latencies[action].append(seconds)
+        self.statuses[action][status] += 1
+
+    def summary(self) -> dict:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        routes = {}
+        for action, latencies in sorted(self.latencies.items()):
+            statuses = self.statuses[action]
+            total = sum(statuses.values())
+            errors = sum(count for status, count in statuses.items() if status == "error" or (isinstance(status, int) and status >= 500 and status != 503))
+            ordered = sorted(latencies)
+            routes[action] = {
+                "requests": total,
+                "rps": round(total / elapsed, 2),
+                "error_rate": round(errors / total, 4),
+                "rejected_503": statuses.get(503, 0),
+                "client_errors": sum(count for status, count in statuses.items() if isinstance(status, int) and 400 <= status < 500),
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+                "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 1),
+            }
+        return {
+            "users": self.users,
+            "seconds": round(elapsed, 1),
+            "throughput_rps": round(sum(len(latencies) for latencies in self.latencies.values()) / elapsed, 2),
+            "requests": sum(len(latencies) for latencies in self.latencies.values()),
+            "routes": routes,
+            "dead_users": self.dead_users,
+            "pool_wait_ms_per_request": self.pool_wait(),
+            "peak_pool_checked_out": dict(self.peak_checked_out),
+        }
+
+    def pool_wait(self) -> dict:
+        """Mean time requests to each server route waited for a pooled connection during the stage"""
+        waits = {}
+        for (name, labels), total in self.metrics_after.items():
+            if name != "db_pool_wait_seconds_sum":
+                continue
+            route = dict(labels).get("route")
+            count = self.metrics_after.get(("db_pool_wait_seconds_count", labels), 0) \
+                - self.metrics_before.get(("db_pool_wait_seconds_count", labels), 0)
+            if count > 0:
+                waited = total - self.metrics_before.get((name, labels), 0)
+                waits[route] = round(waited / count * 1000, 2)
+        return waits
+
+
+class LoadTest:
+    def __init__(self, args, client):
+        self.args = args
+        self.client = client
+        self.scale = Scale(args.scale)
+        self.rng = random.Random(args.seed)
+        self.tokens = {}
+        self.stats = None
+
+    async def token(self, username: str) -> Optional[dict]:
+        """Auth headers for ``username``; None when the login failed (recorded as a "login" error)"""
+        # One login per account: bcrypt verification would otherwise dominate
+        if username not in self.tokens:
+            start = time.perf_counter()
+            try:
+                response = await self.client.post(f"{API}/auth/login", json={
+                    "username_or_email": username, "password": self.args.password
+                })
+                response.raise_for_status()
+                self.tokens[username] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.stats.record("login", time.perf_counter() - start, "error")
+                return None
+            self.stats.record("login", time.perf_counter() - start, response.status_code)
+        return self.tokens[username]
+
+    def account(self, persona: str, number: int) -> str:
+        if persona == "rep":
+            return f"rep{number % self.scale.reps + 1:04d}"
+        if persona == "analyst":
+            return f"analyst{number % 3 + 1}"
+        return "admin"
+
+    async def user(self, number: int, persona: str) -> None:
+        rng = random.Random(self.args.seed * 100_003 + number)
+        actions, weights = zip(*PERSONAS[persona][1].items())
+
+        # Keep retrying: a user that cannot log in still counts against the stage
+        headers = await self.token(self.account(persona, number))
+        while headers is None:
+            await asyncio.sleep(rng.expovariate(1 / self.args.think_time) if self.args.think_time > 0 else 1)
+            headers = await self.token(self.account(persona, number))
+
+        while True:
+            action = rng.choices(actions, weights)[0]
+            method, path, params, body = request_for(action, rng, self.scale)
+            start = time.perf_counter()
+            try:
+                if action == "export-sales":
+                    async with self.client.stream(method, path, params=params, headers=headers) as response:
+                        async for _ in response.aiter_bytes():
+                            pass
+                else:
+                    response = await self.client.request(method, path, params=params, json=body, headers=headers)
+                status = response.status_code
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                status = "error"
+            self.stats.record(action, time.perf_counter() - start, status)
+            await asyncio.sleep(rng.expovariate(1 / self.args.think_time) if self.args.think_time > 0 else 0)
+
+    async def scrape(self) -> dict:
+        try:
+            response = await self.client.get("/metrics")
+            return parse_metrics(response.text) if response.status_code == 200 else {}
+        except Exception:
+            return {}
+
+    async def watch_pools(self) -> None:
+        while True:
+            for (name, labels), value in (await self.scrape()).items():
+                if name == "db_pool_checked_out":
+                    pool = dict(labels).get("pool")
+                    self.stats.peak_checked_out[pool] = max(self.stats.peak_checked_out[pool], value)
+            await asyncio.sleep(2)
+
+    def persona_for(self, number: int) -> str:
+        # Deterministic persona per user slot, in proportion to the shares
+        names = list(PERSONAS)
+        weights = [PERSONAS[name][0] for name in names]
+        return random.Random(self.args.seed * 7919 + number).choices(names, weights)[0]
+
+    async def run(self) -> list:
+        users = []
+        results = []
+        for target, seconds in parse_stages(self.args.stages):
+            self.stats = StageStats(target)
+            self.stats.metrics_before = await self.scrape()
+
+            while len(users) < target:
+                number = len(users)
+                users.append(asyncio.create_task(self.user(number, self.persona_for(number))))
+            while len(users) > target:
+                users.pop().cancel()
+
+            watcher = asyncio.create_task(self.watch_pools())
+            await asyncio.sleep(seconds)
+            watcher.cancel()
+
+            self.stats.finished = time.perf_counter()
+            self.stats.metrics_after = await self.scrape()
+            # A user loop only ends by raising; its slot sent no traffic since
+            self.stats.dead_users = [
+                f"user {number}: {task.exception()!r}"
+                for number, task in enumerate(users)
+                if task.done() and not task.cancelled() and task.exception() is not None
+            ]
+            summary = self.stats.summary()
+            results.append(summary)
+            print_stage(summary)
+
+        for task in users:
+            task.cancel()
+        await asyncio.gather(*users, return_exceptions=True)
+        return results
+
+
+def print_stage(summary: dict) -> None:
+    print(f"\n👥 {summary['users']} users, {summary['seconds']}s: {summary['throughput_rps']} req/s")
+    for dead in summary["dead_users"]:
+        print(f"   💀 {dead}")
+    print(f"{'route':<30}{'reqs':>7}{'rps':>8}{'err%':>7}{'503':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for action, route in summary["routes"].items():
+        print(f"{action:<30}{route['requests']:>7}{route['rps']:>8.1f}{route['error_rate'] * 100:>7.1f}"
+              f"{route['rejected_503']:>6}{route['p50_ms']:>9.1f}{route['p95_ms']:>9.1f}{route['p99_ms']:>9.1f}")
+    if summary["pool_wait_ms_per_request"]:
+        print("   pool wait per request (ms): " + ", ".join(
+            f"{route} {wait}" for route, wait in sorted(summary["pool_wait_ms_per_request"].items(), key=lambda item: -item[1])[:8]
+        ))
+    if summary["peak_pool_checked_out"]:
+        print("   peak connections checked out: " + ", ".join(
+            f"{pool} {int(count)}" for pool, count in summary["peak_pool_checked_out"].items()
+        ))
+
+
+async def main_async(args):
+    import httpx
+
+    stages = parse_stages(args.stages)
+    limits = httpx.Limits(max_connections=max(users for users, _ in stages) + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        return await LoadTest(args, client).run()
+
+
+def main():
+    args = parse_args()
+    print(f"🚀 Load testing {args.base_url}: stages {args.stages}, think time {args.think_time}s")
+    results = asyncio.run(main_async(args))
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({"base_url": args.base_url, "stages": results}, output, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    problems = []
+    for stage in results:
+        if stage["requests"] == 0:
+            problems.append(f"{stage['users']} users: no requests completed")
+        if stage["dead_users"]:
+            problems.append(f"{stage['users']} users: {len(stage['dead_users'])} virtual users died")
+        for action, route in stage["routes"].items():
+            if route["error_rate"] > args.max_error_rate:
+                problems.append(f"{stage['users']} users: {action} error rate {route['error_rate'] * 100:.2f}%")
+
+    worst = max((route["error_rate"] for stage in results for route in stage["routes"].values()), default=0)
+    print(f"\n{'✅' if not problems else '❌'} Highest per-route error rate: {worst * 100:.2f}%")
+    if problems:
+        for problem in problems:
+            print(f"   {problem}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()